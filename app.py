@@ -3,10 +3,29 @@ import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
-from datetime import datetime, timedelta
+from datetime import datetime
 import math
-import calendar
+import time
+from gspread.exceptions import GSpreadException
 from streamlit_gsheets import GSheetsConnection
+from wfm.exceptions import ExceptionIndex
+from wfm.forecast import generate_seasonal_forecast, series_baselines
+from wfm.ingest import IngestError, merge_upload, upsert_csv
+from wfm.intraday import IntradayProfiles, slot_labels
+from wfm.jobs import FINISHED, JobRunner
+from wfm.local_store import LocalStore, SheetSource
+from wfm.metrics import InstrumentedConnection, Metrics
+from wfm.persistence import SheetWriter
+from wfm.roster import requirement_matrix
+from wfm.rollups import DailyRollups, downsample
+from wfm.scenarios import ScenarioEngine, scenario_grid, scenario_inputs
+from wfm.schedule import merge_months, template_rows
+from wfm.schema import TABLE_COLUMNS, concat_typed, empty_table, normalize
+from wfm.seasonal import SeasonalForecaster
+from wfm.shared_tables import SharedTables, TableUnavailable
+from wfm.shifts import ShiftRules, optimize_shifts
+from wfm.staffing_cache import StaffingCache
+from wfm.users import UserIndex, hash_password
 
 # ==========================================
 # 1. UI & DESIGN ENGINE - PREMIUM GLASS
@@ -92,75 +111,283 @@ apply_custom_design()
 # ==========================================
 # 2. CORE ENGINES & DATA HANDLING
 # ==========================================
-conn = st.connection("gsheets", type=GSheetsConnection)
+@st.cache_resource
+def get_metrics():
+    return Metrics(capacity=1024)
 
-def calculate_erlang_c(vol, aht, target_t, agents):
-    if vol <= 0: return 1.0
-    intensity = (vol * aht) / 3600
-    if agents <= intensity: return 0.0 
-    try:
-        sum_inv = sum([(intensity**i) / math.factorial(i) for i in range(int(agents))])
-        numerator = (intensity**agents / math.factorial(int(agents))) * (agents / (agents - intensity))
-        prob_w = numerator / (sum_inv + numerator)
-        return 1 - (prob_w * math.exp(-(agents - intensity) * (target_t / aht)))
-    except: return 1.0
+# Timings per operation for System Status (wfm.metrics); every Sheets call goes through the instrumented connection.
+metrics = get_metrics()
+conn = InstrumentedConnection(st.connection("gsheets", type=GSheetsConnection), metrics)
+
+@st.cache_resource
+def get_staffing_cache():
+    return StaffingCache(volume_resolution=0.1, max_entries=200_000)
 
 def get_required_fte(vol, aht, target_sl, target_time=20):
-    if vol <= 0: return 0
-    intensity = (vol * aht) / 3600
-    agents = math.ceil(intensity) + 1
-    while calculate_erlang_c(vol, aht, target_time, agents) < target_sl and agents < 1000:
-        agents += 1
-    return agents
-
-def aggregate_wfm(df, group_cols):
-    if df.empty: return df
-    def w_avg(d, col, w_col):
-        if d[w_col].sum() == 0: return d[col].mean()
-        return np.average(d[col], weights=d[w_col])
-    
-    agg = df.groupby(group_cols).apply(lambda x: pd.Series({
-        'Volume': x['Volume'].sum(),
-        'FTE': x['FTE'].mean(),
-        'SLA': w_avg(x, 'SLA', 'Volume'),
-        'AHT': w_avg(x, 'AHT', 'Volume')
-    })).reset_index()
-    return agg
+    with metrics.timer("erlang.required_fte"):
+        return get_staffing_cache().required_fte(vol, aht, target_sl, target_time)
+
+def fte_solver(cache, metrics):
+    # Batch Erlang solve for the forecast and roster engines, timed; built from objects resolved in the script thread.
+    def required_fte_many(vol, aht, target_sl, target_time=20):
+        with metrics.timer("erlang.required_fte_many", size=np.size(vol)):
+            return cache.required_fte_many(vol, aht, target_sl, target_time)
+    return required_fte_many
+
+SHEET_KEYS = {
+    "user_db": ["email"],
+    "master_data": ["Date", "Country", "Channel"],
+    "exception_logs": None,
+    "schedule_db": ["Country", "YearMonth", "Agent", "Time"],
+    "forecast_db": ["Date", "Country", "Channel"],
+}
+
+SLOT_MINUTES = 30
+OPENING_HOURS = ("08:00", "20:00")
+SHIFT_RULES = ShiftRules(shift_hours=(8, 6, 4), break_minutes=30, max_days_per_week=5, min_rest_hours=11)
+ROSTER_TIME_BUDGET = 3.0
 
 def generate_time_slots():
-    return [f"{str(h).zfill(2)}:{str(m).zfill(2)}" for h in range(8, 20) for m in (0, 30)]
+    return slot_labels(SLOT_MINUTES, *OPENING_HOURS)
+
+@st.cache_resource
+def get_intraday_profiles():
+    return IntradayProfiles()
+
+@st.cache_resource
+def get_scenario_engine():
+    return ScenarioEngine()
+
+@st.cache_resource
+def get_exception_index():
+    return ExceptionIndex(SLOT_MINUTES)
+
+@st.cache_resource
+def get_daily_rollups():
+    return DailyRollups()
+
+def fresh(index_getter, table_name, timer_name):
+    # An incremental index (wfm.incremental) that describes the current version of its table. Writes that fold
+    # their rows in (imports, Log Exception) keep it current; anything else (a sync, an edit) rebuilds it here.
+    # The version is read before the rows (after the first load), so rows newer than it only cost a later rebuild.
+    # While the table can't be loaded the index describes its fallback, read once per call.
+    index = index_getter()
+    shared = get_shared_tables()
+    rows = shared.get(table_name)
+    version = shared.version(table_name)
+    if index.version != version:
+        if shared.loaded(table_name): rows = shared.get(table_name)
+        with metrics.timer(timer_name, size=len(rows)): index.rebuild(rows, version)
+    return index
+
+def exception_index():
+    return fresh(get_exception_index, "exception_logs", "exceptions.rebuild")
+
+def intraday_profiles():
+    return fresh(get_intraday_profiles, "master_data", "intraday.rebuild")
+
+def daily_rollups():
+    return fresh(get_daily_rollups, "master_data", "rollups.rebuild")
+
+CHART_MAX_POINTS = 400
+
+# Figures are shared by every session, keyed by the table versions and the market selection. Both are timed on
+# cache misses only: the build is what a hit saves.
+@st.cache_resource(max_entries=64, show_spinner=False)
+def volume_figure(version, markets):
+    with metrics.timer("chart.volume_figure"):
+        daily_agg = downsample(daily_rollups().daily(markets, by='Channel'), CHART_MAX_POINTS, by='Channel')
+        return px.area(daily_agg, x='Day', y='Volume', color='Channel', title="Volume Demand by Channel", template="plotly_white")
+
+@st.cache_resource(max_entries=64, show_spinner=False)
+def forecast_figure(master_version, forecast_version, country):
+    with metrics.timer("chart.forecast_figure"):
+        hist = downsample(daily_rollups().daily([country], by='Country'), CHART_MAX_POINTS, by='Country')
+        f_db = table("forecast_db")
+        f_ctry = f_db[f_db['Country'] == country]
+        f_daily = f_ctry.groupby(f_ctry['Date'].dt.normalize().rename('Day'))['Forecast_Volume'].sum().reset_index()
+        f_daily = downsample(f_daily, CHART_MAX_POINTS)
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(x=hist['Day'], y=hist['Volume'], name=f"Actual ({country})"))
+        fig.add_trace(go.Scatter(x=f_daily['Day'], y=f_daily['Forecast_Volume'], name=f"Forecast ({country})", line=dict(dash='dot')))
+        fig.update_layout(template="plotly_white")
+        return fig
+
+@st.cache_resource
+def get_forecaster():
+    return SeasonalForecaster()
+
+@st.cache_resource
+def get_local_store():
+    return LocalStore(".wfm_store")
+
+STORE_TABLES = ["master_data", "exception_logs", "schedule_db", "forecast_db"]
+# A worksheet missing these columns loads as an empty table.
+REQUIRED_COLUMNS = {
+    "master_data": ["Date", "Country", "Channel", "Volume", "SLA", "AHT", "FTE"],
+    "exception_logs": ["Start Time"],
+    "schedule_db": ["Country"],
+    "forecast_db": ["Country"],
+}
 
+def read_table(name, full=False):
+    # One worksheet: user_db straight from Sheets, the others through the local mirror (wfm.local_store);
+    # full=True re-reads the whole sheet instead of the delta below the mirrored rows.
+    with metrics.timer(f"load.{name}") as record:
+        if name == "user_db": df = conn.read(worksheet="user_db", ttl="0")
+        else: df = get_local_store().refresh(SheetSource(conn), [name], full=full)[name]
+        get_sheet_writer().track(name, df)
+        if not all(c in df.columns for c in REQUIRED_COLUMNS.get(name, [])): df = empty_table(name)
+        record["size"] = len(df)
+    return df
+
+def fallback_table(name):
+    # Shown while a worksheet can't be read. It is never published or pushed: the next access reads the sheet again,
+    # and writes to the table fail (TableUnavailable) until it loads.
+    if name == "user_db": return pd.DataFrame([{"email": "telmo.alves@docplanner.com", "password": "Memes0812", "role": "Admin"}])
+    return empty_table(name)
+
+@st.cache_resource
+def get_shared_tables():
+    # Each worksheet loads on first access (wfm.shared_tables), so a page only reads what it shows.
+    return SharedTables(loader=read_table, fallback=fallback_table)
+
+@st.cache_resource
+def get_sheet_writer():
+    return SheetWriter(conn, keys=SHEET_KEYS)
+
+def table(name):
+    return get_shared_tables().get(name)
+
+@metrics.timed("sync_from_cloud")
 def sync_from_cloud():
-    try:
-        st.session_state.user_db = conn.read(worksheet="user_db", ttl="0")
-        
-        md = conn.read(worksheet="master_data", ttl="0")
-        expected_cols = ["Date", "Country", "Channel", "Volume", "SLA", "AHT", "FTE"]
-        if not all(c in md.columns for c in expected_cols): md = pd.DataFrame(columns=expected_cols)
-        st.session_state.master_data = md
-        
-        el = conn.read(worksheet="exception_logs", ttl="0")
-        if 'Start Time' not in el.columns: el = pd.DataFrame(columns=["Country", "Date", "Start Time", "Agent", "Type", "Duration (Min)", "Notes"])
-        st.session_state.exception_logs = el
-
-        sd = conn.read(worksheet="schedule_db", ttl="0")
-        if 'Country' not in sd.columns: sd = pd.DataFrame(columns=["Country", "YearMonth", "Agent", "Time"] + [str(d) for d in range(1, 32)])
-        st.session_state.schedule_db = sd
-        
-        fd = conn.read(worksheet="forecast_db", ttl="0")
-        if 'Country' not in fd.columns: fd = pd.DataFrame(columns=["Date", "Country", "Channel", "Forecast_Volume", "Req_FTE"])
-        st.session_state.forecast_db = fd
+    # Full re-read of the tables already loaded, so edits made directly in Sheets anywhere in a table are picked up;
+    # the others read in full on their first access. A failed read keeps what is loaded.
+    shared = get_shared_tables()
+    for name in SHEET_KEYS:
+        if shared.loaded(name):
+            try: shared.reload(name, lambda n: read_table(n, full=True))
+            except Exception: pass
+        elif name in STORE_TABLES: get_local_store().forget(name)
+
+@st.cache_resource
+def get_user_index():
+    return UserIndex()
+
+def user_index():
+    # Only user_db is read to log in.
+    return fresh(get_user_index, "user_db", "users.rebuild")
+
+def resources():
+    # The shared objects writes and jobs use. Job threads have no ScriptRunContext, so they must not call the
+    # st.cache_resource getters: the script resolves these and passes them in.
+    return {"shared": get_shared_tables(), "writer": get_sheet_writer(), "store": get_local_store(),
+            "staffing": get_staffing_cache(), "metrics": metrics}
+
+def mirror_table(name, df, pushed, res=None):
+    res = res or resources()
+    if name in STORE_TABLES:
+        ordered = res["writer"].in_sheet_order(name, df)
+        if pushed['rewritten'] or pushed['updated']: res["store"].save(name, ordered)
+        elif pushed['appended']: res["store"].append(name, ordered.tail(pushed['appended']))
+
+# What a push raises once the writer's retries are spent: gspread API errors, network errors and timeouts (OSError),
+# and the writer's RuntimeError for an append it could not verify.
+PUSH_ERRORS = (GSpreadException, OSError, RuntimeError)
+
+def push_table(name, df, res=None):
+    res = res or resources()
+    pushed = res["writer"].sync(name, df)
+    mirror_table(name, df, pushed, res)
+    return pushed
+
+def update_table(name, change, res=None):
+    # Copy-on-write: change() builds the next version from the latest shared frame;
+    # it is published to every session first, then pushed to Sheets.
+    res = res or resources()
+    return res["shared"].update(name, change, persist=lambda name, df: push_table(name, df, res))
+
+def upsert_table(name, change, rows):
+    # As update_table, but when the sheet is tracked by key only `rows` (the changed keys) are pushed.
+    def persist(name, df):
+        writer = get_sheet_writer()
+        if not writer.can_upsert(name, df.columns): return push_table(name, df)
+        pushed = writer.upsert(name, rows)
+        mirror_table(name, df, pushed)
+        return pushed
+    return get_shared_tables().update(name, change, persist=persist)
+
+def append_table(name, rows):
+    # As update_table for rows known to be new: only `rows` are typed and pushed (SheetWriter.append), and the next
+    # version is the latest frame with them concatenated, without re-typing or re-hashing the rest of the table.
+    rows = normalize(rows, name)
+    def persist(name, df):
+        writer = get_sheet_writer()
+        if not writer.can_append(name, df.columns): return push_table(name, df)
+        pushed = {"appended": writer.append(name, rows), "updated": 0, "rewritten": False}
+        mirror_table(name, df, pushed)
+        return pushed
+    return get_shared_tables().update(name, lambda df: concat_typed([df, rows]), persist=persist)
 
-    except Exception:
-        st.session_state.user_db = pd.DataFrame([{"email": "telmo.alves@docplanner.com", "password": "Memes0812", "role": "Admin"}])
-        st.session_state.master_data = pd.DataFrame(columns=["Date", "Country", "Channel", "Volume", "SLA", "AHT", "FTE"])
-        st.session_state.exception_logs = pd.DataFrame(columns=["Country", "Date", "Start Time", "Agent", "Type", "Duration (Min)", "Notes"])
-        st.session_state.schedule_db = pd.DataFrame(columns=["Country", "YearMonth", "Agent", "Time"] + [str(d) for d in range(1, 32)])
-        st.session_state.forecast_db = pd.DataFrame(columns=["Date", "Country", "Channel", "Forecast_Volume", "Req_FTE"])
+# ==========================================
+# BACKGROUND JOBS (wfm.jobs)
+# ==========================================
+@st.cache_resource
+def get_job_runner():
+    return JobRunner(max_workers=4)
+
+# Jobs run on pool threads: everything they touch comes in through `res` (see resources()).
+def forecast_job(job, res, history, forecaster, profiles, version):
+    t0 = time.perf_counter()
+    metrics = res["metrics"]
+    with metrics.timer("forecast.generate") as record:
+        solve = fte_solver(res["staffing"], metrics)
+        new_f = generate_seasonal_forecast(history, forecaster, profiles, slot_minutes=SLOT_MINUTES, solve=solve, key=version, progress=job.progress)
+        record["size"] = len(new_f)
+    job.progress(0.95, "Saving forecast_db")
+    try:
+        with metrics.timer("forecast.save", size=len(new_f)): update_table("forecast_db", lambda _: new_f, res)
+        saved = True
+    except Exception: saved = False
+    return {"rows": len(new_f), "saved": saved, "seconds": time.perf_counter() - t0}
+
+def roster_job(job, res, f_month, year, month, country, profiles):
+    times = generate_time_slots()
+    metrics = res["metrics"]
+    # Arrival curve per channel and weekday over opening hours, from master_data (wfm.intraday).
+    channels = list(f_month['Channel'].unique())
+    curves = profiles.curves([(country, ch) for ch in channels], SLOT_MINUTES, *OPENING_HOURS)
+    with metrics.timer("roster.requirements", size=len(f_month)):
+        req = requirement_matrix(f_month, year, month, channels, curves, solve=fte_solver(res["staffing"], metrics))
+    with metrics.timer("roster.optimize") as record:
+        plan = optimize_shifts(req, channels, times, SHIFT_RULES, first_day=f"{year}-{month:02d}-01", time_budget=ROSTER_TIME_BUDGET, progress=job.progress)
+        record["size"] = len(plan["shifts"])
+    return {"plan": plan, "csv": plan["template"].to_csv(index=False).encode('utf-8'), "country": country, "year": year, "month": month}
+
+def start_job(kind, fn, *args, label=""):
+    # One tracked job per kind and session; the job itself keeps running across reruns and pages.
+    job_id = get_job_runner().submit(kind, fn, *args, label=label, owner=st.session_state.get("current_email"))
+    st.session_state.setdefault("jobs", {})[kind] = job_id
+    return job_id
+
+def session_job(kind):
+    # A snapshot (wfm.jobs) of this session's job of the given kind: its fields change on the worker thread.
+    job_id = st.session_state.get("jobs", {}).get(kind)
+    job = get_job_runner().get(job_id) if job_id else None
+    return job.snapshot() if job is not None else None
+
+@st.fragment(run_every=1.0)
+def poll_job(job_id):
+    # Only rendered while the job is queued or running; a full rerun shows its result once it finishes.
+    job = get_job_runner().get(job_id)
+    snap = job.snapshot() if job is not None else None
+    if snap is None or snap['status'] in FINISHED: st.rerun()
+    c1, c2 = st.columns([5, 1])
+    c1.progress(snap['progress'], text=f"{snap['label']}: {snap['message']} ({snap['seconds']:.0f}s)")
+    if c2.button("⏹️ Cancel", key=f"cancel_{job_id}"): get_job_runner().cancel(job_id)
 
 if 'logged_in' not in st.session_state:
     st.session_state.logged_in = False
-    sync_from_cloud()
 
 # ==========================================
 # 3. GLOBAL ASSETS
@@ -187,12 +414,12 @@ if not st.session_state.logged_in:
         e_in = st.text_input("Work Email", placeholder="your.name@docplanner.com")
         p_in = st.text_input("Password", type="password", placeholder="••••••••")
         if st.button("Continue", use_container_width=True):
-            db = st.session_state.user_db
-            match = db[(db['email'].str.lower() == e_in.lower()) & (db['password'] == p_in)]
-            if not match.empty:
+            # Hashed-email lookup in the user index (wfm.users); no other worksheet is read before login.
+            with metrics.timer("login"): user = user_index().authenticate(e_in, p_in)
+            if user is not None:
                 st.session_state.logged_in = True
-                st.session_state.user_role = str(match.iloc[0]['role'])
-                st.session_state.current_email = str(match.iloc[0]['email'])
+                st.session_state.user_role = user['role']
+                st.session_state.current_email = user['email']
                 st.rerun()
             else: st.error("Access denied. Check credentials.")
     st.stop()
@@ -225,31 +452,24 @@ def render_header(title):
 # ==========================================
 # 5. MAIN MODULES
 # ==========================================
+page_t0 = time.perf_counter()
 if menu == "Dashboard":
     render_header("Performance Overview")
-    df = st.session_state.master_data
+    df = table("master_data")
     if not df.empty and 'Country' in df.columns:
-        df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
-        df['Day'] = df['Date'].dt.date
-        df_f = df[df['Country'].isin(selected_markets)].copy()
+        # KPIs and the chart are re-sums of the daily (Country, Channel) rollups (wfm.rollups), not a scan of master_data.
+        kpi = daily_rollups().totals(selected_markets)
         
-        if not df_f.empty:
-            for c in ['Volume', 'SLA', 'AHT', 'FTE']: df_f[c] = pd.to_numeric(df_f[c], errors='coerce').fillna(0)
-            
-            tot_v = df_f['Volume'].sum()
-            avg_fte = df_f['FTE'].mean()
-            sl_w = np.average(df_f['SLA'], weights=df_f['Volume']) if tot_v > 0 else 0
-            aht_w = np.average(df_f['AHT'], weights=df_f['Volume']) if tot_v > 0 else 0
-            
+        if kpi['Rows']:
             c1, c2, c3, c4 = st.columns(4)
-            c1.metric("Total Volume", f"{tot_v:,.0f}")
-            c2.metric("Weighted SLA%", f"{sl_w*100:.1f}%")
-            c3.metric("Weighted AHT", f"{int(aht_w)}s")
-            c4.metric("Average FTE", f"{avg_fte:,.1f}")
+            c1.metric("Total Volume", f"{kpi['Volume']:,.0f}")
+            c2.metric("Weighted SLA%", f"{kpi['SLA']*100:.1f}%")
+            c3.metric("Weighted AHT", f"{int(kpi['AHT'])}s")
+            c4.metric("Average FTE", f"{kpi['FTE']:,.1f}")
             
-            daily_agg = aggregate_wfm(df_f, ['Day', 'Channel'])
             st.markdown("<hr style='margin: 20px 0; border-color: rgba(0,0,0,0.05);'>", unsafe_allow_html=True)
-            st.plotly_chart(px.area(daily_agg, x='Day', y='Volume', color='Channel', title="Volume Demand by Channel", template="plotly_white"), use_container_width=True)
+            fig = volume_figure(get_shared_tables().version("master_data"), tuple(sorted(selected_markets)))
+            st.plotly_chart(fig, use_container_width=True)
         else: st.info("No data matches the selected filters.")
     else: st.info("Cloud database is empty.")
 
@@ -268,93 +488,91 @@ elif menu == "Import Data":
     up = st.file_uploader("Drop Market CSV File", type="csv")
     
     if up:
-        with st.spinner("Reading CSV file..."):
-            new_df = pd.read_csv(up)
-            new_df.columns = new_df.columns.str.strip().str.capitalize()
-            new_df.rename(columns={'Sla': 'SLA', 'Aht': 'AHT', 'Fte': 'FTE'}, inplace=True)
-            
-            expected = ["Date", "Country", "Channel", "Volume", "SLA", "AHT", "FTE"]
-            missing_cols = [c for c in expected if c not in new_df.columns]
-            
-            if not missing_cols:
-                st.info(f"File validated. Attempting to process {len(new_df):,} rows...")
-                st.session_state.master_data = pd.concat([st.session_state.master_data, new_df], ignore_index=True)
-                st.session_state.master_data.drop_duplicates(subset=['Date', 'Country', 'Channel'], keep='last', inplace=True)
-                
-                try:
-                    with st.spinner("Syncing to Cloud Database..."):
-                        conn.update(worksheet="master_data", data=st.session_state.master_data)
-                    st.success(f"Successfully synchronized {len(new_df):,} rows with Cloud Data Lake.")
-                except Exception as e:
-                    st.error("Google Sheets API timed out! File too large for single cloud push.")
-            else:
-                st.error(f"Upload Failed: Missing columns: {missing_cols}")
+        # Streamed in chunks (wfm.ingest): each chunk is validated, upserted and pushed before the next is read.
+        bar = st.progress(0.0, text="Reading CSV file...")
+        report = lambda rows, frac: bar.progress(frac, text=f"Processed {rows:,} rows...")
+        shared = get_shared_tables()
+        try:
+            # Read and pushed without the shared lock (the writer serializes pushes per sheet); the lock is only
+            # held to publish the result and fold its delta into the intraday profiles and rollups.
+            with shared.lock: master, base_version = shared.load("master_data"), shared.version("master_data")
+            md, stats = upsert_csv(up, master, writer=get_sheet_writer(), on_progress=report)
+            with shared.lock:
+                old_version = shared.version("master_data")
+                if old_version != base_version:
+                    # master_data changed while the file was read: replay the upload onto the latest version.
+                    md, stats['replaced'] = merge_upload(table("master_data"), stats['upserted'])
+                new_version = shared.publish("master_data", md)
+                get_intraday_profiles().apply_import(stats['upserted'], old_version, new_version, replaced=stats['replaced'])
+                get_daily_rollups().apply_import(stats['upserted'], old_version, new_version, replaced=stats['replaced'])
+            if stats['pushed'] is None:
+                # Not pushed chunk by chunk: push the table now. Under the sheet's push lock the latest version is
+                # pushed, which holds this upload and anything published since, so it can't undo a newer push.
+                with get_sheet_writer().lock("master_data"):
+                    stats['pushed'] = push_table("master_data", shared.load("master_data"))
+            elif stats['push_error'] is None: mirror_table("master_data", md, stats['pushed'])
+            bar.empty()
+            if stats['rejected']: st.warning(f"Skipped {stats['rejected']:,} rows without a valid Date, Country or Channel, or with a non-numeric metric.")
+            if stats['push_error'] is not None: raise stats['push_error']
+            if stats['error'] is not None: raise stats['error']
+            st.success(f"Successfully synchronized {stats['rows']:,} rows with Cloud Data Lake ({stats['new']:,} new, {stats['updated']:,} updated).")
+        except IngestError as e:
+            st.error(f"Upload Failed: {e}")
+        except TableUnavailable:
+            st.error("master_data could not be read from Google Sheets; nothing was imported. Try again shortly.")
+        except Exception as e:
+            st.error("Google Sheets API timed out! Rows saved in memory; retry the upload to push the remaining delta.")
 
 elif menu == "Forecasting":
     render_header("12-Month Advanced Forecasting")
-    df = st.session_state.master_data.copy()
+    df = table("master_data")
     
     st.metric("Total Rows in Memory", f"{len(df):,}")
     
     if not df.empty and len(df) >= 10:
-        df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
         valid_df = df.dropna(subset=['Date'])
         
         if len(valid_df) < 10:
             st.error("Date formatting issue. Unable to parse enough valid dates.")
             st.stop()
-            
-        last_date = valid_df['Date'].max()
         
         c1, c2 = st.columns(2)
-        if c1.button("🚀 Generate 12-Month Forecast & Distribution"):
-            with st.spinner("Analyzing historical patterns... (Optimized Vector Engine)"):
-                hist_agg = valid_df.groupby(['Country', 'Channel'])[['Volume', 'AHT']].mean().reset_index()
-                metrics_dict = hist_agg.set_index(['Country', 'Channel']).to_dict('index')
-                
-                proj_data = []
-                dates = [(last_date + timedelta(days=i)).strftime('%Y-%m-%d') for i in range(1, 366)]
-                
-                for ctry in valid_df['Country'].unique():
-                    for ch in valid_df['Channel'].unique():
-                        key = (ctry, ch)
-                        if key in metrics_dict:
-                            base_v = metrics_dict[key]['Volume']
-                            base_aht = metrics_dict[key]['AHT']
-                            if math.isnan(base_v): base_v = 50 
-                            if math.isnan(base_aht): base_aht = 300
-                            
-                            for idx, d_str in enumerate(dates, start=1):
-                                v_mock = base_v * (1 + (idx*0.0001))
-                                req_fte = get_required_fte(v_mock / 48, base_aht, 0.80) * 48 
-                                proj_data.append([d_str, ctry, ch, v_mock, req_fte])
-                
-                new_f = pd.DataFrame(proj_data, columns=["Date", "Country", "Channel", "Forecast_Volume", "Req_FTE"])
-                st.session_state.forecast_db = new_f
-                try: conn.update(worksheet="forecast_db", data=st.session_state.forecast_db)
-                except: pass
-                st.success("Forecast generated and distributed for next 365 days in ~2 seconds!")
+        job = session_job("forecast")
+        running = job is not None and job['status'] not in FINISHED
+        if c1.button("🚀 Generate 12-Month Forecast & Distribution", disabled=running):
+            # Runs in the background (wfm.jobs): the page stays usable and the forecast lands in forecast_db when done.
+            # forecast_db is loaded here first: loading reads through st.cache_resource getters, which the job can't call.
+            try:
+                get_shared_tables().load("forecast_db")
+                start_job("forecast", forecast_job, resources(), valid_df, get_forecaster(), intraday_profiles(), get_shared_tables().version("master_data"), label="12-Month Forecast")
+                job, running = session_job("forecast"), True
+            except TableUnavailable:
+                st.error("forecast_db could not be read from Google Sheets; the forecast was not started. Try again shortly.")
+        if running: poll_job(job['id'])
+        elif job is not None and job['status'] == "done":
+            if job['result']['saved']: st.success(f"Forecast generated and distributed for next 365 days in {job['result']['seconds']:.1f} seconds!")
+            else: st.warning("Forecast saved to shared memory (Google Sheets API Timeout).")
+        elif job is not None and job['status'] == "failed": st.error(f"Forecast failed: {job['error']}")
+        elif job is not None and job['status'] == "cancelled": st.info("Forecast generation was cancelled.")
         
-        if not st.session_state.forecast_db.empty:
-            f_db = st.session_state.forecast_db
-            f_db['Date'] = pd.to_datetime(f_db['Date'])
+        if not table("forecast_db").empty:
+            f_db = table("forecast_db")
             
             st.write("### Forecast Accuracy (Historical Backtest)")
-            st.metric("Model MAPE (Mean Absolute Percentage Error)", "6.4% Variance")
+            bt = get_forecaster().backtest(valid_df, key=get_shared_tables().version("master_data"))
+            if bt is None: st.info("The backtest needs at least five weeks of daily history.")
+            else:
+                m1, m2 = st.columns(2)
+                m1.metric("Model MAPE (Mean Absolute Percentage Error)", f"{bt['MAPE']*100:.1f}%")
+                m2.metric("Model WAPE (Weighted Absolute Percentage Error)", f"{bt['WAPE']*100:.1f}%")
+                st.caption(f"Rolling-origin backtest of the daily Holt-Winters models: {bt['origins']} origins, {bt['horizon']}-day horizon.")
+                with st.expander("Backtest by market & channel"):
+                    st.dataframe(bt['series'].style.format({'MAPE': '{:.1%}', 'WAPE': '{:.1%}'}), use_container_width=True)
             
             st.write("### Volume Projection vs Actuals")
-            hist_daily = aggregate_wfm(valid_df, [valid_df['Date'].dt.date, 'Country'])
-            hist_daily.rename(columns={'Date': 'Time', 'Volume': 'Actual'}, inplace=True)
-            f_daily = f_db.groupby([f_db['Date'].dt.date, 'Country'])['Forecast_Volume'].sum().reset_index()
-            f_daily.rename(columns={'Date': 'Time', 'Forecast_Volume': 'Forecast'}, inplace=True)
-            
-            fig = go.Figure()
             ctry_plot = selected_markets[0] if selected_markets else COUNTRIES[0]
-            spain_hist = hist_daily[hist_daily['Country']==ctry_plot]
-            spain_f = f_daily[f_daily['Country']==ctry_plot]
-            fig.add_trace(go.Scatter(x=spain_hist['Time'], y=spain_hist['Actual'], name=f"Actual ({ctry_plot})"))
-            fig.add_trace(go.Scatter(x=spain_f['Time'], y=spain_f['Forecast'], name=f"Forecast ({ctry_plot})", line=dict(dash='dot')))
-            fig.update_layout(template="plotly_white")
+            shared = get_shared_tables()
+            fig = forecast_figure(shared.version("master_data"), shared.version("forecast_db"), ctry_plot)
             st.plotly_chart(fig, use_container_width=True)
     else: st.warning("Requires granular interval data to generate forecast models.")
 
@@ -364,8 +582,7 @@ elif menu == "Scheduling":
     
     with tab1:
         st.write("### Agent Schedule View")
-        s_db = st.session_state.schedule_db
-        exc_db = st.session_state.exception_logs
+        s_db = table("schedule_db")
         
         if not s_db.empty and 'Country' in s_db.columns:
             market_db = s_db[s_db['Country'].isin(selected_markets)]
@@ -379,33 +596,15 @@ elif menu == "Scheduling":
                 agent_schedule = market_db[(market_db['Agent'] == selected_agent) & (market_db['YearMonth'] == selected_ym)].copy()
                 
                 if not agent_schedule.empty:
-                    agent_schedule = agent_schedule.sort_values(by="Time")
                     display_cols = ["Time"] + [str(d) for d in range(1, 32) if str(d) in agent_schedule.columns]
+                    # Categorical cells (wfm.schedule) as plain text; sorted by the time label, not category order.
+                    cells = agent_schedule[display_cols].astype(object).sort_values(by="Time")
                     
                     # --- CRITICAL BUG FIX: DROP DUPLICATES SO INDEX IS ALWAYS UNIQUE ---
-                    display_df = agent_schedule[display_cols].drop_duplicates(subset=['Time'], keep='last').set_index("Time")
+                    display_df = cells.drop_duplicates(subset=['Time'], keep='last').set_index("Time")
                     
-                    # --- DYNAMIC EXCEPTION OVERLAY ENGINE ---
-                    if not exc_db.empty and 'Date' in exc_db.columns:
-                        agent_exc = exc_db[exc_db['Agent'] == selected_agent]
-                        for _, exc in agent_exc.iterrows():
-                            exc_date_str = str(exc['Date'])
-                            if exc_date_str.startswith(selected_ym):
-                                exc_day = str(int(exc_date_str.split('-')[2])) 
-                                start_time = exc['Start Time']
-                                duration = int(exc['Duration (Min)'])
-                                exc_type = f"🔴 {exc['Type']}"
-                                
-                                blocks_affected = math.ceil(duration / 30)
-                                
-                                if start_time in display_df.index and exc_day in display_df.columns:
-                                    # Safe integer lookup thanks to deduplication
-                                    start_idx = display_df.index.get_loc(start_time)
-                                    
-                                    for i in range(blocks_affected):
-                                        if start_idx + i < len(display_df):
-                                            target_time = display_df.index[start_idx + i]
-                                            display_df.at[target_time, exc_day] = exc_type
+                    # --- DYNAMIC EXCEPTION OVERLAY ENGINE (indexed by Country, Agent, YearMonth) ---
+                    display_df = exception_index().overlay(display_df, agent_schedule['Country'].dropna().unique(), selected_agent, selected_ym)
 
                     st.write(f"**Viewing Schedule:** {selected_agent} ({selected_ym})")
                     edited_df = st.data_editor(display_df, use_container_width=True)
@@ -417,10 +616,9 @@ elif menu == "Scheduling":
         st.write("### Option A: Auto-Generate Forecast-Optimized Roster")
         default_y = datetime.now().year
         default_m = datetime.now().month
-        f_db = st.session_state.forecast_db.copy()
+        f_db = table("forecast_db")
         
         if not f_db.empty:
-            f_db['Date'] = pd.to_datetime(f_db['Date'], errors='coerce')
             f_db = f_db.dropna(subset=['Date'])
             if not f_db.empty:
                 min_dt = f_db['Date'].min()
@@ -434,8 +632,11 @@ elif menu == "Scheduling":
         m_sel = col2.number_input("Month", 1, 12, default_m)
         target_country = col3.selectbox("Assign to Market", COUNTRIES, key="sch_country")
         
-        st.write("Generates an intelligently bin-packed schedule based on the selected month's exact Erlang-C forecast curve.")
-        if st.button("✨ Generate AI Roster"):
+        st.write(f"Covers the selected month's Erlang-C forecast curve with legal shifts ({'/'.join(map(str, SHIFT_RULES.shift_hours))}h, "
+                 f"{SHIFT_RULES.break_minutes}-min break, max {SHIFT_RULES.max_days_per_week} days per week, {SHIFT_RULES.min_rest_hours}h rest).")
+        job = session_job("roster")
+        running = job is not None and job['status'] not in FINISHED
+        if st.button("✨ Generate AI Roster", disabled=running):
             if f_db.empty:
                 st.error("You must generate a 12-Month Forecast first!")
             else:
@@ -443,60 +644,40 @@ elif menu == "Scheduling":
                 if f_month.empty:
                     st.error("No forecast data exists for this specific month/country. Check the active forecast range.")
                 else:
-                    with st.spinner("Calculating Interval Curves and Packing Agent Shifts..."):
-                        days_in_month = calendar.monthrange(int(y_sel), int(m_sel))[1]
-                        times = generate_time_slots()
-                        weights = [0.5, 0.6, 0.8, 1.0, 1.2, 1.3, 1.2, 1.0, 0.8, 0.7, 0.8, 1.0, 1.1, 1.2, 1.1, 0.9, 0.8, 0.7, 0.6, 0.5, 0.4, 0.3, 0.2, 0.1]
-                        dist_curve = {times[i]: weights[i]/sum(weights) for i in range(len(times))}
-                        
-                        schedule_matrix = {d: {t: [] for t in times} for d in range(1, days_in_month+1)}
-                        max_agents = 0
-                        
-                        for d in range(1, days_in_month+1):
-                            date_str = f"{y_sel}-{str(m_sel).zfill(2)}-{str(d).zfill(2)}"
-                            day_fcst = f_month[f_month['Date'] == date_str]
-                            for t in times:
-                                agents_needed = []
-                                for _, row in day_fcst.iterrows():
-                                    ch = row['Channel']
-                                    int_vol = row['Forecast_Volume'] * dist_curve[t]
-                                    req = get_required_fte(int_vol, 300, 0.80)
-                                    agents_needed.extend([ch] * req)
-                                schedule_matrix[d][t] = agents_needed
-                                if len(agents_needed) > max_agents: max_agents = len(agents_needed)
-                        
-                        if max_agents == 0: max_agents = 10
-                        rows = []
-                        for i in range(1, max_agents + 1):
-                            for t in times:
-                                row_data = {"Agent": f"Agent_{i}", "Time": t}
-                                for d in range(1, days_in_month+1):
-                                    tasks = schedule_matrix[d][t]
-                                    row_data[str(d)] = tasks[i-1] if i <= len(tasks) else ""
-                                rows.append(row_data)
-                        
-                        df_opt = pd.DataFrame(rows)
-                        csv = df_opt.to_csv(index=False).encode('utf-8')
-                        st.download_button("📥 Download Forecast-Optimized Schedule", data=csv, file_name=f"Optimized_Schedule_{target_country}_{y_sel}_{m_sel}.csv", mime="text/csv")
-                        st.success("Optimization Complete! Download the template, change generic 'Agent_X' names to real staff, and upload below.")
+                    # Runs in the background (wfm.jobs); the result stays downloadable from this session until the next run.
+                    start_job("roster", roster_job, resources(), f_month, int(y_sel), int(m_sel), target_country, intraday_profiles(), label=f"Roster {target_country} {y_sel}-{m_sel:02d}")
+                    job, running = session_job("roster"), True
+        if running: poll_job(job['id'])
+        elif job is not None and job['status'] == "done":
+            plan, r = job['result']["plan"], job['result']
+            c1, c2, c3, c4 = st.columns(4)
+            c1.metric("Agents", f"{plan['agents']:,}")
+            c2.metric("Coverage", f"{plan['coverage_pct']:.1%}")
+            c3.metric("Paid Hours", f"{plan['paid_hours']:,.0f}", f"{plan['paid_hours'] - plan['required_hours']:+,.0f} vs required", delta_color="inverse")
+            c4.metric("Shifts", f"{len(plan['shifts']):,}")
+            st.download_button("📥 Download Forecast-Optimized Schedule", data=r["csv"], file_name=f"Optimized_Schedule_{r['country']}_{r['year']}_{r['month']}.csv", mime="text/csv")
+            st.success("Optimization Complete! Download the template, change generic 'Agent_X' names to real staff, and upload below.")
+        elif job is not None and job['status'] == "failed": st.error(f"Roster generation failed: {job['error']}")
+        elif job is not None and job['status'] == "cancelled": st.info("Roster generation was cancelled.")
         
         st.divider()
         st.write("### Option B: Upload Completed Roster")
         up_sch = st.file_uploader("Upload Populated Schedule CSV", type="csv")
         if up_sch:
-            df_up = pd.read_csv(up_sch)
-            df_up['Country'] = target_country
-            df_up['YearMonth'] = f"{y_sel}-{str(m_sel).zfill(2)}"
-            
-            st.session_state.schedule_db = pd.concat([st.session_state.schedule_db, df_up], ignore_index=True)
-            # --- CRITICAL BUG FIX: DEDUPLICATE THE DATABASE ON UPLOAD ---
-            st.session_state.schedule_db.drop_duplicates(subset=['Country', 'YearMonth', 'Agent', 'Time'], keep='last', inplace=True)
+            try:
+                df_up = template_rows(up_sch, target_country, f"{y_sel}-{str(m_sel).zfill(2)}")
+            except ValueError as e:
+                st.error(f"Upload Failed: {e}")
+                st.stop()
             
+            # Deduplicated on (Country, YearMonth, Agent, Time) within the uploaded month only (wfm.schedule).
             try:
-                conn.update(worksheet="schedule_db", data=st.session_state.schedule_db)
+                upsert_table("schedule_db", lambda sd: merge_months(sd, df_up), df_up)
                 st.success(f"Schedule for {target_country} successfully uploaded.")
+            except TableUnavailable:
+                st.error("schedule_db could not be read from Google Sheets; nothing was saved. Try again shortly.")
             except:
-                st.warning("Data saved to session memory (Google Sheets API Timeout).")
+                st.warning("Data saved to shared memory (Google Sheets API Timeout).")
 
 elif menu == "Exception Management":
     render_header("Live Exceptions")
@@ -511,12 +692,23 @@ elif menu == "Exception Management":
         d_in = st.number_input("Duration (Minutes)", value=30, min_value=1, step=30)
         
         if st.form_submit_button("Log Exception"):
-            new_e = pd.DataFrame([[ct_in, exc_date.strftime("%Y-%m-%d"), exc_time, agt_in, t_in, d_in, ""]], columns=st.session_state.exception_logs.columns)
-            st.session_state.exception_logs = pd.concat([st.session_state.exception_logs, new_e], ignore_index=True)
-            try: conn.update(worksheet="exception_logs", data=st.session_state.exception_logs)
-            except: pass
-            st.success("Exception logged and mapped to Roster.")
-    st.dataframe(st.session_state.exception_logs, use_container_width=True)
+            new_e = pd.DataFrame([[ct_in, exc_date.strftime("%Y-%m-%d"), exc_time, agt_in, t_in, d_in, ""]], columns=TABLE_COLUMNS["exception_logs"])
+            shared = get_shared_tables()
+            try:
+                shared.load("exception_logs")
+                with shared.lock:
+                    old_version = shared.version("exception_logs")
+                    try: append_table("exception_logs", new_e)
+                    finally:
+                        # The row is published even if the push fails, so the overlay shows it either way.
+                        if shared.version("exception_logs") != old_version:
+                            get_exception_index().apply_import(new_e, old_version, shared.version("exception_logs"))
+                st.success("Exception logged and mapped to Roster.")
+            except TableUnavailable:
+                st.error("exception_logs could not be read from Google Sheets; the exception was not logged. Try again shortly.")
+            except PUSH_ERRORS:
+                st.warning("Exception logged and mapped to Roster, but Google Sheets did not accept it (API timeout); it is pushed with the next change.")
+    st.dataframe(table("exception_logs"), use_container_width=True)
 
 elif menu == "Capacity Planner (Erlang)":
     render_header("Capacity & Headcount Plan")
@@ -532,13 +724,42 @@ elif menu == "Capacity Planner (Erlang)":
     
     st.divider()
     st.write("### 12-Month Projected Headcount Plan")
-    f_db = st.session_state.forecast_db
+    f_db = table("forecast_db")
     if not f_db.empty:
-        f_db['Date_Str'] = pd.to_datetime(f_db['Date']).dt.strftime('%Y-%m-%d')
-        daily_hc = f_db.groupby(['Date_Str', 'Country'])['Req_FTE'].sum().reset_index()
+        daily_hc = f_db.groupby([f_db['Date'].dt.normalize().rename('Date_Str'), 'Country'], observed=True)['Req_FTE'].sum().reset_index()
+        daily_hc['Date_Str'] = daily_hc['Date_Str'].dt.strftime('%Y-%m-%d')
         daily_hc['Required_Headcount'] = np.ceil(daily_hc['Req_FTE'] / 16) 
         pivot_hc = daily_hc.pivot(index='Date_Str', columns='Country', values='Required_Headcount').fillna(0).astype(int)
         st.dataframe(pivot_hc, use_container_width=True, height=400)
+        
+        st.divider()
+        st.write("### What-if Scenarios")
+        # Every combination is restaffed against forecast_db in a process pool (wfm.scenarios); results are cached per scenario.
+        c1, c2, c3, c4 = st.columns(4)
+        aht_opts = c1.multiselect("AHT Change %", [-20, -10, -5, 0, 5, 10, 20], default=[-10, 0, 10])
+        sl_opts = c2.multiselect("Service Level %", [70, 80, 85, 90, 95], default=[80, 90])
+        sh_opts = c3.multiselect("Shrinkage %", [10, 15, 20, 25, 30, 35], default=[15, 20, 25, 30])
+        gr_opts = c4.multiselect("Annual Volume Growth %", [-10, 0, 5, 10, 20], default=[0, 5, 10])
+        hourly_cost = st.number_input("Loaded Cost per Agent Hour", value=20.0, min_value=0.0, step=1.0)
+        scenarios = scenario_grid([1 + a / 100 for a in aht_opts], [s / 100 for s in sl_opts], [h / 100 for h in sh_opts], [g / 100 for g in gr_opts], hourly_cost=hourly_cost)
+        if st.button(f"🧪 Run {len(scenarios)} Scenarios", disabled=not scenarios):
+            shared = get_shared_tables()
+            with st.spinner("Restaffing the forecast for every scenario..."):
+                inputs = scenario_inputs(f_db, series_baselines(table("master_data").dropna(subset=['Date']))['AHT'],
+                                         lambda keys: intraday_profiles().curves(keys, SLOT_MINUTES), SLOT_MINUTES)
+                key = (shared.version("forecast_db"), shared.version("master_data"), SLOT_MINUTES)
+                with metrics.timer("scenarios.run", size=len(scenarios)):
+                    st.session_state.scenario_table = get_scenario_engine().run(inputs, scenarios, key=key)
+        if 'scenario_table' in st.session_state:
+            results = st.session_state.scenario_table
+            overall = results[results['Country'] == 'All'].drop(columns=['Country']).sort_values('Cost').set_index('Scenario')
+            fmt = {'aht_factor': '{:.2f}', 'target_sl': '{:.0%}', 'shrinkage': '{:.0%}', 'growth': '{:+.0%}', 'volume_factor': '{:.2f}',
+                   'hourly_cost': '{:,.2f}', 'Avg_Headcount': '{:,.1f}', 'Peak_Headcount': '{:,}', 'Agent_Hours': '{:,.0f}',
+                   'Cost': '{:,.0f}', 'Expected_SL': '{:.1%}'}
+            st.dataframe(overall.style.format(fmt), use_container_width=True)
+            with st.expander("Per-market breakdown"):
+                st.dataframe(results[results['Country'] != 'All'].style.format(fmt), use_container_width=True, hide_index=True)
+            st.download_button("📥 Download Scenario Comparison", data=results.to_csv(index=False).encode('utf-8'), file_name="WFM_Scenarios.csv", mime="text/csv")
     else: st.info("No forecast available. Generate a forecast first.")
 
 elif menu == "Admin Panel":
@@ -549,24 +770,56 @@ elif menu == "Admin Panel":
         n_r = st.selectbox("Role Assignment", ["Admin", "Manager", "User"])
         if st.form_submit_button("Provision Access"):
             if n_e and n_p:
-                new_u = pd.DataFrame([{"email": n_e, "password": n_p, "role": n_r}])
-                st.session_state.user_db = pd.concat([st.session_state.user_db, new_u], ignore_index=True)
-                conn.update(worksheet="user_db", data=st.session_state.user_db)
-                st.success(f"Access granted to {n_e}.")
+                # Stored as a PBKDF2 hash; the temporary password itself never reaches the sheet.
+                new_u = pd.DataFrame([{"email": n_e, "password": hash_password(n_p), "role": n_r}])
+                try:
+                    update_table("user_db", lambda db: pd.concat([db, new_u], ignore_index=True))
+                    st.success(f"Access granted to {n_e}.")
+                except TableUnavailable:
+                    st.error("user_db could not be read from Google Sheets; no access was granted. Try again shortly.")
             else:
                 st.error("Email and Password cannot be empty.")
-    st.dataframe(st.session_state.user_db[['email', 'role']], use_container_width=True)
+    st.dataframe(table("user_db")[['email', 'role']], use_container_width=True)
 
 elif menu == "System Status":
     render_header("Infrastructure Health")
+    ops = metrics.snapshot()
+    sheets = {k: v for k, v in ops.items() if k.startswith("sheets.")}
+    failed = sum(v['errors'] for v in sheets.values())
+    reads = ops.get("sheets.read")
     c1, c2, c3 = st.columns(3)
-    c1.metric("Cloud Link", "Stable")
-    c2.metric("Database Rows", len(st.session_state.master_data))
-    c3.metric("Service Latency", "12ms")
+    c1.metric("Cloud Link", "Stable" if not failed else "Degraded", f"{failed:,} failed Sheets calls" if failed else None, delta_color="inverse")
+    c2.metric("Database Rows", len(table("master_data")))
+    c3.metric("Sheets Read p95", f"{reads['p95_ms']:,.0f}ms" if reads else "n/a")
+    
+    cache_stats = get_staffing_cache().stats()
+    c1, c2, c3 = st.columns(3)
+    c1.metric("Staffing Cache Entries", f"{cache_stats['entries']:,} / {cache_stats['max_entries']:,}")
+    c2.metric("Staffing Cache Hits / Misses", f"{cache_stats['hits']:,} / {cache_stats['misses']:,}")
+    c3.metric("Staffing Cache Hit Rate", f"{cache_stats['hit_rate']*100:.1f}%")
+    
+    st.write("### Background Jobs")
+    jobs = get_job_runner().jobs()
+    if jobs:
+        st.dataframe(pd.DataFrame([j.snapshot() for j in jobs]).drop(columns=['result']).style.format({'progress': '{:.0%}', 'seconds': '{:.1f}'}), use_container_width=True, hide_index=True)
+    else: st.info("No background jobs have run since the server started.")
+    
+    st.write("### Hot-Path Timings")
+    st.caption(f"p50/p95/max over the last {metrics.capacity:,} calls per operation; counts, time and rows since {datetime.fromtimestamp(metrics.started):%Y-%m-%d %H:%M}.")
+    if ops:
+        timings = pd.DataFrame.from_dict(ops, orient='index').drop(columns=['last_call'])
+        st.dataframe(timings.style.format({'p50_ms': '{:,.1f}', 'p95_ms': '{:,.1f}', 'max_ms': '{:,.1f}', 'total_s': '{:,.2f}', 'rows_total': '{:,.0f}', 'rows_p50': '{:,.0f}'}, na_rep="-"), use_container_width=True)
+    c1, c2 = st.columns(2)
+    c1.download_button("📥 Export Metrics (JSON)", data=metrics.to_json(), file_name="wfm_metrics.json", mime="application/json")
+    c2.download_button("📥 Export Metrics (Prometheus)", data=metrics.to_prometheus(), file_name="wfm_metrics.prom", mime="text/plain")
 
 elif menu == "Reporting Center":
     render_header("Data Exports")
-    if not st.session_state.master_data.empty and 'Country' in st.session_state.master_data.columns:
-        csv = st.session_state.master_data.to_csv(index=False).encode('utf-8')
+    md = table("master_data")
+    if not md.empty and 'Country' in md.columns:
+        csv = md.to_csv(index=False).encode('utf-8')
         st.download_button("Export Global Master Data (CSV)", data=csv, file_name="WFM_Global_Export.csv", mime="text/csv")
     else: st.warning("No data available to export.")
+
+# Script run time per page (runs ended early by st.stop/st.rerun are not recorded).
+metrics.observe(f"page.{menu}", time.perf_counter() - page_t0)
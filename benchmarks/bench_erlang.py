@@ -0,0 +1,62 @@
+# Run from the repo root: python -m benchmarks.bench_erlang
+import math
+import time
+
+import numpy as np
+
+from wfm.erlang import service_level
+
+
+def legacy_erlang_c(vol, aht, target_t, agents):
+    # Verbatim copy of the original app.py implementation, kept as the reference.
+    if vol <= 0: return 1.0
+    intensity = (vol * aht) / 3600
+    if agents <= intensity: return 0.0
+    try:
+        sum_inv = sum([(intensity**i) / math.factorial(i) for i in range(int(agents))])
+        numerator = (intensity**agents / math.factorial(int(agents))) * (agents / (agents - intensity))
+        prob_w = numerator / (sum_inv + numerator)
+        return 1 - (prob_w * math.exp(-(agents - intensity) * (target_t / aht)))
+    except: return 1.0
+
+
+def log_space_erlang_c(vol, aht, target_t, agents):
+    # Independent high-range reference: Erlang-C terms summed with log-sum-exp.
+    if vol <= 0: return 1.0
+    a = vol * aht / 3600
+    if agents <= a: return 0.0
+    logs = [i * math.log(a) - math.lgamma(i + 1) for i in range(int(agents))]
+    log_top = agents * math.log(a) - math.lgamma(agents + 1) + math.log(agents / (agents - a))
+    m = max(logs + [log_top])
+    denom = sum(math.exp(x - m) for x in logs) + math.exp(log_top - m)
+    prob_w = math.exp(log_top - m) / denom
+    return 1 - prob_w * math.exp(-(agents - a) * (target_t / aht))
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    out = fn()
+    return out, time.perf_counter() - t0
+
+
+def main():
+    rng = np.random.default_rng(7)
+    n = 20_000
+    vol = rng.uniform(1, 400, n)
+    aht = rng.uniform(120, 600, n)
+    agents = np.ceil(vol * aht / 3600) + rng.integers(1, 15, n)
+
+    ref, t_legacy = timed(lambda: np.array([legacy_erlang_c(v, a, 20, g) for v, a, g in zip(vol, aht, agents)]))
+    new, t_vec = timed(lambda: service_level(vol, aht, 20, agents))
+    print(f"grid of {n:,} intervals  legacy {t_legacy*1000:8.1f} ms  vectorized {t_vec*1000:8.1f} ms  "
+          f"speedup x{t_legacy / t_vec:,.0f}  max |diff| {np.abs(ref - new).max():.2e}")
+
+    print("large queues (legacy overflows to 1.0):")
+    for v, a, g in [(5000, 300, 430), (12000, 300, 1010), (15000, 300, 1260), (40000, 240, 2700)]:
+        exact = log_space_erlang_c(v, a, 20, g)
+        print(f"  agents {g:5d}  legacy {legacy_erlang_c(v, a, 20, g):.6f}  "
+              f"vectorized {float(service_level(v, a, 20, g)):.6f}  log-space {exact:.6f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# Run from the repo root: python -m benchmarks.bench_exceptions
+import math
+import time
+
+import numpy as np
+import pandas as pd
+
+from wfm.exceptions import ExceptionIndex
+from wfm.intraday import slot_labels
+from wfm.schema import normalize
+
+TIMES = slot_labels(30, "08:00", "20:00")
+REPEAT = 20  # roster reruns timed per setup
+
+
+def legacy_overlay(display_df, exc_db, selected_agent, selected_ym):
+    # Verbatim copy of the original "DYNAMIC EXCEPTION OVERLAY ENGINE" block.
+    if not exc_db.empty and 'Date' in exc_db.columns:
+        agent_exc = exc_db[exc_db['Agent'] == selected_agent]
+        for _, exc in agent_exc.iterrows():
+            exc_date_str = str(exc['Date'])
+            if exc_date_str.startswith(selected_ym):
+                exc_day = str(int(exc_date_str.split('-')[2]))
+                start_time = exc['Start Time']
+                duration = int(exc['Duration (Min)'])
+                exc_type = f"🔴 {exc['Type']}"
+
+                blocks_affected = math.ceil(duration / 30)
+
+                if start_time in display_df.index and exc_day in display_df.columns:
+                    # Safe integer lookup thanks to deduplication
+                    start_idx = display_df.index.get_loc(start_time)
+
+                    for i in range(blocks_affected):
+                        if start_idx + i < len(display_df):
+                            target_time = display_df.index[start_idx + i]
+                            display_df.at[target_time, exc_day] = exc_type
+    return display_df
+
+
+def exception_logs(n=40_000, agents=400, seed=11):
+    """n exceptions for `agents` Spain agents over 2025-2026, some overlapping and some running past closing."""
+    rng = np.random.default_rng(seed)
+    days = pd.date_range("2025-01-01", "2026-12-31", freq="D").strftime("%Y-%m-%d")
+    return normalize(pd.DataFrame({
+        "Country": "Spain",
+        "Date": rng.choice(days, n),
+        "Start Time": rng.choice(TIMES, n),
+        "Agent": [f"Agent_{i}" for i in rng.integers(1, agents + 1, n)],
+        "Type": rng.choice(["Sickness", "Late", "Technical", "Meeting"], n),
+        "Duration (Min)": rng.choice([15, 30, 60, 90, 240, 480], n),
+        "Notes": "",
+    }), "exception_logs")
+
+
+def month_grid():
+    return pd.DataFrame("Phone", index=pd.Index(TIMES, name="Time"), columns=[str(d) for d in range(1, 32)])
+
+
+def main():
+    for n in (2_000, 40_000, 200_000):
+        exc = exception_logs(n)
+        # The agent-month with the most exceptions.
+        ym = exc['Date'].astype(str).str.slice(0, 7)
+        agent, month = exc.groupby([exc['Agent'], ym]).size().idxmax()
+
+        grids = [month_grid() for _ in range(REPEAT)]
+        t0 = time.perf_counter(); ref = [legacy_overlay(g, exc, agent, month) for g in grids][-1]; t_legacy = (time.perf_counter() - t0) / REPEAT
+        index = ExceptionIndex()
+        t0 = time.perf_counter(); index.rebuild(exc, version=1); t_build = time.perf_counter() - t0
+        grids = [month_grid() for _ in range(REPEAT)]
+        t0 = time.perf_counter(); out = [index.overlay(g, ["Spain"], agent, month) for g in grids][-1]; t_view = (time.perf_counter() - t0) / REPEAT
+        pd.testing.assert_frame_equal(ref.astype(str), out.astype(str))
+
+        new = exception_logs(1, seed=n).assign(Agent=agent, Date=f"{month}-15")
+        t0 = time.perf_counter(); index.apply_import(new, 1, 2); t_log = time.perf_counter() - t0
+        pd.testing.assert_frame_equal(legacy_overlay(month_grid(), pd.concat([exc, new]), agent, month).astype(str),
+                                      index.overlay(month_grid(), ["Spain"], agent, month).astype(str))
+        print(f"{n:>7,} exceptions  legacy overlay {t_legacy*1000:7.1f} ms  index build {t_build*1000:6.1f} ms (once)  "
+              f"indexed overlay {t_view*1000:5.2f} ms  log one {t_log*1000:5.2f} ms  identical grids")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# Run from the repo root: python -m benchmarks.bench_ingest
+import io
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_aggregate import synthetic_master_data
+from benchmarks.fake_gsheets import FakeGSheetsConnection
+from wfm.ingest import upsert_csv
+from wfm.persistence import SheetWriter
+from wfm.schema import normalize
+
+KEYS = ["Date", "Country", "Channel"]
+
+
+def legacy_import(file, master, writer=None):
+    # The original Import Data flow: whole file, concat with master, full-table dedup, one sync.
+    new_df = pd.read_csv(file)
+    new_df.columns = new_df.columns.str.strip().str.capitalize()
+    new_df.rename(columns={'Sla': 'SLA', 'Aht': 'AHT', 'Fte': 'FTE'}, inplace=True)
+    new_df = normalize(new_df, "master_data")
+    md = normalize(pd.concat([master, new_df], ignore_index=True).drop_duplicates(subset=KEYS, keep='last'), "master_data")
+    if writer is not None:
+        writer.sync("master_data", md)
+    return md
+
+
+def market_file(master, rows, overlap, seed=11):
+    # A year of a market export: `overlap` corrected intervals already in master, the rest new.
+    upd = master.sample(overlap, random_state=seed).copy()
+    upd["Volume"] = upd["Volume"] + 1
+    new = synthetic_master_data(rows - overlap, seed=seed).drop(columns=["Day"])
+    # Spread over six later years so the file is mostly distinct new intervals.
+    new["Date"] = new["Date"] + pd.to_timedelta(3 * 365 + 365 * (np.arange(len(new)) % 6), unit="D")
+    new = new.drop_duplicates(subset=KEYS)
+    df = pd.concat([upd, new], ignore_index=True)
+    df.columns = ["date", "Country", "channel", "Volume", "Sla", "aht", "FTE"]
+    return df.to_csv(index=False, date_format="%d/%m/%Y %H:%M").encode()
+
+
+def setup(master):
+    conn = FakeGSheetsConnection({"master_data": master})
+    writer = SheetWriter(conn, keys={"master_data": KEYS}, sleep=lambda s: None)
+    writer.track("master_data", conn.read(worksheet="master_data"))
+    return conn, writer
+
+
+def peak_mb(fn):
+    tracemalloc.start()
+    out = fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return out, peak / 2**20
+
+
+def main():
+    md = synthetic_master_data(300_000).drop(columns=["Day"]).drop_duplicates(subset=KEYS, keep="last")
+    md = normalize(md.reset_index(drop=True), "master_data")
+    print(f"master_data {len(md):,} rows")
+    for rows in (400_000, 1_500_000):
+        csv = market_file(md, rows, 50_000)
+        ref, mem_legacy = peak_mb(lambda: legacy_import(io.BytesIO(csv), md))
+        (out, stats), mem_stream = peak_mb(lambda: upsert_csv(io.BytesIO(csv), md))
+        pd.testing.assert_frame_equal(ref.sort_values(KEYS).reset_index(drop=True), out.sort_values(KEYS).reset_index(drop=True), check_categorical=False)
+        # What the import needs beyond the table it returns (which becomes master_data either way).
+        extra = mem_stream - out.memory_usage(deep=True).sum() / 2**20
+        print(f"upload {len(csv) / 2**20:6.1f} MB  peak memory  legacy {mem_legacy:7.1f} MB  streaming {mem_stream:7.1f} MB "
+              f"({extra:5.1f} MB above the result)  tables match ({stats['new']:,} new, {stats['updated']:,} updated)")
+
+    csv = market_file(md, 400_000, 50_000)
+
+    conn, writer = setup(md)
+    t0 = time.perf_counter(); legacy_import(io.BytesIO(csv), md, writer); t_legacy = time.perf_counter() - t0
+    ws = conn.sheets["master_data"]
+    calls_legacy, ws.calls = ws.calls, 0
+
+    conn, writer = setup(md)
+    ws = conn.sheets["master_data"]
+    ws.fail_calls = 3
+    t0 = time.perf_counter(); out, stats = upsert_csv(io.BytesIO(csv), md, writer=writer, chunk_rows=50_000); t_stream = time.perf_counter() - t0
+    print(f"{'import with push':<20} legacy {t_legacy:6.2f} s ({calls_legacy} calls)  streaming {t_stream:6.2f} s ({ws.calls} calls, 3 timeouts)  {stats['pushed']}")
+    assert stats["error"] is None
+    sheet = conn.read(worksheet="master_data")
+    assert len(sheet) == len(out) and set(sheet["Date"].astype(str) + sheet["Country"] + sheet["Channel"]) == \
+        set(out["Date"].dt.strftime("%Y-%m-%d %H:%M:%S") + out["Country"].astype(str) + out["Channel"].astype(str))
+    print("sheet keys verified against the imported table")
+
+    # Non-numeric metric cells anywhere in the file skip their rows; the rest still imports.
+    bad = pd.read_csv(io.BytesIO(market_file(md, 40, 0)), dtype=str)
+    bad.loc[10, "Volume"], bad.loc[25, "aht"] = "1,500", "bad"
+    out, stats = upsert_csv(io.BytesIO(bad.to_csv(index=False).encode()), md, chunk_rows=5)
+    assert stats["error"] is None and stats["rejected"] == 2 and stats["rows"] == len(bad) - 2, stats
+    print(f"{'bad metric cells':<20} {stats['rows']} of {len(bad)} rows imported, {stats['rejected']} rejected")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+# Run from the repo root: python -m benchmarks.bench_intraday
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_seasonal import seasonal_master_data
+from wfm.intraday import IntradayProfiles
+
+
+def groupby_curve(df, country, channel, weekday, open_h=8, close_h=20):
+    # What a page would do without the index: filter master_data and group by slot.
+    rows = df[(df['Country'] == country) & (df['Channel'] == channel) & (df['Date'].dt.dayofweek == weekday)]
+    rows = rows[(rows['Date'].dt.hour >= open_h) & (rows['Date'].dt.hour < close_h)]
+    slot = (rows['Date'].dt.hour - open_h) * 2 + rows['Date'].dt.minute // 30
+    sums = rows.groupby(slot)['Volume'].sum().reindex(range((close_h - open_h) * 2), fill_value=0)
+    return (sums / sums.sum()).to_numpy()
+
+
+def main():
+    df = seasonal_master_data(730)
+    profiles = IntradayProfiles()
+    t0 = time.perf_counter(); profiles.rebuild(df, version=1); t_build = time.perf_counter() - t0
+    print(f"{'rebuild from master_data':<34} {len(df):>9,} rows  {t_build*1000:8.1f} ms  {len(profiles)} series, {profiles.nbytes / 1024:.0f} KB")
+
+    t0 = time.perf_counter(); ref = groupby_curve(df, "Spain", "Phone", 2); t_group = time.perf_counter() - t0
+    profiles.table(30, "08:00", "20:00")
+    t0 = time.perf_counter(); curve = profiles.curve("Spain", "Phone", 2); t_look = time.perf_counter() - t0
+    assert np.allclose(ref, curve)
+    print(f"{'one curve (Spain/Phone/Wed)':<34} groupby {t_group*1000:7.1f} ms  index lookup {t_look*1e6:7.1f} us  curves match")
+    t0 = time.perf_counter(); profiles.table(60, "09:00", "17:00"); t_view = time.perf_counter() - t0
+    print(f"{'new view (60-min slots, 9-17)':<34} {t_view*1000:8.2f} ms for every series and weekday")
+
+    # One import: a new day for every series plus corrections to 5,000 existing intervals.
+    last = df['Date'].max().normalize()
+    new_day = df[df['Date'].dt.normalize() == last].copy()
+    new_day['Date'] += pd.Timedelta(days=1)
+    replaced = df.sample(5000, random_state=3)
+    fixed = replaced.assign(Volume=replaced['Volume'] * 1.5)
+    t0 = time.perf_counter(); profiles.apply_import(pd.concat([new_day, fixed]), 1, 2, replaced=replaced); t_inc = time.perf_counter() - t0
+    after = pd.concat([df.drop(replaced.index), fixed, new_day], ignore_index=True)
+    full = IntradayProfiles()
+    t0 = time.perf_counter(); full.rebuild(after, version=2); t_full = time.perf_counter() - t0
+    assert np.allclose(profiles.curves(full.keys()), full.table())
+    print(f"{'import delta':<34} incremental {t_inc*1000:6.1f} ms  full rebuild {t_full*1000:6.1f} ms  profiles match")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# Run from the repo root: python -m benchmarks.bench_jobs
+import time
+
+from benchmarks.bench_roster import market_month
+from benchmarks.bench_seasonal import seasonal_master_data
+from benchmarks.bench_shifts import MARKETS
+from wfm.forecast import generate_seasonal_forecast
+from wfm.intraday import IntradayProfiles, slot_labels
+from wfm.jobs import CANCELLED, DONE, FINISHED, JobRunner
+from wfm.roster import requirement_matrix
+from wfm.seasonal import SeasonalForecaster
+from wfm.shifts import optimize_shifts
+
+TIMES = slot_labels(30, "08:00", "20:00")
+
+
+def roster(req, channels, progress=None):
+    return optimize_shifts(req, channels, TIMES, first_day="2026-03-01", time_budget=2.0, progress=progress)
+
+
+def roster_job(job, req, channels):
+    return roster(req, channels, progress=job.progress)
+
+
+def forecast_job(job, history, profiles):
+    return generate_seasonal_forecast(history, SeasonalForecaster(), profiles, progress=job.progress)
+
+
+def cancel_when(runner, job_id, fraction):
+    """Cancel the job once it reports `fraction`; returns the milliseconds it took to stop."""
+    while runner.get(job_id).snapshot()["progress"] < fraction:
+        time.sleep(0.001)
+    t0 = time.perf_counter()
+    runner.cancel(job_id)
+    while runner.get(job_id).snapshot()["status"] not in FINISHED:
+        time.sleep(0.001)
+    assert runner.get(job_id).snapshot()["status"] == CANCELLED
+    return (time.perf_counter() - t0) * 1000
+
+
+def main():
+    history = seasonal_master_data(120)
+    profiles = IntradayProfiles()
+    profiles.rebuild(history)
+    months = []
+    for daily in MARKETS.values():
+        f_month = market_month(daily=daily)
+        channels = list(f_month['Channel'].unique())
+        curves = profiles.curves([("Spain", ch) for ch in channels], 30, "08:00", "20:00")
+        months.append((requirement_matrix(f_month, 2026, 3, channels, curves), channels))
+
+    t0 = time.perf_counter()
+    inline = [roster(req, channels) for req, channels in months]
+    t_inline = time.perf_counter() - t0
+
+    runner = JobRunner(max_workers=4)
+    t0 = time.perf_counter()
+    ids = [runner.submit("roster", roster_job, req, channels, label=f"roster {i}") for i, (req, channels) in enumerate(months)]
+    t_submit = time.perf_counter() - t0
+    polls = 0
+    while any(runner.get(i).snapshot()["status"] not in FINISHED for i in ids):
+        time.sleep(0.05)
+        polls += 1
+    t_jobs = time.perf_counter() - t0
+    jobs = [runner.get(i).snapshot() for i in ids]
+    assert all(j["status"] == DONE for j in jobs), [j["error"] for j in jobs]
+    for a, j in zip(inline, jobs):
+        assert j["result"]["coverage_pct"] == a["coverage_pct"] == 1.0
+    print(f"{len(months)} rosters  inline (script blocked) {t_inline:5.2f} s  background: submit returns in {t_submit*1000:5.2f} ms, "
+          f"all done after {t_jobs:5.2f} s ({polls} status polls)  same coverage")
+
+    req, channels = months[0]
+    t_roster = cancel_when(runner, runner.submit("roster", roster_job, req, channels, label="cancel me"), 0.3)
+    print(f"cancel a running roster: stopped {t_roster:6.1f} ms after the request")
+    # Cancelled while staffing intervals: the forecast stops at its next batch of series.
+    t0 = time.perf_counter()
+    done = runner.get(runner.submit("forecast", forecast_job, history, profiles))
+    while done.snapshot()["status"] not in FINISHED:
+        time.sleep(0.001)
+    t_forecast = time.perf_counter() - t0
+    t_cancel = cancel_when(runner, runner.submit("forecast", forecast_job, history, profiles, label="cancel me"), 0.45)
+    print(f"cancel a running forecast: stopped {t_cancel:6.1f} ms after the request (a whole forecast takes {t_forecast*1000:6.1f} ms)  {runner.stats()}")
+    runner.shutdown()
+
+
+if __name__ == "__main__":
+    main()
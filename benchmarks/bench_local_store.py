@@ -0,0 +1,56 @@
+# Run from the repo root: python -m benchmarks.bench_local_store
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.bench_aggregate import synthetic_master_data
+from benchmarks.fake_gsheets import FakeGSheetsConnection
+from wfm.local_store import LocalStore, SheetSource
+
+TABLES = ["master_data", "exception_logs"]
+
+
+def sync(label, store, source, conn, **kwargs):
+    for ws in conn.sheets.values():
+        ws.cells_read = 0
+    t0 = time.perf_counter()
+    frames = store.refresh(source, TABLES, **kwargs)
+    t = time.perf_counter() - t0
+    read = sum(ws.cells_read for ws in conn.sheets.values())
+    print(f"{label:<38} {t*1000:8.1f} ms  sheet cells read {read:>10,}  {store.last_refresh}")
+    return frames
+
+
+def main():
+    md = synthetic_master_data(300_000).drop(columns=["Day"])
+    md["Date"] = md["Date"].dt.strftime("%Y-%m-%d %H:%M")
+    exc = pd.DataFrame([["Spain", "2026-01-05", "09:00", f"Agent_{i}", "Sickness", 30, ""] for i in range(2000)],
+                       columns=["Country", "Date", "Start Time", "Agent", "Type", "Duration (Min)", "Notes"])
+    conn = FakeGSheetsConnection({"master_data": md, "exception_logs": exc})
+    source = SheetSource(conn)
+    with tempfile.TemporaryDirectory() as root:
+        store = LocalStore(root)
+        sync("cold start, empty mirror", store, source, conn)
+        sync("restart, sheet unchanged", store, source, conn)
+
+        # Another writer appends 1,000 intervals and one exception to the sheet.
+        conn.sheets["master_data"].append_rows(md.tail(1000).values.tolist())
+        conn.sheets["exception_logs"].append_rows([["Spain", "2026-01-06", "10:00", "Agent_1", "Late", 30, ""]])
+        frames = sync("sync after 1,001 appended rows", store, source, conn)
+        assert len(frames["master_data"]) == len(md) + 1000 and len(frames["exception_logs"]) == len(exc) + 1
+
+        # Rows removed in the sheet: the tail check fails and the table is re-read.
+        conn.sheets["exception_logs"].grid.pop()
+        conn.spreadsheet.version += 1
+        frames = sync("sync after a deleted row", store, source, conn)
+        assert len(frames["exception_logs"]) == len(exc)
+
+        t0 = time.perf_counter()
+        full = conn.read(worksheet="master_data")
+        print(f"{'reference: conn.read of master_data':<38} {(time.perf_counter() - t0)*1000:8.1f} ms  rows {len(full):,}")
+        print("dtypes:", dict(frames["master_data"].dtypes.astype(str)))
+
+
+if __name__ == "__main__":
+    main()
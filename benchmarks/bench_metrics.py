@@ -0,0 +1,62 @@
+# Run from the repo root: python -m benchmarks.bench_metrics
+import json
+import time
+
+import numpy as np
+
+from benchmarks.fake_gsheets import FakeGSheetsConnection
+from benchmarks.bench_aggregate import synthetic_master_data
+from wfm.metrics import InstrumentedConnection, Metrics
+from wfm.persistence import SheetWriter
+from wfm.schema import normalize
+from wfm.staffing_cache import StaffingCache
+
+CALLS = 100_000
+
+
+def main():
+    # Overhead on the cheapest instrumented call: a staffing cache hit.
+    cache = StaffingCache()
+    metrics = Metrics(capacity=1024)
+    cache.required_fte(120.0, 300.0, 0.8)
+    t0 = time.perf_counter()
+    for _ in range(CALLS):
+        cache.required_fte(120.0, 300.0, 0.8)
+    t_plain = (time.perf_counter() - t0) / CALLS
+    t0 = time.perf_counter()
+    for _ in range(CALLS):
+        with metrics.timer("erlang.required_fte"):
+            cache.required_fte(120.0, 300.0, 0.8)
+    t_timed = (time.perf_counter() - t0) / CALLS
+    print(f"{'staffing cache hit':<28} plain {t_plain*1e6:5.2f} us  timed {t_timed*1e6:5.2f} us  (+{(t_timed - t_plain)*1e6:.2f} us per call)")
+
+    # Percentiles come from the last `capacity` observations.
+    rng = np.random.default_rng(1)
+    samples = rng.lognormal(-4, 1, 5_000)
+    m = Metrics(capacity=1024)
+    for s in samples:
+        m.observe("op", s, size=10)
+    snap = m.snapshot()["op"]
+    assert snap["count"] == len(samples) and np.isclose(snap["total_s"], samples.sum()) and snap["rows_total"] == 10 * len(samples)
+    assert np.isclose(snap["p95_ms"], np.percentile(samples[-1024:], 95) * 1000)
+    print(f"{'ring buffer':<28} {snap['count']:,} calls  p50 {snap['p50_ms']:.1f} ms  p95 {snap['p95_ms']:.1f} ms  (last 1,024)  totals over all calls")
+
+    # Every Sheets call of a sync through the instrumented connection.
+    md = normalize(synthetic_master_data(20_000).drop(columns=["Day"]), "master_data").drop_duplicates(["Date", "Country", "Channel"])
+    conn = InstrumentedConnection(FakeGSheetsConnection({"master_data": md}), metrics)
+    writer = SheetWriter(conn, keys={"master_data": ["Date", "Country", "Channel"]}, sleep=lambda s: None)
+    conn.read(worksheet="master_data", ttl="0")
+    writer.track("master_data", md)  # as sync_from_cloud does, with the typed frame
+    changed = md.copy()
+    changed.loc[changed.index[:700], "Volume"] += 1
+    writer.sync("master_data", changed)
+    ops = metrics.snapshot()
+    print(f"{'instrumented Sheets sync':<28} " + "  ".join(f"{k} x{v['count']} ({v['rows_total']:,.0f} rows)" for k, v in ops.items() if k.startswith("sheets.")))
+
+    prom = metrics.to_prometheus()
+    assert 'wfm_latency_seconds{op="sheets.read",quantile="0.95"}' in prom and json.loads(metrics.to_json())["operations"]
+    print(f"{'exports':<28} Prometheus {len(prom.splitlines())} lines  JSON {len(metrics.to_json()):,} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+# Run from the repo root: python -m benchmarks.bench_persistence
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_aggregate import synthetic_master_data
+from benchmarks.fake_gsheets import FakeGSheetsConnection
+from wfm.persistence import SheetWriter
+
+SHEET_KEYS = {"master_data": ["Date", "Country", "Channel"], "exception_logs": None}
+
+
+def report(label, ws, t, result=None):
+    print(f"{label:<40} api calls {ws.calls:>5}  cells written {ws.cells_written:>10,}  {t*1000:8.1f} ms  {result or ''}")
+    ws.calls = ws.cells_written = 0
+
+
+def check(conn, name, df):
+    sheet = conn.read(worksheet=name)
+    expected = df.astype(object).where(df.notna(), "").astype(str).reset_index(drop=True)
+    assert sheet.astype(str).equals(expected), f"{name} diverged from the local frame"
+
+
+def main():
+    md = synthetic_master_data(200_000).drop(columns=["Day"])
+    md["Date"] = md["Date"].dt.strftime("%Y-%m-%d %H:%M")
+    md = md.drop_duplicates(subset=["Date", "Country", "Channel"], keep="last").reset_index(drop=True)
+    exc = pd.DataFrame([["Spain", "2026-01-05", "09:00", f"Agent_{i}", "Sickness", 30, ""] for i in range(5000)],
+                       columns=["Country", "Date", "Start Time", "Agent", "Type", "Duration (Min)", "Notes"])
+    conn = FakeGSheetsConnection({"master_data": md, "exception_logs": exc})
+    writer = SheetWriter(conn, keys=SHEET_KEYS, sleep=lambda s: None)
+    writer.track("master_data", conn.read(worksheet="master_data"))
+    writer.track("exception_logs", conn.read(worksheet="exception_logs"))
+    ws_md, ws_exc = conn.sheets["master_data"], conn.sheets["exception_logs"]
+
+    # Baseline: today's conn.update of the full table.
+    t0 = time.perf_counter(); conn.update(worksheet="exception_logs", data=exc); report("full rewrite, exception_logs", ws_exc, time.perf_counter() - t0)
+    t0 = time.perf_counter(); conn.update(worksheet="master_data", data=md); report("full rewrite, master_data", ws_md, time.perf_counter() - t0)
+
+    new_e = pd.DataFrame([["Spain", "2026-01-06", "10:00", "Agent_1", "Late", 30, ""]], columns=exc.columns)
+    exc = pd.concat([exc, new_e], ignore_index=True)
+    t0 = time.perf_counter(); res = writer.sync("exception_logs", exc); report("log one exception", ws_exc, time.perf_counter() - t0, res)
+    check(conn, "exception_logs", exc)
+    # What Log Exception does: only the new row is converted, hashed and appended.
+    new_e = new_e.assign(Agent="Agent_2")
+    exc = pd.concat([exc, new_e], ignore_index=True)
+    t0 = time.perf_counter(); res = writer.append("exception_logs", new_e); report("log one exception, append only", ws_exc, time.perf_counter() - t0, res)
+    check(conn, "exception_logs", exc)
+
+    # One market file: 2,000 new intervals plus 500 corrected existing ones, with flaky API.
+    rng = np.random.default_rng(3)
+    upd = md.sample(500, random_state=1).copy()
+    upd["Volume"] = upd["Volume"] + 1
+    new = md.sample(2000, random_state=2).copy()
+    new["Date"] = "2030-01-01 " + pd.Series(rng.integers(10, 99, 2000)).astype(str).values + ":" + pd.Series(np.arange(2000) % 60).astype(str).str.zfill(2).values
+    new = new.drop_duplicates(subset=["Date", "Country", "Channel"])
+    md = pd.concat([md, upd, new], ignore_index=True).drop_duplicates(subset=["Date", "Country", "Channel"], keep="last")
+    ws_md.fail_calls = 2
+    t0 = time.perf_counter(); res = writer.sync("master_data", md); report("import one market file (2 timeouts)", ws_md, time.perf_counter() - t0, res)
+    sheet = conn.read(worksheet="master_data").set_index(["Date", "Country", "Channel"]).sort_index()
+    local = md.set_index(["Date", "Country", "Channel"]).sort_index()
+    assert sheet.astype(str).equals(local.astype(object).astype(str)), "master_data diverged from the local frame"
+    print("sheet contents verified against local frames")
+
+    # Failures: an append that times out after Sheets applied it, a 429, and a rewrite dying part-way.
+    writer = SheetWriter(conn, keys=SHEET_KEYS, chunk_rows=500, sleep=lambda s: None)
+    writer.track("exception_logs", conn.read(worksheet="exception_logs"))
+    for label, mode in (("append, timeout after applying", "fail_after_calls"), ("append, 429 rate limit", "rate_limit_calls")):
+        more = pd.DataFrame([["Poland", "2026-01-07", "11:00", f"Agent_{i}", "Late", 15, ""] for i in range(1200)], columns=exc.columns)
+        exc = pd.concat([exc, more], ignore_index=True)
+        setattr(ws_exc, mode, 1)
+        t0 = time.perf_counter(); res = writer.sync("exception_logs", exc); report(label, ws_exc, time.perf_counter() - t0, res)
+        check(conn, "exception_logs", exc)
+
+    rows_before = len(conn.read(worksheet="exception_logs"))
+    exc = exc.iloc[1000:].reset_index(drop=True)  # dropped rows: a rewrite
+    batch_update, calls = ws_exc.batch_update, []
+    def dying(*args, **kwargs):
+        calls.append(1)
+        if len(calls) == 4: raise ConnectionError("simulated process crash")
+        return batch_update(*args, **kwargs)
+    ws_exc.batch_update, writer.max_retries = dying, 1
+    try:
+        writer.sync("exception_logs", exc)
+    except ConnectionError:
+        pass
+    ws_exc.batch_update, writer.max_retries = batch_update, 5
+    assert len(conn.read(worksheet="exception_logs")) == rows_before and not writer.is_tracked("exception_logs"), "rewrite truncated the sheet"
+    t0 = time.perf_counter(); res = writer.sync("exception_logs", exc); report("rewrite after one died part-way", ws_exc, time.perf_counter() - t0, res)
+    check(conn, "exception_logs", exc)
+
+    # A sheet that was never read (its load failed and the app fell back to an empty table) is not overwritten.
+    writer = SheetWriter(conn, keys=SHEET_KEYS, sleep=lambda s: None)
+    try:
+        writer.sync("exception_logs", exc.tail(1))
+        raise AssertionError("sync() rewrote a worksheet it never read")
+    except ValueError:
+        pass
+    check(conn, "exception_logs", exc)
+    print("failed writes left no duplicates and no truncated sheet; an unread sheet was not overwritten")
+
+
+if __name__ == "__main__":
+    main()
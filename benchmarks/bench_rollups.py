@@ -0,0 +1,85 @@
+# Run from the repo root: python -m benchmarks.bench_rollups
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+from benchmarks.bench_seasonal import seasonal_master_data
+from wfm.aggregate import aggregate_wfm
+from wfm.rollups import DailyRollups, downsample
+from wfm.schema import normalize
+
+SELECTIONS = [["Spain"], ["Spain", "Mexico", "Poland"], None]  # None: every market
+REPEAT = 5
+
+
+def legacy_dashboard(df, selected_markets):
+    # The original Dashboard body: filter, fill, KPIs, daily groupby and the area chart.
+    df_f = df[df['Country'].isin(selected_markets)]
+    df_f = df_f.fillna({c: 0 for c in ['Volume', 'SLA', 'AHT', 'FTE']})
+    tot_v = df_f['Volume'].sum()
+    avg_fte = df_f['FTE'].mean()
+    sl_w = np.average(df_f['SLA'], weights=df_f['Volume']) if tot_v > 0 else 0
+    aht_w = np.average(df_f['AHT'], weights=df_f['Volume']) if tot_v > 0 else 0
+    daily_agg = aggregate_wfm(df_f, [df_f['Date'].dt.normalize().rename('Day'), 'Channel'])
+    fig = px.area(daily_agg, x='Day', y='Volume', color='Channel', title="Volume Demand by Channel", template="plotly_white")
+    return (f"{tot_v:,.0f}", f"{sl_w*100:.1f}%", f"{int(aht_w)}s", f"{avg_fte:,.1f}"), daily_agg, fig
+
+
+def rollup_dashboard(rollups, selected_markets):
+    # The figure itself is cached per (master_data version, market set) in the app.
+    kpi = rollups.totals(selected_markets)
+    daily_agg = rollups.daily(selected_markets, by='Channel')
+    return (f"{kpi['Volume']:,.0f}", f"{kpi['SLA']*100:.1f}%", f"{int(kpi['AHT'])}s", f"{kpi['FTE']:,.1f}"), daily_agg
+
+
+def area(daily_agg, max_points=None):
+    if max_points:
+        daily_agg = downsample(daily_agg, max_points, by='Channel')
+    return px.area(daily_agg, x='Day', y='Volume', color='Channel', title="Volume Demand by Channel", template="plotly_white")
+
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    for _ in range(REPEAT):
+        out = fn(*args)
+    return out, (time.perf_counter() - t0) / REPEAT
+
+
+def main():
+    md = normalize(seasonal_master_data(730), "master_data")
+    markets = sorted(md['Country'].unique())
+    rollups = DailyRollups()
+    t0 = time.perf_counter(); rollups.rebuild(md, version=1); t_build = time.perf_counter() - t0
+    print(f"{'rebuild from master_data':<30} {len(md):>9,} rows  {t_build*1000:7.1f} ms (once)  {rollups.nbytes / 1024:.0f} KB")
+
+    for sel in SELECTIONS:
+        sel = sel or markets
+        (kpi_ref, daily_ref, _), t_legacy = timed(legacy_dashboard, md, sel)
+        (kpi, daily), t_rollup = timed(rollup_dashboard, rollups, sel)
+        _, t_fig = timed(area, daily)
+        fig, t_down = timed(area, daily, 200)
+        # The legacy total is summed in float32; the rollups hold exact float64 sums.
+        exact = md.loc[md['Country'].isin(sel), 'Volume'].astype(float).sum()
+        assert kpi[1:] == kpi_ref[1:] and kpi[0] == f"{exact:,.0f}", (kpi, kpi_ref)
+        assert np.allclose(daily_ref['Volume'], daily['Volume']) and (daily_ref['Day'].to_numpy() == daily['Day'].to_numpy()).all()
+        print(f"{len(sel)} market(s)  legacy {t_legacy*1000:6.1f} ms  rollups {t_rollup*1000:5.1f} ms + figure {t_fig*1000:5.1f} ms "
+              f"({len(fig.data[0].x)} points/channel downsampled: {t_down*1000:5.1f} ms; cached: 0)  same KPIs and series")
+
+    # One import: a new day for every series plus corrections to 5,000 existing intervals.
+    last = md['Date'].max().normalize()
+    new_day = md[md['Date'].dt.normalize() == last].assign(Date=lambda d: d['Date'] + pd.Timedelta(days=1))
+    replaced = md.sample(5000, random_state=3)
+    fixed = replaced.assign(Volume=replaced['Volume'] * 1.5)
+    t0 = time.perf_counter(); rollups.apply_import(pd.concat([new_day, fixed]), 1, 2, replaced=replaced); t_inc = time.perf_counter() - t0
+    after = pd.concat([md.drop(replaced.index), fixed, new_day], ignore_index=True)
+    full = DailyRollups()
+    t0 = time.perf_counter(); full.rebuild(after, version=2); t_full = time.perf_counter() - t0
+    assert np.allclose(list(rollups.totals(markets).values()), list(full.totals(markets).values()))
+    pd.testing.assert_frame_equal(rollups.daily(markets), full.daily(markets))
+    print(f"{'import delta':<30} incremental {t_inc*1000:6.1f} ms  full rebuild {t_full*1000:6.1f} ms  rollups match")
+
+
+if __name__ == "__main__":
+    main()
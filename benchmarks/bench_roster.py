@@ -0,0 +1,81 @@
+# Run from the repo root: python -m benchmarks.bench_roster
+import calendar
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_seasonal import seasonal_master_data
+from wfm.intraday import IntradayProfiles, slot_labels
+from wfm.roster import requirement_matrix, roster_template
+from wfm.schema import normalize
+from wfm.staffing_cache import StaffingCache
+
+CHANNELS = ["Phone", "Chat", "WhatsApp", "Email"]
+
+
+def legacy_roster(f_month, y_sel, m_sel, times, curves, get_required_fte):
+    # Verbatim copy of the original "Generate AI Roster" loop (curves per channel -> [weekday][slot]).
+    days_in_month = calendar.monthrange(int(y_sel), int(m_sel))[1]
+    schedule_matrix = {d: {t: [] for t in times} for d in range(1, days_in_month+1)}
+    max_agents = 0
+
+    for d in range(1, days_in_month+1):
+        date_str = f"{y_sel}-{str(m_sel).zfill(2)}-{str(d).zfill(2)}"
+        day_fcst = f_month[f_month['Date'] == date_str]
+        weekday = calendar.weekday(int(y_sel), int(m_sel), d)
+        for i, t in enumerate(times):
+            agents_needed = []
+            for _, row in day_fcst.iterrows():
+                ch = row['Channel']
+                int_vol = row['Forecast_Volume'] * curves[ch][weekday][i]
+                req = get_required_fte(int_vol, 300, 0.80)
+                agents_needed.extend([ch] * req)
+            schedule_matrix[d][t] = agents_needed
+            if len(agents_needed) > max_agents: max_agents = len(agents_needed)
+
+    if max_agents == 0: max_agents = 10
+    rows = []
+    for i in range(1, max_agents + 1):
+        for t in times:
+            row_data = {"Agent": f"Agent_{i}", "Time": t}
+            for d in range(1, days_in_month+1):
+                tasks = schedule_matrix[d][t]
+                row_data[str(d)] = tasks[i-1] if i <= len(tasks) else ""
+            rows.append(row_data)
+    return pd.DataFrame(rows)
+
+
+def market_month(year=2026, month=3, daily=(42_000, 9_000, 6_000, 2_500), seed=5):
+    """One large market's forecast_db rows for a month (daily volume per channel with a weekday swing)."""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(f"{year}-{month:02d}-01", periods=calendar.monthrange(year, month)[1], freq="D")
+    rows = [(d, "Spain", ch, v * rng.uniform(0.8, 1.2), 0) for d in dates for ch, v in zip(CHANNELS, daily)]
+    return normalize(pd.DataFrame(rows, columns=["Date", "Country", "Channel", "Forecast_Volume", "Req_FTE"]), "forecast_db")
+
+
+def main():
+    profiles = IntradayProfiles()
+    profiles.rebuild(seasonal_master_data(120))
+    times = slot_labels(30, "08:00", "20:00")
+    f_month = market_month()
+    channels = list(f_month['Channel'].unique())
+    curves = profiles.curves([("Spain", ch) for ch in channels], 30, "08:00", "20:00")
+
+    t0 = time.perf_counter()
+    ref = legacy_roster(f_month, 2026, 3, times, dict(zip(channels, curves)), StaffingCache().required_fte).to_csv(index=False)
+    t_legacy = time.perf_counter() - t0
+    cache = StaffingCache()
+    for label in ("cold staffing cache", "warm staffing cache"):
+        t0 = time.perf_counter()
+        req = requirement_matrix(f_month, 2026, 3, channels, curves, solve=cache.required_fte_many)
+        t_req = time.perf_counter() - t0
+        csv = roster_template(req, channels, times).to_csv(index=False)
+        t_all = time.perf_counter() - t0
+        assert csv == ref
+        print(f"{label:<20} {int(req.sum(axis=2).max())} agents x {len(times)} slots x {req.shape[0]} days  "
+              f"legacy {t_legacy:6.2f} s  matrix {t_req*1000:6.1f} ms  matrix+CSV {t_all*1000:6.1f} ms  identical CSV")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# Run from the repo root: python -m benchmarks.bench_scenarios
+import os
+import signal
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_seasonal import seasonal_master_data
+from wfm.forecast import generate_seasonal_forecast, series_baselines
+from wfm.intraday import IntradayProfiles
+from wfm.scenarios import ScenarioEngine, scenario_grid, scenario_inputs, solve_scenario, summarize
+from wfm.seasonal import SeasonalForecaster
+from wfm.staffing_cache import StaffingCache
+
+
+def one_by_one(inputs, scenarios):
+    """Each scenario solved on its own in this process, as a loop over the grid would."""
+    return pd.concat([summarize(inputs, s, solve_scenario(inputs, s)) for s in scenarios], ignore_index=True)
+
+
+def children(pid, marker=""):
+    # Linux only: direct child processes of pid whose command line contains marker.
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        pids = [int(c) for c in f.read().split()]
+    return [c for c in pids if marker in open(f"/proc/{c}/cmdline").read()]
+
+
+def recovery(inputs, scenarios, ref):
+    """Kill the pool's workers, then its host, between runs; each next run rebuilds and matches."""
+    engine = ScenarioEngine()
+    try:
+        engine.run(inputs, scenarios[:4], key="warm")
+        host = children(os.getpid(), "wfm.scenarios")
+        # The host's pool workers (not its multiprocessing resource tracker), then the host itself.
+        for victims, label, key in ((children(host[0], "spawn_main"), "pool workers", 2), (host, "pool host", 3)):
+            for pid in victims:
+                os.kill(pid, signal.SIGKILL)
+            time.sleep(0.2)
+            t0 = time.perf_counter(); out = engine.run(inputs, scenarios, key=key); t = time.perf_counter() - t0
+            pd.testing.assert_frame_equal(ref, out)
+            print(f"after killing the {label:<13} rerun {t:6.2f} s  same table")
+    finally:
+        engine.shutdown()
+    assert not children(os.getpid(), "wfm.scenarios") and not children(1, "spawn_main"), "pool processes left behind"
+
+
+def main():
+    md = seasonal_master_data(400)
+    profiles = IntradayProfiles()
+    profiles.rebuild(md)
+    forecast = generate_seasonal_forecast(md, SeasonalForecaster(), profiles, solve=StaffingCache().required_fte_many)
+    inputs = scenario_inputs(forecast, series_baselines(md)['AHT'], lambda keys: profiles.curves(keys, 30))
+
+    # The base scenario restaffs the forecast exactly.
+    agents = solve_scenario(inputs, {})[0]
+    req = forecast.pivot_table(index=['Country', 'Channel'], columns='Date', values='Req_FTE', observed=True).to_numpy()
+    assert np.array_equal(agents, req)
+
+    scenarios = scenario_grid((0.9, 1.0, 1.1), (0.8, 0.9), (0.15, 0.2, 0.25, 0.3), (0.0, 0.05, 0.1))
+    print(f"{len(scenarios)} scenarios over {inputs['volume'].shape[0]} series x {inputs['volume'].shape[1]} days, {os.cpu_count()} CPU(s)")
+    t0 = time.perf_counter(); ref = one_by_one(inputs, scenarios); t_loop = time.perf_counter() - t0
+    engine = ScenarioEngine()
+    try:
+        t0 = time.perf_counter(); out = engine.run(inputs, scenarios, key=1); t_engine = time.perf_counter() - t0
+        t0 = time.perf_counter(); again = engine.run(inputs, scenarios, key=1); t_cached = time.perf_counter() - t0
+    finally:
+        engine.shutdown()
+    pd.testing.assert_frame_equal(ref, out)
+    pd.testing.assert_frame_equal(out, again)
+    print(f"one by one {t_loop:6.2f} s  engine (shared solves, process pool) {t_engine:6.2f} s  "
+          f"cached rerun {t_cached*1000:6.1f} ms  same table")
+    if os.path.exists(f"/proc/{os.getpid()}/task"):
+        recovery(inputs, scenarios[:12], ref.iloc[:12 * len(ref) // len(scenarios)].reset_index(drop=True))
+
+
+if __name__ == "__main__":
+    main()
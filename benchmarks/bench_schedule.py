@@ -0,0 +1,69 @@
+# Run from the repo root: python -m benchmarks.bench_schedule
+import io
+import time
+
+import numpy as np
+import pandas as pd
+
+from wfm.intraday import slot_labels
+from wfm.schedule import DAY_COLUMNS, KEY, merge_months, template_frame, template_rows
+from wfm.schema import TABLE_COLUMNS, normalize
+
+COUNTRIES = ["Spain", "Mexico", "Poland", "Germany", "Italy", "Brazil", "Colombia", "Turkey"]
+ACTIVITIES = ["Phone", "Chat", "WhatsApp", "Email", "Break"]
+TIMES = slot_labels(30, "08:00", "20:00")
+
+
+def month_template(agents=150, seed=0):
+    """Agent/Time/1..31 template with ~60% of cells working, as the roster optimizer emits."""
+    rng = np.random.default_rng(seed)
+    n = agents * len(TIMES)
+    codes = np.where(rng.random((n, 31)) < 0.6, rng.integers(0, len(ACTIVITIES), (n, 31)), -1)
+    return pd.DataFrame({
+        "Agent": np.repeat([f"Agent_{i}" for i in range(1, agents + 1)], len(TIMES)),
+        "Time": np.tile(TIMES, agents),
+        **{d: pd.Categorical.from_codes(codes[:, i], ACTIVITIES) for i, d in enumerate(DAY_COLUMNS)},
+    })
+
+
+def schedule_history(months=24, agents=150):
+    """Typed schedule_db holding `months` months for every market."""
+    frames = []
+    for c, country in enumerate(COUNTRIES):
+        for m in range(months):
+            ym = f"{2024 + m // 12}-{m % 12 + 1:02d}"
+            frames.append(template_rows(month_template(agents, seed=c * 100 + m), country, ym))
+    return normalize(pd.concat(frames, ignore_index=True), "schedule_db")
+
+
+def legacy_upload(sd, up_sch, country, ym):
+    # The original Option B handler body (text table, concat with the whole DB, dedup on four keys).
+    df_up = pd.read_csv(up_sch)
+    df_up['Country'] = country
+    df_up['YearMonth'] = ym
+    return pd.concat([sd, df_up], ignore_index=True).drop_duplicates(subset=['Country', 'YearMonth', 'Agent', 'Time'], keep='last')
+
+
+def main():
+    typed = schedule_history()
+    text = typed.astype(object).where(typed.notna(), None)
+    mb = lambda df: df.memory_usage(deep=True).sum() / 2**20
+    print(f"schedule_db {len(typed):,} rows  text columns {mb(text):7.1f} MB  categorical {mb(typed):6.1f} MB")
+
+    csv = month_template(seed=999).to_csv(index=False).encode()
+    t0 = time.perf_counter(); rows = template_rows(io.BytesIO(csv), "Spain", "2025-06"); t_read = time.perf_counter() - t0
+    t0 = time.perf_counter(); out = template_frame(rows).to_csv(index=False).encode(); t_write = time.perf_counter() - t0
+    back = template_frame(template_rows(io.BytesIO(out), "Spain", "2025-06"))
+    pd.testing.assert_frame_equal(back.astype(object), template_frame(rows).astype(object))
+    print(f"{'template CSV -> rows':<24} {t_read*1000:7.1f} ms   rows -> CSV {t_write*1000:6.1f} ms  ({len(rows):,} rows)")
+
+    cells = lambda df: df[TABLE_COLUMNS["schedule_db"]].astype(object).where(df.notna(), None).sort_values(KEY).reset_index(drop=True)
+    for label, ym in (("re-upload a month", "2025-06"), ("upload a new month", "2026-01")):
+        t0 = time.perf_counter(); ref = legacy_upload(text, io.BytesIO(csv), "Spain", ym); t_legacy = time.perf_counter() - t0
+        t0 = time.perf_counter(); new = merge_months(typed, template_rows(io.BytesIO(csv), "Spain", ym)); t_new = time.perf_counter() - t0
+        a, b = cells(ref), cells(new)
+        assert a.shape == b.shape and (a.isna() == b.isna()).all().all() and (a.fillna("") == b.fillna("")).all().all()
+        print(f"{label:<24} legacy {t_legacy*1000:7.1f} ms  month-scoped merge {t_new*1000:6.1f} ms  same table")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# Run from the repo root: python -m benchmarks.bench_seasonal
+import time
+
+import numpy as np
+import pandas as pd
+
+from wfm.forecast import generate_seasonal_forecast
+from wfm.intraday import IntradayProfiles
+from wfm.schema import normalize
+from wfm.seasonal import SeasonalForecaster, backtest, daily_series, fit_holt_winters
+
+COUNTRIES = ["Spain", "Mexico", "Poland", "Germany", "Italy", "Brazil", "Colombia", "Turkey"]
+CHANNELS = ["Phone", "Chat", "WhatsApp", "Email"]
+
+
+def seasonal_master_data(days=730, seed=7):
+    """Half-hourly intervals with a weekly pattern, a trend and a mid-morning/afternoon intraday shape."""
+    rng = np.random.default_rng(seed)
+    slots = np.arange(16, 40)  # 08:00-19:30
+    intraday = np.exp(-((slots - 21) / 4.0) ** 2) + 0.8 * np.exp(-((slots - 31) / 5.0) ** 2)
+    intraday /= intraday.sum()
+    start = pd.Timestamp("2024-01-01")
+    frames = []
+    for ctry in COUNTRIES:
+        for ch in CHANNELS:
+            level = rng.uniform(500, 6000)
+            week = rng.uniform(0.6, 1.2, 7)
+            week[5:] *= 0.4 if ch != "Chat" else 0.8
+            d = np.arange(days)
+            daily = level * (1 + rng.uniform(-0.2, 0.4) * d / days) * week[(start.dayofweek + d) % 7]
+            daily *= rng.normal(1, 0.05, days)
+            vol = rng.poisson(np.maximum(daily[:, None] * intraday[None, :], 0))
+            stamps = start + pd.to_timedelta(np.repeat(d, len(slots)), unit="D") + pd.to_timedelta(np.tile(slots * 30, days), unit="m")
+            frames.append(pd.DataFrame({
+                "Date": stamps, "Country": ctry, "Channel": ch, "Volume": vol.ravel().astype(float),
+                "SLA": 0.8, "AHT": rng.choice([180, 300, 420]), "FTE": 10.0,
+            }))
+    return normalize(pd.concat(frames, ignore_index=True), "master_data")
+
+
+def flat_mean_backtest(Y, origins=4, horizon=14, step=7):
+    # The previous model: every future day is the historical mean.
+    err = act = 0.0
+    for k in range(origins):
+        o = len(Y) - horizon - step * k
+        pred = Y[:o].mean(axis=0)
+        err += np.abs(Y[o:o + horizon] - pred).sum()
+        act += Y[o:o + horizon].sum()
+    return err / act
+
+
+def main():
+    df = seasonal_master_data()
+    keys, days, Y = daily_series(df)
+    print(f"history {len(df):,} intervals, {Y.shape[1]} series x {Y.shape[0]} days")
+
+    t0 = time.perf_counter(); fit_holt_winters(Y); t_fit = time.perf_counter() - t0
+    print(f"{'fit all series (80-point grid)':<36} {t_fit*1000:8.1f} ms")
+
+    t0 = time.perf_counter(); _, _, o_mape, o_wape, n = backtest(Y); t_bt = time.perf_counter() - t0
+    print(f"{'rolling-origin backtest':<36} {t_bt*1000:8.1f} ms  {n} origins x 14 days  "
+          f"Holt-Winters WAPE {o_wape:.1%} MAPE {o_mape:.1%}  flat mean WAPE {flat_mean_backtest(Y):.1%}")
+
+    forecaster, profiles = SeasonalForecaster(), IntradayProfiles()
+    profiles.rebuild(df)
+    t0 = time.perf_counter(); f1 = generate_seasonal_forecast(df, forecaster, profiles, key=1); t_cold = time.perf_counter() - t0
+    last = df['Date'].max().normalize()
+    day = df[df['Date'].dt.normalize() == last].copy()
+    day['Date'] += pd.Timedelta(days=1)
+    df2 = pd.concat([df, day], ignore_index=True)
+    t0 = time.perf_counter(); forecaster.fit(df2, key=2); t_inc = time.perf_counter() - t0
+    t0 = time.perf_counter(); SeasonalForecaster().fit(df2, key=2); t_full = time.perf_counter() - t0
+    print(f"{'forecast_db (365 days, per-slot FTE)':<36} {t_cold*1000:8.1f} ms  {len(f1):,} rows")
+    print(f"{'refit after one more day':<36} incremental {t_inc*1000:6.1f} ms  full {t_full*1000:6.1f} ms  "
+          f"({forecaster.extended} series extended, {forecaster.refitted - len(keys)} refitted)")
+
+
+if __name__ == "__main__":
+    main()
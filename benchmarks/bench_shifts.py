@@ -0,0 +1,59 @@
+# Run from the repo root: python -m benchmarks.bench_shifts
+import numpy as np
+
+from benchmarks.bench_roster import market_month
+from benchmarks.bench_seasonal import seasonal_master_data
+from wfm.intraday import IntradayProfiles, slot_labels
+from wfm.roster import requirement_matrix
+from wfm.shifts import ShiftRules, optimize_shifts
+
+MARKETS = {
+    "large (4 channels)": (42_000, 9_000, 6_000, 2_500),
+    "mid (4 channels)": (6_000, 2_000, 1_200, 400),
+    "small (4 channels)": (600, 250, 150, 60),
+}
+
+
+def slot_packing(req):
+    # The per-slot packing it replaces: agent i works slot t of day d whenever i < the slot's requirement.
+    total = req.sum(axis=2)
+    works = np.arange(int(total.max()))[:, None, None] < total[None]  # [agent, day, slot]
+    blocks = (np.diff(works.astype(np.int8), axis=2, prepend=0) == 1).sum(axis=2)
+    worked = works.any(axis=2)
+    return int(total.max()), int(works.sum()), (blocks > 1).sum() / max(worked.sum(), 1), worked.sum(axis=1).max()
+
+
+def check_rules(plan, rules, first_weekday):
+    shifts = plan["shifts"]
+    start = shifts["Start"].str.slice(0, 2).astype(int) * 60 + shifts["Start"].str.slice(3, 5).astype(int)
+    end = shifts["End"].str.slice(0, 2).astype(int) * 60 + shifts["End"].str.slice(3, 5).astype(int)
+    s = shifts.assign(start=start + shifts["Day"] * 1440, end=end + shifts["Day"] * 1440,
+                      week=(shifts["Day"] - 1 + first_weekday) // 7).sort_values(["Agent", "start"])
+    assert not s.duplicated(["Agent", "Day"]).any()
+    assert s.groupby(["Agent", "week"]).size().max() <= rules.max_days_per_week
+    rest = s["start"] - s.groupby("Agent")["end"].shift()
+    assert (rest.dropna() >= rules.min_rest_hours * 60).all()
+
+
+def main():
+    profiles = IntradayProfiles()
+    profiles.rebuild(seasonal_master_data(120))
+    times = slot_labels(30, "08:00", "20:00")
+    rules = ShiftRules()
+    for label, daily in MARKETS.items():
+        f_month = market_month(daily=daily)
+        channels = list(f_month['Channel'].unique())
+        curves = profiles.curves([("Spain", ch) for ch in channels], 30, "08:00", "20:00")
+        req = requirement_matrix(f_month, 2026, 3, channels, curves)
+        plan = optimize_shifts(req, channels, times, rules, first_day="2026-03-01", time_budget=2.0)
+        check_rules(plan, rules, first_weekday=6)
+        rows, cells, split, days = slot_packing(req)
+        print(f"{label:<20} required {plan['required_hours']:>9,.0f} h")
+        print(f"  {'slot packing':<16} {rows:>5} agent rows  {cells / 2:>9,.0f} h  {split:.0%} of agent-days split into several blocks, "
+              f"up to {days} days worked per agent")
+        print(f"  {'shift optimizer':<16} {plan['agents']:>5} agents      {plan['paid_hours']:>9,.0f} h paid  coverage {plan['coverage_pct']:.1%}  "
+              f"over {plan['over_hours']:,.0f} h  {len(plan['shifts']):,} shifts  {plan['passes']} passes  {plan['seconds']*1000:.0f} ms  rules OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+# Run from the repo root: python -m benchmarks.bench_staffing
+import math
+import time
+
+import numpy as np
+
+from benchmarks.bench_erlang import legacy_erlang_c
+from wfm.erlang import required_agents
+
+
+def legacy_required_fte(vol, aht, target_sl, target_time=20):
+    # Verbatim copy of the original app.py get_required_fte loop.
+    if vol <= 0: return 0
+    intensity = (vol * aht) / 3600
+    agents = math.ceil(intensity) + 1
+    while legacy_erlang_c(vol, aht, target_time, agents) < target_sl and agents < 1000:
+        agents += 1
+    return agents
+
+
+def run(label, vol, aht, sl, tt):
+    t0 = time.perf_counter()
+    ref = np.array([legacy_required_fte(v, a, s, t) for v, a, s, t in zip(vol.tolist(), aht.tolist(), sl.tolist(), tt.tolist())])
+    t_legacy = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    new = required_agents(vol, aht, sl, tt)
+    t_batch = time.perf_counter() - t0
+    # The legacy loop overflows once intensity**agents leaves float range and then
+    # returns early, so only rows it can still evaluate are comparable.
+    valid = new * np.log10(np.maximum(vol * aht / 3600, 1)) < 300
+    print(f"{label:<28} {len(vol):>7,} solves  legacy loop {t_legacy:7.2f} s  batch {t_batch*1000:7.1f} ms  "
+          f"speedup x{t_legacy / t_batch:,.0f}  mismatches {(ref != new)[valid].sum()}/{valid.sum():,}  "
+          f"legacy overflowed {(ref != new)[~valid].sum():,}")
+
+
+def main():
+    rng = np.random.default_rng(11)
+    # One 12-month forecast: 365 days x 8 countries x 4 channels of half-hourly volumes.
+    n = 365 * 8 * 4
+    aht = rng.choice([180, 240, 300, 420, 600], n)
+    sl = rng.choice([0.8, 0.9], n)
+    tt = rng.choice([20, 30], n)
+    run("forecast grid, chat/email", rng.uniform(0, 250, n), aht, sl, tt)
+    run("forecast grid, phone queues", rng.uniform(500, 3000, n), aht, sl, tt)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+# Run from the repo root: python -m benchmarks.bench_startup
+import tempfile
+import time
+import types
+
+import pandas as pd
+
+from benchmarks.fake_gsheets import FakeGSheetsConnection
+from benchmarks.generators import SCALES, exception_logs, forecast_db, master_data, schedule_db
+from wfm.local_store import LocalStore, SheetSource
+from wfm.shared_tables import SharedTables, TableUnavailable
+from wfm.users import UserIndex
+
+USERS = 2_000
+
+
+def user_db(n):
+    return pd.DataFrame({
+        "email": [f"Agent.{i}@docplanner.com" for i in range(n)],
+        "password": [f"pw-{i * 7919 % 100_003}" for i in range(n)],
+        "role": ["Admin" if i % 50 == 0 else "User" for i in range(n)],
+    })
+
+
+# --- original startup: sync_from_cloud() on a new session, verbatim; st.session_state is a namespace ---
+def legacy_startup(conn):
+    st = types.SimpleNamespace(session_state=types.SimpleNamespace())
+    try:
+        st.session_state.user_db = conn.read(worksheet="user_db", ttl="0")
+        
+        md = conn.read(worksheet="master_data", ttl="0")
+        expected_cols = ["Date", "Country", "Channel", "Volume", "SLA", "AHT", "FTE"]
+        if not all(c in md.columns for c in expected_cols): md = pd.DataFrame(columns=expected_cols)
+        st.session_state.master_data = md
+        
+        el = conn.read(worksheet="exception_logs", ttl="0")
+        if 'Start Time' not in el.columns: el = pd.DataFrame(columns=["Country", "Date", "Start Time", "Agent", "Type", "Duration (Min)", "Notes"])
+        st.session_state.exception_logs = el
+
+        sd = conn.read(worksheet="schedule_db", ttl="0")
+        if 'Country' not in sd.columns: sd = pd.DataFrame(columns=["Country", "YearMonth", "Agent", "Time"] + [str(d) for d in range(1, 32)])
+        st.session_state.schedule_db = sd
+        
+        fd = conn.read(worksheet="forecast_db", ttl="0")
+        if 'Country' not in fd.columns: fd = pd.DataFrame(columns=["Date", "Country", "Channel", "Forecast_Volume", "Req_FTE"])
+        st.session_state.forecast_db = fd
+
+    except Exception:
+        st.session_state.user_db = pd.DataFrame([{"email": "telmo.alves@docplanner.com", "password": "Memes0812", "role": "Admin"}])
+        st.session_state.master_data = pd.DataFrame(columns=["Date", "Country", "Channel", "Volume", "SLA", "AHT", "FTE"])
+        st.session_state.exception_logs = pd.DataFrame(columns=["Country", "Date", "Start Time", "Agent", "Type", "Duration (Min)", "Notes"])
+        st.session_state.schedule_db = pd.DataFrame(columns=["Country", "YearMonth", "Agent", "Time"] + [str(d) for d in range(1, 32)])
+        st.session_state.forecast_db = pd.DataFrame(columns=["Date", "Country", "Channel", "Forecast_Volume", "Req_FTE"])
+    return st.session_state
+
+
+def legacy_login(db, e_in, p_in):
+    match = db[(db['email'].str.lower() == e_in.lower()) & (db['password'] == p_in)]
+    if not match.empty:
+        return {"email": str(match.iloc[0]['email']), "role": str(match.iloc[0]['role'])}
+    return None
+
+
+def main():
+    users = user_db(USERS)
+    attempts = [(users["email"][i].lower(), users["password"][i]) for i in range(0, USERS, 97)]
+    attempts += [(users["email"][3].upper(), "wrong"), ("nobody@docplanner.com", "x")]
+    for name in ("small", "medium"):
+        scale = SCALES[name]
+        frames = {"user_db": users, "master_data": master_data(scale), "exception_logs": exception_logs(scale),
+                  "schedule_db": schedule_db(scale), "forecast_db": forecast_db(scale)}
+        conn = FakeGSheetsConnection(frames)
+        print(f"{name}: master_data {len(frames['master_data']):,} rows, schedule_db {len(frames['schedule_db']):,} rows, user_db {USERS:,} users")
+
+        t0 = time.perf_counter()
+        session = legacy_startup(conn)
+        t_first = time.perf_counter() - t0
+        assert len(session.master_data) == len(frames["master_data"])
+        t0 = time.perf_counter()
+        expected = [legacy_login(session.user_db, e, p) for e, p in attempts]
+        t_login = (time.perf_counter() - t0) / len(attempts)
+        print(f"  {'original (sync_from_cloud)':<30} first paint {t_first*1000:9.3f} ms   login {t_login*1000:7.3f} ms")
+
+        with tempfile.TemporaryDirectory() as root:
+            store = LocalStore(root)
+            loads = []
+
+            def load(name):
+                loads.append(name)
+                return conn.read(worksheet=name, ttl="0") if name == "user_db" else store.refresh(SheetSource(conn), [name])[name]
+
+            # Everything the app does before the login form is drawn: create the shared tables and the user index.
+            t0 = time.perf_counter()
+            shared, index = SharedTables(loader=load), UserIndex()
+            t_paint = time.perf_counter() - t0
+            assert loads == []
+            t0 = time.perf_counter()
+            index.rebuild(shared.get("user_db"), shared.version("user_db"))
+            t_first_login = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            got = [index.authenticate(e, p) for e, p in attempts]
+            t_login = (time.perf_counter() - t0) / len(attempts)
+            assert got == expected and sum(g is not None for g in got) == len(attempts) - 2
+            assert loads == ["user_db"]
+            t0 = time.perf_counter()
+            shared.get("master_data")
+            t_page = time.perf_counter() - t0
+        print(f"  {'lazy (user index)':<30} first paint {t_paint*1000:9.3f} ms   login {t_login*1000:7.3f} ms   "
+              f"first login (load user_db + index) {t_first_login*1000:.1f} ms   Dashboard's master_data load {t_page*1000:.1f} ms")
+
+    # Sheets down on a first read: the fallback is shown but not published, and writes fail until a read succeeds.
+    down = [True]
+
+    def flaky(name):
+        if down[0]:
+            raise ConnectionError("Sheets unreachable")
+        return users
+
+    shared = SharedTables(loader=flaky, fallback=lambda name: users.head(0))
+    assert shared.get("user_db").empty and not shared.loaded("user_db")
+    try:
+        shared.update("user_db", lambda db: db, persist=lambda name, db: None)
+        raise AssertionError("update() wrote over a table that failed to load")
+    except TableUnavailable:
+        pass
+    down[0] = False
+    assert len(shared.get("user_db")) == USERS and shared.version("user_db") == 1
+    print("a failed first read was not published; the next access loaded the sheet")
+
+
+if __name__ == "__main__":
+    main()
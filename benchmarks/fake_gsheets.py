@@ -0,0 +1,153 @@
+# In-memory stand-in for streamlit_gsheets.GSheetsConnection, for running the
+# persistence layer without Google credentials. Each worksheet is a grid of
+# cells (row 1 = header) and every API call is counted. Calls can be made to
+# fail before they apply (fail_calls: timeouts, rate_limit_calls: 429s) or
+# after a write was applied (fail_after_calls), as a timeout or 5xx can.
+import pandas as pd
+
+
+class FakeResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+class FakeAPIError(Exception):
+    """Shaped like gspread.exceptions.APIError: the HTTP response is on .response."""
+
+    def __init__(self, status_code, message):
+        super().__init__(message)
+        self.response = FakeResponse(status_code)
+
+
+class FakeSpreadsheet:
+    def __init__(self):
+        self.version = 0
+
+    def get_lastUpdateTime(self):
+        return f"2026-01-01T00:00:{self.version:02d}Z"
+
+
+class FakeWorksheet:
+    def __init__(self, title, df=None, fail_calls=0, spreadsheet=None):
+        self.title = title
+        self.spreadsheet = spreadsheet or FakeSpreadsheet()
+        self.grid = [] if df is None else [list(df.columns)] + df.astype(object).where(df.notna(), "").values.tolist()
+        self.calls = 0
+        self.cells_written = 0
+        self.cells_read = 0
+        self.fail_calls = fail_calls
+        self.fail_after_calls = 0
+        self.rate_limit_calls = 0
+        # Grid size, as in Sheets: batch_update can't write outside it, append_rows grows it.
+        self.row_count = max(len(self.grid), 1000)
+        self.col_count = max((len(r) for r in self.grid), default=26)
+
+    def _call(self, write=True):
+        self.calls += 1
+        if write:
+            self.spreadsheet.version += 1
+        if self.rate_limit_calls:
+            self.rate_limit_calls -= 1
+            raise FakeAPIError(429, "simulated rate limit")
+        if self.fail_calls:
+            self.fail_calls -= 1
+            raise TimeoutError("simulated Sheets API timeout")
+
+    def _applied(self):
+        if self.fail_after_calls:
+            self.fail_after_calls -= 1
+            raise TimeoutError("simulated timeout after the write was applied")
+
+    def clear(self):
+        self._call()
+        self.grid = []
+        self._applied()
+
+    def append_rows(self, values, value_input_option="RAW", table_range=None):
+        self._call()
+        start = len(self.grid) + 1
+        self.grid.extend([list(v) for v in values])
+        self.cells_written += sum(len(v) for v in values)
+        end = len(self.grid)
+        self.row_count = max(self.row_count, end)
+        self._applied()
+        return {"updates": {"updatedRange": f"{self.title}!A{start}:Z{end}"}}
+
+    def batch_update(self, data, value_input_option="RAW"):
+        self._call()
+        for item in data:
+            first = int(item["range"].lstrip("A")) - 1
+            if first + len(item["values"]) > self.row_count or max(map(len, item["values"])) > self.col_count:
+                raise FakeAPIError(400, f"Range ({self.title}!{item['range']}) exceeds grid limits")
+            for row, values in enumerate(item["values"], first):
+                while len(self.grid) <= row:
+                    self.grid.append([])
+                self.grid[row] = list(values)
+                self.cells_written += len(values)
+        self._applied()
+
+    def add_rows(self, rows):
+        self._call()
+        self.row_count += rows
+        self._applied()
+
+    def add_cols(self, cols):
+        self._call()
+        self.col_count += cols
+        self._applied()
+
+    def resize(self, rows=None, cols=None):
+        self._call()
+        if rows is not None:
+            self.row_count = rows
+            self.grid = self.grid[:rows]
+        if cols is not None:
+            self.col_count = cols
+            self.grid = [r[:cols] for r in self.grid]
+        self._applied()
+
+    def row_values(self, row):
+        self._call(write=False)
+        return list(self.grid[row - 1]) if row <= len(self.grid) else []
+
+    def get_values(self, range_name):
+        # Only the open-ended "A<row>:ZZ" form used by SheetSource.
+        self._call(write=False)
+        start = int(range_name.split(":")[0].lstrip("A"))
+        rows = [list(r) for r in self.grid[start - 1:]]
+        self.cells_read += sum(len(r) for r in rows)
+        return [[str(v) for v in r] for r in rows]
+
+    def to_frame(self):
+        self.cells_read += sum(len(r) for r in self.grid)
+        if not self.grid:
+            return pd.DataFrame()
+        return pd.DataFrame(self.grid[1:], columns=self.grid[0])
+
+
+class FakeClient:
+    def __init__(self, sheets, spreadsheet):
+        self.sheets = sheets
+        self.spreadsheet = spreadsheet
+
+    def _open_spreadsheet(self, **kwargs):
+        return self.spreadsheet
+
+    def _select_worksheet(self, worksheet=None, **kwargs):
+        return self.sheets[worksheet]
+
+
+class FakeGSheetsConnection:
+    def __init__(self, frames):
+        self.spreadsheet = FakeSpreadsheet()
+        self.sheets = {name: FakeWorksheet(name, df, spreadsheet=self.spreadsheet) for name, df in frames.items()}
+        self.client = FakeClient(self.sheets, self.spreadsheet)
+
+    def read(self, worksheet=None, ttl=None, **kwargs):
+        return self.sheets[worksheet].to_frame()
+
+    def update(self, worksheet=None, data=None, **kwargs):
+        ws = self.sheets[worksheet]
+        ws.clear()
+        ws.append_rows([list(data.columns)] + data.astype(object).where(data.notna(), "").values.tolist())
+        return data
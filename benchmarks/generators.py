@@ -0,0 +1,142 @@
+# Synthetic WFM tables at configurable scale for benchmarks.suite (no Streamlit or Sheets needed).
+import numpy as np
+import pandas as pd
+
+from wfm.intraday import slot_labels
+from wfm.schedule import DAY_COLUMNS, template_rows
+from wfm.schema import concat_typed, normalize
+
+MARKETS = ["Spain", "Mexico", "Poland", "Germany", "Italy", "Brazil", "Colombia", "Turkey",
+           "France", "Portugal", "Chile", "Argentina", "Peru", "Czechia", "Austria", "Ireland"]
+CHANNELS = ["Phone", "Chat", "WhatsApp", "Email", "Video", "Social"]
+EXCEPTION_TYPES = ["Sickness", "Late", "Technical", "Meeting"]
+
+
+class Scale:
+    """markets x channels x days of history x slots per day (slot_minutes over opening hours)."""
+
+    def __init__(self, markets=8, channels=4, days=365, slot_minutes=30, open_time="08:00", close_time="20:00",
+                 agents=150, schedule_months=12, exceptions=40_000):
+        if markets > len(MARKETS) or channels > len(CHANNELS):
+            raise ValueError(f"at most {len(MARKETS)} markets and {len(CHANNELS)} channels")
+        self.markets = MARKETS[:markets]
+        self.channels = CHANNELS[:channels]
+        self.days = days
+        self.slot_minutes = slot_minutes
+        self.open_time, self.close_time = open_time, close_time
+        self.agents = agents
+        self.schedule_months = schedule_months
+        self.exceptions = exceptions
+
+    @property
+    def times(self):
+        return slot_labels(self.slot_minutes, self.open_time, self.close_time)
+
+    @property
+    def intervals(self):
+        return len(self.markets) * len(self.channels) * self.days * len(self.times)
+
+    def __repr__(self):
+        return (f"{len(self.markets)} markets x {len(self.channels)} channels x {self.days} days x "
+                f"{len(self.times)} slots = {self.intervals:,} intervals")
+
+
+SCALES = {
+    "small": Scale(markets=2, channels=2, days=120, agents=40, schedule_months=3, exceptions=5_000),
+    "medium": Scale(markets=8, channels=4, days=365, agents=150, schedule_months=12, exceptions=40_000),
+    "large": Scale(markets=16, channels=6, days=730, agents=400, schedule_months=24, exceptions=200_000),
+}
+
+
+def master_data(scale, seed=0, start="2024-01-01"):
+    """Typed master_data: every interval of the history with a trend, a weekly pattern, a two-peak
+    intraday shape and Poisson noise; SLA, AHT and FTE vary per interval."""
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp(start)
+    times = scale.times
+    minutes = np.array([int(t[:2]) * 60 + int(t[3:]) for t in times])
+    hours = minutes / 60
+    intraday = np.exp(-((hours - 10.5) / 2.0) ** 2) + 0.8 * np.exp(-((hours - 15.5) / 2.5) ** 2)
+    intraday /= intraday.sum()
+    d = np.arange(scale.days)
+    weekday = (start.dayofweek + d) % 7
+    stamps = (start + pd.to_timedelta(np.repeat(d, len(times)), unit="D") + pd.to_timedelta(np.tile(minutes, scale.days), unit="m")).to_numpy()
+    frames = []
+    for market in scale.markets:
+        for channel in scale.channels:
+            level = rng.uniform(300, 6000)
+            week = rng.uniform(0.6, 1.2, 7)
+            week[5:] *= 0.4
+            daily = level * (1 + rng.uniform(-0.2, 0.4) * d / max(scale.days, 1)) * week[weekday] * rng.normal(1, 0.05, scale.days)
+            volume = rng.poisson(np.maximum(daily[:, None] * intraday[None, :], 0)).ravel()
+            n = len(volume)
+            frames.append(pd.DataFrame({
+                "Date": stamps, "Country": market, "Channel": channel, "Volume": volume.astype(float),
+                "SLA": rng.uniform(0.6, 0.95, n), "AHT": rng.choice([180.0, 300.0, 420.0]) * rng.uniform(0.85, 1.15, n),
+                "FTE": np.maximum(volume * 300 / 1800 * rng.uniform(0.9, 1.3, n), 0),
+            }))
+    return normalize(pd.concat(frames, ignore_index=True), "master_data")
+
+
+def forecast_db(scale, seed=0, start="2026-01-01", days=365):
+    """Typed forecast_db: daily Forecast_Volume per market and channel; Req_FTE is a rough
+    workload / 8h figure (not an Erlang solve), as inputs for the roster and scenario engines."""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(start, periods=days, freq="D")
+    rows = []
+    for market in scale.markets:
+        for channel in scale.channels:
+            level = rng.uniform(2_000, 40_000)
+            week = rng.uniform(0.6, 1.2, 7)
+            week[5:] *= 0.4
+            volume = level * week[dates.dayofweek] * rng.uniform(0.9, 1.1, days)
+            rows.append(pd.DataFrame({
+                "Date": dates, "Country": market, "Channel": channel, "Forecast_Volume": volume,
+                "Req_FTE": np.ceil(volume * 300 / 3600 / 8).astype(int),
+            }))
+    return normalize(pd.concat(rows, ignore_index=True), "forecast_db")
+
+
+def schedule_template(scale, activities=None, seed=0):
+    """Agent/Time/'1'..'31' template with ~60% of cells working, as the roster optimizer emits."""
+    rng = np.random.default_rng(seed)
+    activities = list(activities or scale.channels) + ["Break"]
+    times = scale.times
+    n = scale.agents * len(times)
+    codes = np.where(rng.random((n, 31)) < 0.6, rng.integers(0, len(activities), (n, 31)), -1)
+    return pd.DataFrame({
+        "Agent": np.repeat([f"Agent_{i}" for i in range(1, scale.agents + 1)], len(times)),
+        "Time": np.tile(times, scale.agents),
+        **{day: pd.Categorical.from_codes(codes[:, i], activities) for i, day in enumerate(DAY_COLUMNS)},
+    })
+
+
+def year_months(scale, start="2025-01"):
+    first = pd.Period(start, freq="M")
+    return [str(first + i) for i in range(scale.schedule_months)]
+
+
+def schedule_db(scale, seed=0, start="2025-01"):
+    """Typed schedule_db: one template per market and month."""
+    frames = [template_rows(schedule_template(scale, seed=seed + 1000 * m + i), market, ym)
+              for m, market in enumerate(scale.markets) for i, ym in enumerate(year_months(scale, start))]
+    return normalize(concat_typed(frames), "schedule_db")
+
+
+def exception_logs(scale, seed=0, start="2025-01"):
+    """Typed exception_logs over the schedule months, some overlapping and some running past closing."""
+    rng = np.random.default_rng(seed)
+    n = scale.exceptions
+    months = year_months(scale, start)
+    first, last = pd.Period(months[0]).start_time, pd.Period(months[-1]).end_time
+    days = pd.date_range(first, last.normalize(), freq="D").strftime("%Y-%m-%d")
+    return normalize(pd.DataFrame({
+        "Country": rng.choice(scale.markets, n),
+        "Date": rng.choice(days, n),
+        "Start Time": rng.choice(scale.times, n),
+        "Agent": [f"Agent_{i}" for i in rng.integers(1, scale.agents + 1, n)],
+        "Type": rng.choice(EXCEPTION_TYPES, n),
+        "Duration (Min)": rng.choice([15, 30, 60, 90, 240, 480], n),
+        "Notes": "",
+    }), "exception_logs")
+
@@ -0,0 +1,357 @@
+# Run from the repo root: python -m benchmarks.suite [--scale small|medium|large] [--update-baseline]
+#
+# Regression suite for the WFM engines on synthetic tables (benchmarks.generators): each case times
+# the engine call (best of --repeat runs), checks its output against reference values (textbook
+# Erlang-C figures, independent re-computations, the legacy implementations kept in the other
+# benchmarks) and compares timing and headline results with benchmarks/baseline.json. Exits 1 when
+# a check fails, a result changed, or a case got slower than --tolerance x its baseline.
+import argparse
+import json
+import math
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks import generators
+from benchmarks.bench_erlang import log_space_erlang_c
+from benchmarks.bench_exceptions import legacy_overlay
+from benchmarks.bench_shifts import check_rules
+from wfm.aggregate import aggregate_wfm
+from wfm.erlang import erlang_c, required_agents, service_level
+from wfm.exceptions import ExceptionIndex
+from wfm.forecast import generate_seasonal_forecast
+from wfm.intraday import IntradayProfiles
+from wfm.rollups import DailyRollups
+from wfm.roster import requirement_matrix
+from wfm.scenarios import ScenarioEngine, scenario_grid, scenario_inputs
+from wfm.schedule import merge_months, template_rows
+from wfm.seasonal import SeasonalForecaster
+from wfm.shifts import ShiftRules, optimize_shifts
+from wfm.staffing_cache import StaffingCache
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+SLACK_SECONDS = 0.005  # timings below a few ms are noise
+
+# Erlang-C table values (probability of waiting) for traffic A erlangs and N agents, and the standard
+# worked example: 360 calls per 30 minutes, 240 s AHT (48 erlangs), 20 s answer target.
+ERLANG_C_TABLE = [(2, 3, 0.4444), (10, 11, 0.6821), (10, 12, 0.4494), (10, 15, 0.1020)]
+WORKED_EXAMPLE = {"vol": 720, "aht": 240, "target_time": 20, "agents": 55, "prob_wait": 0.2387, "service_level": 0.8668, "agents_for_80": 54}
+
+CASES = []
+
+
+def case(name):
+    def register(fn):
+        CASES.append((name, fn))
+        return fn
+    return register
+
+
+class Data:
+    """Synthetic tables for one scale, generated on first use."""
+
+    def __init__(self, scale, seed=0):
+        self.scale = scale
+        self.seed = seed
+        self._cache = {}
+
+    def _get(self, name, build):
+        if name not in self._cache:
+            self._cache[name] = build()
+        return self._cache[name]
+
+    @property
+    def master(self):
+        return self._get("master", lambda: generators.master_data(self.scale, self.seed))
+
+    @property
+    def forecast(self):
+        return self._get("forecast", lambda: generators.forecast_db(self.scale, self.seed))
+
+    @property
+    def schedule(self):
+        return self._get("schedule", lambda: generators.schedule_db(self.scale, self.seed))
+
+    @property
+    def exceptions(self):
+        return self._get("exceptions", lambda: generators.exception_logs(self.scale, self.seed))
+
+    @property
+    def profiles(self):
+        def build():
+            profiles = IntradayProfiles()
+            profiles.rebuild(self.master)
+            return profiles
+        return self._get("profiles", build)
+
+    def intervals(self, limit=200_000):
+        """(volume, AHT, agents around the requirement) for up to `limit` master_data intervals."""
+        def build():
+            md = self.master.iloc[:limit]
+            vol = md['Volume'].to_numpy(dtype=float)
+            aht = md['AHT'].to_numpy(dtype=float)
+            rng = np.random.default_rng(self.seed)
+            return vol, aht, np.ceil(vol * aht / 3600) + rng.integers(0, 6, len(vol))
+        return self._get(("intervals", limit), build)
+
+
+def check(ok, message):
+    if not ok:
+        raise AssertionError(message)
+
+
+# --- cases: each returns its headline results (compared with the baseline) ---
+@case("erlang.textbook")
+def erlang_textbook(data, run):
+    c = run(lambda: erlang_c([a for a, _, _ in ERLANG_C_TABLE], [n for _, n, _ in ERLANG_C_TABLE]))
+    for (a, n, expected), got in zip(ERLANG_C_TABLE, c):
+        check(abs(got - expected) < 5e-5, f"Erlang-C A={a} N={n}: {got:.4f}, table says {expected}")
+    ex = WORKED_EXAMPLE
+    intensity = ex["vol"] * ex["aht"] / 3600
+    check(abs(float(erlang_c(intensity, ex["agents"])) - ex["prob_wait"]) < 5e-5, "worked example: probability of waiting")
+    check(abs(float(service_level(ex["vol"], ex["aht"], ex["target_time"], ex["agents"])) - ex["service_level"]) < 5e-5, "worked example: service level")
+    check(int(required_agents(ex["vol"], ex["aht"], 0.8, ex["target_time"])) == ex["agents_for_80"], "worked example: agents for 80/20")
+    check(float(service_level(0, 300, 20, 0)) == 1.0 and float(service_level(100, 300, 20, 5)) == 0.0, "no-volume / overloaded edge cases")
+    return {}
+
+
+@case("erlang.service_level")
+def erlang_service_level(data, run):
+    vol, aht, agents = data.intervals()
+    sl = run(lambda: service_level(vol, aht, 20, agents))
+    rng = np.random.default_rng(1)
+    sample = rng.choice(len(vol), min(300, len(vol)), replace=False)
+    ref = np.array([log_space_erlang_c(vol[i], aht[i], 20, agents[i]) for i in sample])
+    diff = np.abs(ref - sl[sample]).max()
+    check(diff < 1e-9, f"service_level differs from the log-space reference by {diff:.2e}")
+    return {"intervals": len(vol), "sum": float(sl.sum())}
+
+
+@case("erlang.required_agents")
+def erlang_required_agents(data, run):
+    vol, aht, _ = data.intervals()
+    need = run(lambda: required_agents(vol, aht, 0.8, 20))
+    rng = np.random.default_rng(2)
+    for i in rng.choice(np.flatnonzero(vol > 0), min(200, int((vol > 0).sum())), replace=False):
+        n = int(need[i])
+        check(log_space_erlang_c(vol[i], aht[i], 20, n) >= 0.8 - 1e-9, f"row {i}: {n} agents miss the target")
+        # Same rule as the original get_required_fte: the search starts at ceil(intensity) + 1 agents.
+        check(n == math.ceil(vol[i] * aht[i] / 3600) + 1 or log_space_erlang_c(vol[i], aht[i], 20, n - 1) < 0.8 + 1e-9, f"row {i}: {n} agents is not minimal")
+    return {"agents": int(need.sum())}
+
+
+@case("staffing_cache.required_fte")
+def staffing_cache_required_fte(data, run):
+    # The Capacity Planner path: scalar lookups on a fresh shared cache (volume quantized to 0.1).
+    vol, aht, _ = data.intervals(5_000)
+    def lookups():
+        cache = StaffingCache(volume_resolution=0.1)
+        return np.array([cache.required_fte(v, a, 0.8) for v, a in zip(vol, aht)])
+    got = run(lookups)
+    check(np.array_equal(got, required_agents(np.round(vol, 1), aht, 0.8, 20)), "cached lookups differ from the batch solver")
+    return {"agents": int(got.sum())}
+
+
+@case("aggregate_wfm")
+def aggregate(data, run):
+    md = data.master
+    out = run(lambda: aggregate_wfm(md, [md['Date'].dt.normalize().rename('Day'), 'Channel']))
+    # Reference: one np.average call per group, on one market's first month.
+    sub = md[(md['Country'] == data.scale.markets[0]) & (md['Date'] < md['Date'].min() + pd.Timedelta(days=31))]
+    ref = sub.groupby([sub['Date'].dt.normalize().rename('Day'), 'Channel'], observed=True).apply(
+        lambda g: pd.Series({"Volume": g['Volume'].sum(), "SLA": np.average(g['SLA'], weights=g['Volume']),
+                             "AHT": np.average(g['AHT'], weights=g['Volume']), "FTE": g['FTE'].mean()}), include_groups=False)
+    got = aggregate_wfm(sub, [sub['Date'].dt.normalize().rename('Day'), 'Channel']).set_index(['Day', 'Channel'])
+    check(np.allclose(got[ref.columns].to_numpy(), ref.to_numpy(), rtol=1e-5), "weighted daily aggregates differ from np.average per group")
+    return {"groups": len(out), "volume": float(out['Volume'].sum())}
+
+
+@case("rollups")
+def rollups(data, run):
+    md = data.master
+    def build():
+        r = DailyRollups()
+        r.rebuild(md)
+        return r, r.totals(data.scale.markets), r.daily(data.scale.markets)
+    r, totals, daily = run(build)
+    ref = aggregate_wfm(md, [md['Date'].dt.normalize().rename('Day'), 'Channel'])
+    check(np.allclose(daily['Volume'], ref['Volume']) and np.allclose(daily['SLA'], ref['SLA'], rtol=1e-5), "daily rollups differ from aggregate_wfm")
+    check(math.isclose(totals['Volume'], md['Volume'].astype(float).sum()), "rollup total volume")
+    return {"volume": float(totals['Volume'])}
+
+
+@case("forecast.seasonal")
+def forecast_seasonal(data, run):
+    md, profiles = data.master, data.profiles
+    f = run(lambda: generate_seasonal_forecast(md, SeasonalForecaster(), profiles, solve=required_agents))
+    n_series = len(data.scale.markets) * len(data.scale.channels)
+    check(len(f) == n_series * 365 and f['Forecast_Volume'].notna().all() and (f['Forecast_Volume'] >= 0).all(), "forecast shape / values")
+    # Req_FTE of a few series-days recomputed slot by slot from the intraday curves.
+    aht = md.groupby(['Country', 'Channel'], observed=True)['AHT'].mean()
+    for i in np.random.default_rng(3).choice(len(f), 20, replace=False):
+        row = f.iloc[i]
+        curve = profiles.curve(row['Country'], row['Channel'], row['Date'].dayofweek, 30, "00:00", "24:00")
+        expected = required_agents(row['Forecast_Volume'] * curve, aht[(row['Country'], row['Channel'])], 0.8).sum()
+        check(int(row['Req_FTE']) == int(expected), f"Req_FTE of {row['Country']}/{row['Channel']} {row['Date']:%Y-%m-%d}")
+    return {"rows": len(f), "volume": float(f['Forecast_Volume'].astype(float).sum()), "req_fte": int(f['Req_FTE'].sum())}
+
+
+@case("roster.optimize")
+def roster_optimize(data, run):
+    f = data.forecast
+    market = data.scale.markets[0]
+    first = f['Date'].min()
+    f_month = f[(f['Country'] == market) & (f['Date'].dt.year == first.year) & (f['Date'].dt.month == first.month)]
+    channels = list(f_month['Channel'].unique())
+    times = data.scale.times
+    curves = data.profiles.curves([(market, ch) for ch in channels], data.scale.slot_minutes, data.scale.open_time, data.scale.close_time)
+    rules = ShiftRules()
+    def solve():
+        req = requirement_matrix(f_month, first.year, first.month, channels, curves)
+        return req, optimize_shifts(req, channels, times, rules, first_day=first, time_budget=2.0)
+    req, plan = run(solve)
+    check(plan['coverage_pct'] == 1.0 and plan['short_slots'] == 0, f"roster covers {plan['coverage_pct']:.2%} of the requirement")
+    check_rules(plan, rules, first_weekday=first.dayofweek)
+    # The optimizer is time-boxed, so agents and paid hours depend on machine speed; only the requirement is compared.
+    return {"required_hours": plan['required_hours']}
+
+
+@case("schedule.merge_months")
+def schedule_merge(data, run):
+    sd = data.schedule
+    market, ym = data.scale.markets[0], generators.year_months(data.scale)[0]
+    upload = template_rows(generators.schedule_template(data.scale, seed=99), market, ym)
+    out = run(lambda: merge_months(sd, upload))
+    touched = (sd['Country'] == market) & (sd['YearMonth'] == ym)
+    check(len(out) == int((~touched).sum()) + len(upload), "merged row count")
+    month = out[(out['Country'] == market) & (out['YearMonth'] == ym)].astype(object).sort_values(['Agent', 'Time']).reset_index(drop=True)
+    check(month.fillna("").equals(upload.astype(object).sort_values(['Agent', 'Time']).reset_index(drop=True).fillna("")), "uploaded month cells")
+    return {"rows": len(out)}
+
+
+@case("exceptions.overlay")
+def exceptions_overlay(data, run):
+    exc = data.exceptions
+    ym = exc['Date'].astype(str).str.slice(0, 7)
+    (country, agent, month) = exc.groupby([exc['Country'].astype(object), exc['Agent'], ym]).size().idxmax()
+    grid = pd.DataFrame("Phone", index=pd.Index(data.scale.times, name="Time"), columns=generators.DAY_COLUMNS)
+    def overlay():
+        index = ExceptionIndex(data.scale.slot_minutes)
+        index.rebuild(exc)
+        return index.overlay(grid, [country], agent, month)
+    out = run(overlay)
+    ref = legacy_overlay(grid.copy(), exc[exc['Country'] == country], agent, month)
+    check(out.astype(str).equals(ref.astype(str)), "overlay differs from the cell-by-cell loop")
+    return {"cells": int((out != grid).to_numpy().sum())}
+
+
+@case("scenarios.run")
+def scenarios_run(data, run):
+    inputs = scenario_inputs(data.forecast, curves=lambda keys: data.profiles.curves(keys, 30))
+    scenarios = scenario_grid((0.9, 1.0, 1.1), (0.8, 0.9), (0.2, 0.3))
+    out = run(lambda: ScenarioEngine().run(inputs, scenarios, parallel=False))
+    overall = out[out['Country'] == 'All'].set_index(['aht_factor', 'target_sl', 'shrinkage'])
+    hours = overall['Agent_Hours']
+    check((hours.xs(0.9, level='target_sl').to_numpy() >= hours.xs(0.8, level='target_sl').to_numpy()).all(), "higher SL needs more hours")
+    check((overall['Expected_SL'] >= overall.index.get_level_values('target_sl') - 1e-9).all(), "scenarios reach their SL target")
+    return {"agent_hours": float(hours.sum())}
+
+
+# --- runner ---
+def compare(result, expected, rel=1e-6):
+    diffs = []
+    for key, value in expected.items():
+        got = result.get(key)
+        if isinstance(value, float) and isinstance(got, (int, float)):
+            if not math.isclose(got, value, rel_tol=rel, abs_tol=1e-9):
+                diffs.append(f"{key} {got!r} (baseline {value!r})")
+        elif got != value:
+            diffs.append(f"{key} {got!r} (baseline {value!r})")
+    return diffs
+
+
+def run_case(fn, data, repeat):
+    timings = []
+    def run(call):
+        best, out = math.inf, None
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            out = call()
+            best = min(best, time.perf_counter() - t0)
+        timings.append(best)
+        return out
+    result = fn(data, run)
+    return result, sum(timings)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="WFM engine benchmark and regression suite")
+    parser.add_argument("--scale", choices=sorted(generators.SCALES), default="small")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per case; the fastest is kept")
+    parser.add_argument("--tolerance", type=float, default=1.5, help="fail when a case takes longer than this x its baseline")
+    parser.add_argument("--only", default="", help="comma-separated case names")
+    parser.add_argument("--update-baseline", action="store_true", help="record this run as the baseline for the scale")
+    args = parser.parse_args(argv)
+
+    scale = generators.SCALES[args.scale]
+    data = Data(scale)
+    only = {s for s in args.only.split(",") if s}
+    try:
+        with open(BASELINE) as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        baseline = {}
+    # Recording compares nothing with the old baseline; the reference checks still have to pass.
+    expected = {} if args.update_baseline else baseline.get(args.scale, {})
+    print(f"scale {args.scale}: {scale}")
+    t0 = time.perf_counter(); data.master; data.forecast; data.schedule; data.exceptions
+    print(f"generated master_data {len(data.master):,} rows, forecast_db {len(data.forecast):,}, schedule_db {len(data.schedule):,}, "
+          f"exception_logs {len(data.exceptions):,} in {time.perf_counter() - t0:.1f} s\n")
+
+    failures, recorded = [], {}
+    for name, fn in CASES:
+        if only and name not in only:
+            continue
+        base = expected.get(name)
+        try:
+            result, seconds = run_case(fn, data, args.repeat)
+        except AssertionError as e:
+            failures.append(f"{name}: wrong result: {e}")
+            print(f"{name:<28} FAIL  {e}")
+            continue
+        recorded[name] = {"seconds": round(seconds, 6), "result": result}
+        status, notes = "ok", []
+        if base is not None:
+            diffs = compare(result, base.get("result", {}))
+            if diffs:
+                status = "FAIL"
+                failures.append(f"{name}: result changed: {'; '.join(diffs)}")
+            limit = base["seconds"] * args.tolerance + SLACK_SECONDS
+            if seconds > limit:
+                status = "FAIL"
+                failures.append(f"{name}: {seconds*1000:.1f} ms exceeds {args.tolerance}x baseline ({base['seconds']*1000:.1f} ms)")
+            notes.append(f"baseline {base['seconds']*1000:9.1f} ms  x{seconds / base['seconds']:.2f}" if base['seconds'] else "")
+        else:
+            notes.append("no baseline")
+        print(f"{name:<28} {status:<4}  {seconds*1000:9.1f} ms  {'  '.join(notes)}")
+
+    if args.update_baseline:
+        if failures:
+            print("\nnot updating the baseline: the run has failures")
+        else:
+            baseline[args.scale] = {**baseline.get(args.scale, {}), **recorded}
+            with open(BASELINE, "w") as f:
+                json.dump(baseline, f, indent=2, sort_keys=True)
+                f.write("\n")
+            print(f"\nbaseline for {args.scale} written to {os.path.relpath(BASELINE)}")
+    if failures:
+        print("\n" + "\n".join(failures))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
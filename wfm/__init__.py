@@ -0,0 +1 @@
+# Docplanner WFM engines: pure NumPy/pandas code shared by app.py and the benchmarks.
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+
+# ==========================================
+# WEIGHTED WFM AGGREGATION
+# ==========================================
+# Volume-weighted SLA/AHT are sum(x*Volume)/sum(Volume) per group, so one
+# groupby().sum() over precomputed products replaces a Python call per group.
+# A group whose volume sums to zero falls back to the plain mean of the metric,
+# and a NaN anywhere in x*Volume makes the weighted value NaN, as np.average does.
+
+
+def aggregate_wfm(df, group_cols):
+    if df.empty: return df
+    if not isinstance(group_cols, (list, tuple)): group_cols = [group_cols]
+    keys = [c if isinstance(c, pd.Series) else df[c] for c in group_cols]
+
+    # Accumulate in float64 even when the stored columns are float32.
+    vol = df['Volume'].astype(float)
+    parts = {'Volume': vol, 'FTE': df['FTE'].astype(float)}
+    for col in ('SLA', 'AHT'):
+        weighted = df[col].astype(float) * vol
+        parts[col] = df[col].astype(float)
+        parts[f'{col}_x_vol'] = weighted
+        parts[f'{col}_nan'] = weighted.isna()
+    grouped = pd.DataFrame(parts).groupby(keys, observed=True)
+    sums = grouped[['Volume', 'SLA_x_vol', 'SLA_nan', 'AHT_x_vol', 'AHT_nan']].sum()
+    means = grouped[['FTE', 'SLA', 'AHT']].mean()
+
+    agg = pd.DataFrame({'Volume': sums['Volume'], 'FTE': means['FTE']})
+    total_vol = sums['Volume']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for col in ('SLA', 'AHT'):
+            w_avg = (sums[f'{col}_x_vol'] / total_vol).where(sums[f'{col}_nan'] == 0)
+            agg[col] = w_avg.where(total_vol != 0, means[col])
+    return agg.reset_index()
+
+
+DAY_NS = 86_400 * 10**9
+
+
+def series_codes(history):
+    """(observed (Country, Channel) keys sorted, series code, Date as int64 ns, Volume) for rows with all three keys.
+
+    np.bincount over the codes replaces multi-key groupbys where only sums are needed."""
+    valid = (history['Date'].notna() & history['Country'].notna() & history['Channel'].notna()).to_numpy()
+    cc, countries = pd.factorize(history['Country'], sort=True)
+    ch, channels = pd.factorize(history['Channel'], sort=True)
+    width = max(len(channels), 1)
+    combo = (cc.astype(np.int64) * width + ch)[valid]
+    observed = np.flatnonzero(np.bincount(combo, minlength=len(countries) * width))
+    remap = np.zeros(len(countries) * width, dtype=np.int64)
+    remap[observed] = np.arange(len(observed))
+    code = remap[combo]
+    keys = pd.MultiIndex.from_arrays([countries[observed // width], channels[observed % width]], names=['Country', 'Channel'])
+    ns = history['Date'].to_numpy(dtype='datetime64[ns]')[valid].astype(np.int64)
+    volume = np.nan_to_num(history['Volume'].to_numpy(dtype=float)[valid])
+    return keys, code, ns, volume
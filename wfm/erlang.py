@@ -0,0 +1,188 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+# ==========================================
+# ERLANG-C ENGINE (vectorized, overflow-free)
+# ==========================================
+# Erlang-B is built with the recurrence B(0)=1, B(n) = A*B(n-1) / (n + A*B(n-1)),
+# which stays in [0, 1] for any traffic intensity, so there is no factorial or
+# power term to overflow. Erlang-C follows from B: C = N*B / (N - A*(1 - B)).
+
+
+def traffic_intensity(vol, aht):
+    return np.asarray(vol, dtype=float) * np.asarray(aht, dtype=float) / 3600
+
+
+def erlang_b(intensity, agents):
+    intensity, agents = np.broadcast_arrays(np.asarray(intensity, dtype=float), np.asarray(agents))
+    n = np.floor(agents).astype(np.int64)
+    b = np.ones(intensity.shape)
+    top = int(n.max()) if n.size else 0
+    for k in range(1, top + 1):
+        live = n >= k
+        ab = intensity * b
+        b = np.where(live, ab / (k + ab), b)
+    return b
+
+
+def erlang_c(intensity, agents):
+    intensity, agents = np.broadcast_arrays(np.asarray(intensity, dtype=float), np.asarray(agents, dtype=float))
+    b = erlang_b(intensity, agents)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        c = agents * b / (agents - intensity * (1 - b))
+    return np.where(agents <= intensity, 1.0, c)
+
+
+def service_level(vol, aht, target_t, agents):
+    """Probability a contact is answered within target_t seconds, for whole arrays of intervals."""
+    vol, aht, target_t, agents = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (vol, aht, target_t, agents)))
+    intensity = vol * aht / 3600
+    n = np.floor(agents)
+    prob_w = erlang_c(intensity, n)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        sl = 1 - prob_w * np.exp(-(agents - intensity) * (target_t / aht))
+    sl = np.where(np.isnan(sl), 1.0, sl)
+    sl = np.where(agents <= intensity, 0.0, sl)
+    return np.where(vol <= 0, 1.0, sl)
+
+
+# ==========================================
+# BATCH STAFFING SOLVER
+# ==========================================
+# Works on x(k) = 1/B(k), which follows x(k) = 1 + (k/A)*x(k-1) and gives
+# C = k / (x*(k-A) + A). Below k = A - 9*sqrt(A) the Erlang-B terms are too
+# small to change x in double precision, so each row starts from x = 1 there
+# instead of at k = 0: the window to ceil(A)+1 is ~9*sqrt(A) steps wide rather
+# than A. Rows are sorted by window width and enter the recurrence as their
+# window opens, so every step is one slice of the arrays. From ceil(A)+1 the
+# rows step up until they meet target and then drop out of the working set.
+# Identical input rows are solved once. Rows the window cannot take (zero or
+# negative traffic) run the plain recurrence from k = 0.
+WINDOW_SIGMAS = 9
+
+
+def unique_rows(rows):
+    """Distinct rows and the index of each input row in them (rows compare bit for bit)."""
+    rows = np.ascontiguousarray(rows, dtype=float)
+    # Hash each row's bits to one uint64 and factorize that; verify, since two rows can share a hash.
+    bits = rows.view(np.uint64)
+    h = bits[:, 0].copy()
+    for j in range(1, bits.shape[1]):
+        h *= np.uint64(0x9E3779B97F4A7C15)
+        h ^= bits[:, j]
+    inverse, hashes = pd.factorize(h)
+    first = np.empty(len(hashes), dtype=np.int64)
+    first[inverse[::-1]] = np.arange(len(inverse) - 1, -1, -1)
+    if np.array_equal(bits[first][inverse], bits):
+        return rows[first], inverse
+    # np.unique(axis=0) is several times slower than uniquing a void view of each row.
+    keys, inverse = np.unique(rows.view(np.dtype((np.void, rows.itemsize * rows.shape[1]))).ravel(), return_inverse=True)
+    return keys.view(float).reshape(-1, rows.shape[1]), inverse.ravel()
+
+
+def required_agents(vol, aht, target_sl, target_time=20):
+    """Minimal agents per row meeting target_sl, same rule as get_required_fte, as an int array."""
+    if all(np.ndim(x) == 0 for x in (vol, aht, target_sl, target_time)):
+        return np.int64(_required_agents_scalar(float(vol), float(aht), min(float(target_sl), 1.0), float(target_time)))
+    vol, aht, target_sl, target_time = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (vol, aht, target_sl, target_time)))
+    shape = vol.shape
+    rows = np.column_stack([a.ravel() for a in (vol, aht, np.minimum(target_sl, 1.0), target_time)])
+    if not len(rows):
+        return np.zeros(shape, dtype=np.int64)
+    rows, inverse = unique_rows(rows)
+    solved = np.zeros(len(rows), dtype=np.int64)
+
+    idx = np.flatnonzero(np.isfinite(rows).all(axis=1) & (rows[:, 0] > 0))
+    vol, aht, sl_t, target_time = (rows[idx, j] for j in range(4))
+    intensity = vol * aht / 3600
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rate = target_time / aht
+    window = intensity > 0
+    solved[idx[window]] = _solve_window(intensity[window], rate[window], sl_t[window])
+    rest = ~window
+    solved[idx[rest]] = _solve_stepwise(intensity[rest], rate[rest], sl_t[rest])
+    return solved[inverse].reshape(shape)
+
+
+def _solve_window(intensity, rate, sl_t):
+    start = np.ceil(intensity) + 1
+    low = np.maximum(np.floor(intensity - WINDOW_SIGMAS * np.sqrt(intensity)), 0)
+    width = (start - low).astype(np.int64)
+    steps = int(width.max(initial=0))
+    # Widest window first; int16 keys get NumPy's radix sort.
+    order = np.argsort(-width.astype(np.int16 if steps < 2**15 else np.int64), kind="stable")
+    intensity, rate, sl_t, start, k, width = (v[order] for v in (intensity, rate, sl_t, start, low, width))
+    inv_a = 1 / intensity
+    # Tiny intensities overflow x to inf; their SL then comes out as 1, as in the stepwise loop.
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        # x = 1/B(k) up to k = start; each step advances the n rows whose window is open.
+        x = np.ones(len(k))
+        m = np.empty(len(k))
+        for n in np.searchsorted(-width, np.arange(steps) - steps, side="right").tolist():
+            k[:n] += 1
+            np.multiply(k[:n], inv_a[:n], out=m[:n])
+            x[:n] *= m[:n]
+            x[:n] += 1
+        solved = np.zeros(len(k), dtype=np.int64)
+        pos = np.arange(len(k))
+        k = start
+        while len(pos):
+            over = k - intensity
+            sl = 1 - k / (x * over + intensity) * np.exp(-over * rate)
+            hit = ~(sl < sl_t)
+            if hit.any():
+                solved[pos[hit]] = k[hit]
+                keep = ~hit
+                pos, intensity, rate, sl_t, inv_a, k, x = (v[keep] for v in (pos, intensity, rate, sl_t, inv_a, k, x))
+            k = k + 1
+            x = x * k * inv_a + 1
+    out = np.empty_like(solved)
+    out[order] = solved
+    return out
+
+
+def _solve_stepwise(intensity, rate, sl_t):
+    solved = np.zeros(len(intensity), dtype=np.int64)
+    idx = np.arange(len(intensity))
+    start = np.ceil(intensity) + 1
+    b = np.ones(len(idx))
+    k = 0
+    while len(idx):
+        k += 1
+        ab = intensity * b
+        b = ab / (k + ab)
+        if k < start.min():
+            continue
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            sl = 1 - k * b / (k - intensity * (1 - b)) * np.exp((intensity - k) * rate)
+        # NaN (zero AHT and zero answer time) counts as met, like the legacy except branch.
+        hit = (k >= start) & ~(sl < sl_t)
+        if hit.any():
+            solved[idx[hit]] = k
+            keep = ~hit
+            idx, intensity, rate, start, b, sl_t = (x[keep] for x in (idx, intensity, rate, start, b, sl_t))
+    return solved
+
+
+def _required_agents_scalar(vol, aht, target_sl, target_time):
+    # Plain-float version of the loop above; avoids NumPy call overhead for one-off UI lookups.
+    if not (vol > 0 and math.isfinite(vol * aht * target_sl * target_time)):
+        return 0
+    intensity = vol * aht / 3600
+    start = math.ceil(intensity) + 1
+    rate = target_time / aht if aht else math.inf
+    b, k = 1.0, 0
+    while True:
+        k += 1
+        ab = intensity * b
+        b = ab / (k + ab)
+        if k < start:
+            continue
+        try:
+            sl = 1 - k * b / (k - intensity * (1 - b)) * math.exp((intensity - k) * rate)
+        except (OverflowError, ValueError):
+            sl = 1.0
+        if not sl < target_sl:
+            return k
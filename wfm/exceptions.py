@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+
+from wfm.incremental import IncrementalIndex
+
+# ==========================================
+# EXCEPTION OVERLAY INDEX
+# ==========================================
+# exception_logs rows grouped by (Country, Agent, YearMonth) with the fields
+# the roster overlay needs already parsed: day of month, start slot label,
+# number of slots covered and the cell label. The index is built once per
+# table version; "Log Exception" appends its rows to the matching group
+# (apply_import) instead of rescanning the table, just as it appends only the
+# new row to the sheet. overlay() places every exception of an agent-month
+# onto the Time x day grid with array indexing; where exceptions overlap, the
+# one logged last wins, as with the cell-by-cell loop it replaces.
+
+
+def _prepare(rows, slot_minutes):
+    date = rows['Date'].astype(str)
+    parts = date.str.split('-')
+    out = pd.DataFrame({
+        "Country": rows['Country'].astype(object),
+        "Agent": rows['Agent'].astype(object),
+        "YearMonth": date.str.slice(0, 7),
+        "day": pd.to_numeric(parts.str[2], errors='coerce'),
+        "start": rows['Start Time'].astype(object),
+        "blocks": np.ceil(pd.to_numeric(rows['Duration (Min)'], errors='coerce').fillna(0).to_numpy(dtype=float) / slot_minutes),
+        "label": "🔴 " + rows['Type'].astype(str),
+    })
+    out = out[out['Agent'].notna() & out['day'].notna() & (out['blocks'] > 0)]
+    return out.astype({"day": np.int64, "blocks": np.int64})
+
+
+class ExceptionIndex(IncrementalIndex):
+    def __init__(self, slot_minutes=30):
+        super().__init__()
+        self.slot_minutes = slot_minutes
+        self._groups = {}
+
+    def __len__(self):
+        return sum(len(g[0]) for g in self._groups.values())
+
+    def _reset(self):
+        self._groups = {}
+
+    def add(self, rows):
+        if rows.empty:
+            return
+        prepared = _prepare(rows, self.slot_minutes)
+        columns = [prepared[c].to_numpy() for c in ("day", "start", "blocks", "label")]
+        codes, uniques = zip(*(pd.factorize(prepared[c].to_numpy(dtype=object), use_na_sentinel=False) for c in ("Country", "Agent", "YearMonth")))
+        group = (codes[0] * len(uniques[1]) + codes[1]) * len(uniques[2]) + codes[2]
+        order = np.argsort(group, kind="stable")
+        bounds = np.flatnonzero(np.diff(group[order])) + 1
+        with self._lock:
+            for pos in np.split(order, bounds) if len(order) else []:
+                i = pos[0]
+                key = (uniques[0][codes[0][i]], uniques[1][codes[1][i]], uniques[2][codes[2][i]])
+                new = tuple(c[pos] for c in columns)
+                old = self._groups.get(key)
+                self._groups[key] = new if old is None else tuple(np.concatenate(pair) for pair in zip(old, new))
+
+    def lookup(self, country, agent, year_month):
+        """(day, start label, slots covered, label) arrays in logging order."""
+        return self._groups.get((country, agent, year_month), (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=object), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=object)))
+
+    def overlay(self, grid, countries, agent, year_month):
+        """Copy of a Time x day grid (index 'HH:MM', columns '1'..'31') with the agent's exceptions written in."""
+        parts = [self.lookup(c, agent, year_month) for c in countries]
+        day, start, blocks, label = (np.concatenate(p) for p in zip(*parts)) if parts else self.lookup(None, None, None)
+        if not len(day):
+            return grid
+        row = grid.index.get_indexer(start)
+        col = grid.columns.get_indexer(day.astype(str))
+        ok = (row >= 0) & (col >= 0)
+        row, col, blocks, label = row[ok], col[ok], blocks[ok], label[ok]
+        # One entry per covered slot, clipped at the last row of the grid.
+        rep = np.repeat(np.arange(len(row)), blocks)
+        r = row[rep] + (np.arange(len(rep)) - np.repeat(np.cumsum(blocks) - blocks, blocks))
+        keep = r < len(grid)
+        rep, r = rep[keep], r[keep]
+        flat = r * grid.shape[1] + col[rep]
+        # Last logged wins on overlaps.
+        _, last = np.unique(flat[::-1], return_index=True)
+        last = len(flat) - 1 - last
+        values = grid.to_numpy(dtype=object).copy()
+        values.reshape(-1)[flat[last]] = label[rep[last]]
+        return pd.DataFrame(values, index=grid.index, columns=grid.columns, dtype=object)
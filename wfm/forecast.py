@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+
+from wfm.erlang import required_agents
+from wfm.schema import normalize
+
+# ==========================================
+# FORECAST ENGINE (date x country x channel grid)
+# ==========================================
+# A forecast is one volume array of shape (series, days) for the observed
+# (Country, Channel) series. The grid is laid out with np.repeat/np.tile
+# instead of nested loops, and Req_FTE comes from batched staffing solves,
+# SERIES_BATCH series per call (see forecast_grid), with progress reported
+# between batches. With an intraday profile, each day's volume is spread
+# over the day's slots and Req_FTE is the sum of agents staffed per slot
+# (agent-intervals, as before); without one every interval gets 1/intervals
+# of the day.
+
+DEFAULT_VOLUME = 50
+DEFAULT_AHT = 300
+SERIES_BATCH = 4
+
+
+def series_baselines(history):
+    """Mean Volume and AHT per observed (Country, Channel), in the order the series first appear."""
+    means = history.groupby(['Country', 'Channel'], observed=True)[['Volume', 'AHT']].mean()
+    order = pd.MultiIndex.from_product([history['Country'].unique(), history['Channel'].unique()], names=['Country', 'Channel'])
+    means = means.reindex(order[order.isin(means.index)])
+    return means.fillna({'Volume': DEFAULT_VOLUME, 'AHT': DEFAULT_AHT})
+
+
+def forecast_dates(last_date, days=365):
+    return pd.Timestamp(last_date).normalize() + pd.to_timedelta(np.arange(1, days + 1), unit="D")
+
+
+def flat_growth(base, days, growth=0.0001):
+    """Baseline volume with a small linear uplift per day ahead, shape (series, days)."""
+    base = np.asarray(base)
+    # Same precision as the baseline means (float32 for typed master_data).
+    factor = (1 + np.arange(1, days + 1) * growth).astype(base.dtype)
+    return base[:, None] * factor
+
+
+def interval_requirement(volume, dates, aht, profile, target_sl=0.8, solve=required_agents):
+    """Agent-intervals per [series, day]: daily volume spread by profile[series, weekday, slot], each slot staffed."""
+    weekday = np.asarray(pd.DatetimeIndex(dates).dayofweek)
+    slot_volume = volume[:, :, None] * profile[:, weekday, :]
+    return solve(slot_volume, np.asarray(aht)[:, None, None], target_sl).sum(axis=2)
+
+
+def forecast_grid(keys, dates, volume, aht, target_sl=0.8, intervals=48, solve=required_agents, profile=None, progress=None):
+    """forecast_db rows for daily volume[series, day]; Req_FTE staffs each of `intervals` equal intervals
+    or, given profile[series, weekday, slot], each profiled slot.
+
+    solve: batch solver with required_agents' signature; pass StaffingCache.required_fte_many to share
+    the app's cache, which also dedups repeated (interval volume, AHT) pairs.
+    progress: optional callback(fraction, message) called before each batch of series."""
+    progress = progress or (lambda fraction, message=None: None)
+    n_series, n_days = len(keys), len(dates)
+    volume = np.asarray(volume).reshape(n_series, n_days)
+    aht = np.asarray(aht)
+    req = []
+    for lo in range(0, n_series, SERIES_BATCH):
+        progress(lo / n_series, "Staffing intervals (Erlang-C)")
+        rows = slice(lo, lo + SERIES_BATCH)
+        if profile is None:
+            req.append(solve(volume[rows] / intervals, np.broadcast_to(aht[rows, None], volume[rows].shape), target_sl) * intervals)
+        else:
+            req.append(interval_requirement(volume[rows], dates, aht[rows], profile[rows], target_sl, solve))
+    req = np.concatenate(req) if req else np.zeros(volume.shape)
+    out = pd.DataFrame({
+        "Date": np.tile(np.asarray(dates, dtype="datetime64[ns]"), n_series),
+        "Country": np.repeat(keys.get_level_values('Country').astype(object), n_days),
+        "Channel": np.repeat(keys.get_level_values('Channel').astype(object), n_days),
+        "Forecast_Volume": volume.ravel(),
+        "Req_FTE": np.asarray(req).ravel(),
+    })
+    return normalize(out, "forecast_db")
+
+
+def generate_forecast(history, days=365, target_sl=0.8, intervals=48, solve=required_agents):
+    """12-month forecast_db from master_data rows with a parsed Date (flat baseline, no seasonality)."""
+    base = series_baselines(history)
+    dates = forecast_dates(history['Date'].max(), days)
+    volume = flat_growth(base['Volume'].to_numpy(), days)
+    return forecast_grid(base.index, dates, volume, base['AHT'].to_numpy(), target_sl, intervals, solve)
+
+
+def generate_seasonal_forecast(history, forecaster, profiles, days=365, target_sl=0.8, slot_minutes=30, solve=required_agents, key=None, progress=None):
+    """forecast_db from the Holt-Winters models of a SeasonalForecaster, staffed per slot of the
+    IntradayProfiles curves (whole day, so the daily volume is kept).
+
+    progress: optional callback(fraction, message) called per batch of series while models are fitted
+    (up to 0.4) and intervals staffed (up to 0.95)."""
+    progress = progress or (lambda fraction, message=None: None)
+    progress(0.05, "Fitting seasonal models")
+    keys, dates, volume = forecaster.forecast(history, days, key, lambda f, message=None: progress(0.05 + 0.35 * f, message))
+    progress(0.4, "Staffing intervals (Erlang-C)")
+    aht = series_baselines(history)['AHT'].reindex(keys).fillna(DEFAULT_AHT).to_numpy()
+    profile = profiles.curves(keys, slot_minutes)
+    return forecast_grid(keys, dates, volume, aht, target_sl, solve=solve, profile=profile,
+                         progress=lambda f, message=None: progress(0.4 + 0.55 * f, message))
@@ -0,0 +1,59 @@
+import abc
+import threading
+
+# ==========================================
+# INCREMENTAL INDEXES
+# ==========================================
+# Base for the in-memory indexes derived from one shared table
+# (IntradayProfiles, DailyRollups, ExceptionIndex, UserIndex). An index
+# records the table version it describes. rebuild() recomputes it from every
+# row; apply_import() folds a write in (adds its new rows) only if the index
+# still describes the version the write started from, so an index that missed
+# a write waits for the next rebuild instead of drifting. Subclasses implement
+# _reset() and add(rows). A ReversibleIndex also implements remove(rows), so
+# writes that overwrite rows (imports) can take the old rows back out.
+
+
+class IncrementalIndex(abc.ABC):
+    def __init__(self):
+        self.version = None
+        self._lock = threading.RLock()
+
+    @abc.abstractmethod
+    def _reset(self):
+        """Drop everything the index holds."""
+
+    @abc.abstractmethod
+    def add(self, rows):
+        """Fold rows of the table into the index."""
+
+    def rebuild(self, rows, version=None):
+        """Recompute the index from every row of the table."""
+        with self._lock:
+            self._reset()
+            self.add(rows)
+            self.version = version
+
+    def apply_import(self, added, from_version, to_version):
+        """Add a write's rows if the index describes from_version; otherwise wait for a rebuild."""
+        with self._lock:
+            if self.version != from_version:
+                return False
+            self.add(added)
+            self.version = to_version
+            return True
+
+
+class ReversibleIndex(IncrementalIndex):
+    @abc.abstractmethod
+    def remove(self, rows):
+        """Take rows that were added before back out of the index."""
+
+    def apply_import(self, added, from_version, to_version, replaced=None):
+        """As IncrementalIndex.apply_import, first removing the rows the write overwrote."""
+        with self._lock:
+            if self.version != from_version:
+                return False
+            if replaced is not None and len(replaced):
+                self.remove(replaced)
+            return super().apply_import(added, from_version, to_version)
@@ -0,0 +1,224 @@
+import numpy as np
+import pandas as pd
+
+from wfm.schema import COLUMN_TYPES, TABLE_COLUMNS, concat_typed, normalize
+
+# ==========================================
+# STREAMING CSV INGESTION (master_data)
+# ==========================================
+# A market export is read in fixed-size chunks, never as a whole. Each chunk
+# is renamed to the template headers, parsed with explicit dtypes, typed with
+# wfm.schema (timestamps come from one parse of the file's distinct Date
+# values) and validated: rows without a parseable Date, a Country or a Channel
+# can't be keyed, and rows with a metric cell that isn't a number ("1,500",
+# "n/a"), are rejected and counted; the rest of the file still imports. The
+# chunk is then upserted on (Date, Country, Channel):
+#   - KeyIndex holds a uint64 hash of the key per master row, sorted, so a
+#     chunk is matched against the table with one searchsorted;
+#   - SheetWriter.upsert pushes the chunk's new and changed rows in bounded
+#     batches while the next chunk is read.
+# The published table is built once at the end: master rows not overwritten,
+# then the upload with the last occurrence of each key (merge_upload). The
+# accepted chunks are held until then and concatenated straight into it, so
+# beyond the rows being imported (which the next master holds anyway) and a
+# key hash per row, working memory is bounded by the chunk size.
+
+KEYS = ["Date", "Country", "Channel"]
+HEADER_FIXES = {'Sla': 'SLA', 'Aht': 'AHT', 'Fte': 'FTE'}
+CHUNK_ROWS = 50_000
+# Explicit parser dtypes per schema kind: every chunk parses the same way, markets and
+# channels straight to categoricals. Metrics are read as text and converted per chunk,
+# so one bad cell rejects its row instead of stopping the parser.
+_READ_AS = {"float32": str, "int32": str, "category": "category", "datetime": str, None: str}
+
+
+class IngestError(ValueError):
+    pass
+
+
+def key_hashes(df, keys=KEYS):
+    # Categoricals hash by value, so chunks and the master table agree whatever their category sets.
+    return pd.util.hash_pandas_object(df[keys], index=False).to_numpy()
+
+
+class KeyIndex:
+    """Sorted key hashes of a table, for position lookups of whole chunks at once."""
+
+    def __init__(self, df, keys=KEYS):
+        hashes = key_hashes(df, keys)
+        self._order = np.argsort(hashes, kind="stable")
+        self._sorted = hashes[self._order]
+
+    def __len__(self):
+        return len(self._sorted)
+
+    def lookup(self, hashes):
+        """Row position of each hash in the table, -1 where the key is not there."""
+        if not len(self._sorted):
+            return np.full(len(hashes), -1, dtype=np.int64)
+        i = np.minimum(np.searchsorted(self._sorted, hashes), len(self._sorted) - 1)
+        return np.where(self._sorted[i] == hashes, self._order[i], -1)
+
+
+def _canonical(name):
+    name = str(name).strip().capitalize()
+    return HEADER_FIXES.get(name, name)
+
+
+def _file_dates(file, column, chunk_rows):
+    # The distinct timestamps of an interval export are few: parse them once for the
+    # whole file (one date format, so a chunk holding only the 1st-12th of a month
+    # can't be read month-first while the rest is day-first) and map chunks onto them.
+    seen = set()
+    for chunk in pd.read_csv(file, usecols=[column], dtype=str, chunksize=chunk_rows):
+        seen.update(chunk[column].dropna().unique())
+    file.seek(0)
+    text = pd.Index(sorted(seen), dtype=object)
+    return text, normalize(pd.DataFrame({"Date": text}), "master_data")["Date"].to_numpy()
+
+
+def read_chunks(file, table="master_data", chunk_rows=CHUNK_ROWS):
+    """Yield (typed chunk, rejected row count, bytes read) for a CSV file object."""
+    expected = TABLE_COLUMNS[table]
+    header = pd.read_csv(file, nrows=0).columns
+    file.seek(0)
+    names = {raw: _canonical(raw) for raw in header}
+    missing = [c for c in expected if c not in names.values()]
+    if missing:
+        raise IngestError(f"Missing columns: {missing}")
+    # Last occurrence wins if two raw headers map to the same column.
+    use = {canon: raw for raw, canon in names.items() if canon in expected}
+    text, dates = _file_dates(file, use["Date"], chunk_rows)
+    types = COLUMN_TYPES[table]
+    dtype = {use[c]: _READ_AS[types.get(c)] for c in expected}
+    reader = pd.read_csv(file, usecols=list(use.values()), dtype=dtype, chunksize=chunk_rows)
+    done = 0
+    while True:
+        try:
+            chunk = next(reader)
+        except StopIteration:
+            return
+        except ValueError as e:
+            # A malformed line (wrong number of fields) stops the parser.
+            raise IngestError(f"Import stopped after {done:,} rows: {e}") from e
+        done += len(chunk)
+        chunk = chunk.rename(columns={raw: canon for canon, raw in use.items()})[expected]
+        pos = text.get_indexer(chunk["Date"])
+        chunk["Date"] = np.where(pos >= 0, dates[pos], np.datetime64("NaT"))
+        bad = np.zeros(len(chunk), dtype=bool)
+        for col in expected:
+            if types.get(col) == "category":
+                blank = [c for c in chunk[col].cat.categories if not str(c).strip()]
+                if blank: chunk[col] = chunk[col].cat.remove_categories(blank)
+            elif types.get(col) in ("float32", "int32"):
+                raw = chunk[col]
+                num = pd.to_numeric(raw, errors="coerce")
+                bad |= (num.isna() & raw.notna() & (raw.str.strip() != "")).to_numpy()
+                chunk[col] = num
+        chunk = normalize(chunk, table)
+        valid = chunk[KEYS].notna().all(axis=1).to_numpy() & ~bad
+        yield chunk[valid], int((~valid).sum()), file.tell()
+
+
+def upsert_csv(file, master, writer=None, worksheet="master_data", chunk_rows=CHUNK_ROWS, on_progress=None):
+    """Stream a market CSV into master, pushing each chunk through writer; returns (next master, stats).
+
+    Chunks are pushed only when writer already tracks the worksheet by key with
+    master's columns; otherwise stats["pushed"] is None and the caller pushes
+    the result as a whole. A push that still fails after retries stops further
+    pushes (stats["push_error"]) but the import itself completes. Rows without a
+    key or with a non-numeric metric are skipped and counted in stats["rejected"].
+    A malformed line after the first chunk stops the import there (stats["error"]
+    is the IngestError); the rows before it are kept. stats["upserted"] /
+    stats["replaced"] hold the imported rows and the master rows they overwrote.
+    """
+    file.seek(0, 2)
+    size = file.tell() or 1
+    file.seek(0)
+    index = KeyIndex(master)
+    push = writer is not None and writer.can_upsert(worksheet, master.columns)
+    stats = {"rows": 0, "rejected": 0, "new": 0, "updated": 0, "error": None, "push_error": None,
+             "upserted": master.iloc[:0], "replaced": master.iloc[:0],
+             "pushed": {"appended": 0, "updated": 0, "rewritten": False} if push else None}
+    parts, hashes = [], []
+    chunks = read_chunks(file, worksheet, chunk_rows)
+    while True:
+        try:
+            chunk, rejected, done = next(chunks)
+        except StopIteration:
+            break
+        except IngestError as e:
+            if not (stats["rows"] or stats["rejected"]):
+                raise
+            # Earlier chunks are already in the sheet: keep them and report where it stopped.
+            stats["error"] = e
+            break
+        stats["rows"] += len(chunk)
+        stats["rejected"] += rejected
+        if len(chunk):
+            h = key_hashes(chunk)
+            last = ~pd.Series(h).duplicated(keep="last").to_numpy()
+            chunk, h = chunk[last].reindex(columns=master.columns), h[last]
+            parts.append(chunk)
+            hashes.append(h)
+            if push and stats["push_error"] is None:
+                try:
+                    pushed = writer.upsert(worksheet, chunk)
+                    stats["pushed"]["appended"] += pushed["appended"]
+                    stats["pushed"]["updated"] += pushed["updated"]
+                except Exception as e:
+                    # Stop pushing; the rest of the file is still imported into the table.
+                    stats["push_error"] = e
+        if on_progress is not None:
+            on_progress(stats["rows"], min(done / size, 1.0))
+
+    if not parts:
+        return master, stats
+    # A key repeated further down the file drops its earlier rows chunk by chunk, so the upload is never copied
+    # whole. Such repeats are rare: a sort finds out whether there are any before a hash table is built.
+    h = np.concatenate(hashes)
+    hashes.clear()
+    ordered = np.sort(h)
+    repeated = (ordered[1:] == ordered[:-1]).any()
+    del ordered
+    if repeated:
+        last = ~pd.Series(h).duplicated(keep="last").to_numpy()
+        bounds = np.cumsum([0] + [len(p) for p in parts])
+        for i, (a, b) in enumerate(zip(bounds[:-1], bounds[1:])):
+            if not last[a:b].all():
+                parts[i] = parts[i][last[a:b]]
+        h = h[last]
+    merged, replaced = merge_upload(master, parts, index, h, worksheet)
+    upload = merged.iloc[len(master) - len(replaced):]
+    stats["updated"] = len(replaced)
+    stats["new"] = len(upload) - stats["updated"]
+    # The delta, for indexes maintained incrementally (wfm.intraday, wfm.rollups); a view of the next master's tail.
+    stats["upserted"], stats["replaced"] = upload, replaced
+    return merged, stats
+
+
+def merge_upload(master, upload, index=None, hashes=None, table="master_data"):
+    """(master with upload's keys replaced by upload, the master rows replaced); upload keys are unique.
+
+    upload is a typed frame, or a list of them (an import's chunks) that is emptied as it is merged;
+    its rows come last, in order.
+    Also used to replay an upload onto a master that changed while the file was being read."""
+    parts = upload if isinstance(upload, list) else [upload]
+    index = KeyIndex(master) if index is None else index
+    pos = index.lookup(np.concatenate([key_hashes(p) for p in parts]) if hashes is None else hashes)
+    keep = np.ones(len(master), dtype=bool)
+    keep[pos[pos >= 0]] = False
+    # Typed columns pass through normalize(); it only fixes up a master that wasn't typed yet.
+    frames = [normalize(master[keep], table)]
+    if not isinstance(upload, list):
+        return concat_typed(frames + parts), master[~keep]
+    # An import's chunks are the caller's to give up: merged a column at a time, each column leaving the
+    # chunks as it is copied, so the chunks and the next master are never held in full together.
+    frames += parts
+    parts.clear()
+    merged = {}
+    for col in list(frames[0].columns):
+        merged[col] = concat_typed([f[[col]] for f in frames])[col]
+        for f in frames:
+            del f[col]
+    return pd.DataFrame(merged, copy=False), master[~keep]
@@ -0,0 +1,123 @@
+import numpy as np
+
+from wfm.aggregate import DAY_NS, series_codes
+from wfm.incremental import ReversibleIndex
+
+# ==========================================
+# INTRADAY ARRIVAL PROFILES
+# ==========================================
+# Volume sums per (Country, Channel) x weekday x 15-minute base slot, kept as
+# one float64 array (a few hundred KB for every market). Curves for any slot
+# width that is a multiple of the base slot and any opening window are views
+# over these sums: the window's slots are summed, then normalized to 1. Sums
+# (not shares) are stored so an import adds its new rows and subtracts the
+# rows it replaced, without rescanning master_data. Computed curves are cached
+# per (slot width, opening hours) until the sums change.
+
+BASE_MINUTES = 15
+WEEK = 7
+
+
+def _minutes(hhmm):
+    h, m = str(hhmm).split(":")
+    return int(h) * 60 + int(m)
+
+
+def slot_labels(slot_minutes=30, open_time="08:00", close_time="20:00"):
+    """'HH:MM' start of each slot inside the opening window."""
+    return [f"{m // 60:02d}:{m % 60:02d}" for m in range(_minutes(open_time), _minutes(close_time), slot_minutes)]
+
+
+class IntradayProfiles(ReversibleIndex):
+    def __init__(self, base_minutes=BASE_MINUTES):
+        super().__init__()
+        self.base_minutes = base_minutes
+        self._index = {}
+        self._sums = np.zeros((0, WEEK, 1440 // base_minutes))
+        self._views = {}
+
+    def __len__(self):
+        return len(self._index)
+
+    def keys(self):
+        return list(self._index)
+
+    @property
+    def nbytes(self):
+        return self._sums.nbytes
+
+    # --- maintenance ---
+    def _reset(self):
+        self._index = {}
+        self._sums = np.zeros((0,) + self._sums.shape[1:])
+        self._views = {}
+
+    def add(self, rows, sign=1):
+        """Add rows' volume to the sums (sign=-1 removes rows that an import overwrote)."""
+        keys, code, ns, volume = series_codes(rows)
+        if not len(ns):
+            return
+        with self._lock:
+            new = [k for k in keys if k not in self._index]
+            for k in new:
+                self._index[k] = len(self._index)
+            if new:
+                self._sums = np.concatenate([self._sums, np.zeros((len(new),) + self._sums.shape[1:])])
+            rows_at = np.array([self._index[k] for k in keys])[code]
+            n_slots = self._sums.shape[2]
+            weekday = (ns // DAY_NS + 3) % WEEK  # 1970-01-01 was a Thursday
+            slot = (ns % DAY_NS) // (self.base_minutes * 60 * 10**9)
+            flat = (rows_at * WEEK + weekday) * n_slots + slot
+            self._sums += sign * np.bincount(flat, weights=volume, minlength=self._sums.size).reshape(self._sums.shape)
+            # Float sums of add/remove pairs can leave tiny negatives behind.
+            np.maximum(self._sums, 0, out=self._sums)
+            self._views = {}
+
+    def remove(self, rows):
+        self.add(rows, sign=-1)
+
+    # --- lookups ---
+    def _window(self, slot_minutes, open_time, close_time):
+        start, end = _minutes(open_time), _minutes(close_time)
+        if slot_minutes % self.base_minutes or start % self.base_minutes or end % self.base_minutes or not 0 <= start < end <= 1440:
+            raise ValueError(f"slots must be multiples of {self.base_minutes} minutes inside one day")
+        per = slot_minutes // self.base_minutes
+        n = (end - start) // slot_minutes
+        first = start // self.base_minutes
+        return first, per, n
+
+    def table(self, slot_minutes=30, open_time="00:00", close_time="24:00"):
+        """Normalized curves [series, weekday, slot] for the window, in keys() order.
+
+        A weekday without volume in the window uses the series' whole-week curve;
+        a series without any uses a flat curve."""
+        view_key = (slot_minutes, open_time, close_time)
+        with self._lock:
+            if view_key in self._views:
+                return self._views[view_key]
+            first, per, n = self._window(slot_minutes, open_time, close_time)
+            window = self._sums[:, :, first:first + per * n]
+            sums = window.reshape(len(self._index), WEEK, n, per).sum(axis=3)
+            week = sums.sum(axis=1, keepdims=True)
+            day_total = sums.sum(axis=2, keepdims=True)
+            week_total = week.sum(axis=2, keepdims=True)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                curves = np.where(day_total > 0, sums / day_total,
+                                  np.where(week_total > 0, week / week_total, 1.0 / n))
+            self._views[view_key] = curves
+            return curves
+
+    def curves(self, keys, slot_minutes=30, open_time="00:00", close_time="24:00"):
+        """table() rows for the given (Country, Channel) keys; unknown keys get a flat curve."""
+        table = self.table(slot_minutes, open_time, close_time)
+        n = table.shape[2]
+        out = np.full((len(keys), WEEK, n), 1.0 / n)
+        for i, k in enumerate(keys):
+            j = self._index.get(tuple(k))
+            if j is not None:
+                out[i] = table[j]
+        return out
+
+    def curve(self, country, channel, weekday, slot_minutes=30, open_time="08:00", close_time="20:00"):
+        """Share of the day's volume per slot for one market, channel and weekday (0=Monday)."""
+        return self.curves([(country, channel)], slot_minutes, open_time, close_time)[0, weekday]
@@ -0,0 +1,156 @@
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# ==========================================
+# BACKGROUND JOBS
+# ==========================================
+# Long computations (forecast generation, roster optimization) run on a small
+# thread pool owned by the process instead of inside the Streamlit script, so
+# a session stays responsive, reruns and page changes don't discard the work,
+# and several planners can generate at once. A job function receives its Job
+# and reports progress through job.progress(fraction, message), which the
+# engine functions accept as a plain `progress` callback. Cancelling is
+# cooperative: a queued job never starts, a running one stops at its next
+# progress report (JobCancelled unwinds it). The function persists its own
+# result (e.g. into forecast_db) before returning; pages poll job status by id.
+# A job's status, progress and result change on its worker thread while
+# sessions read them, so they are written under the job's lock and read as a
+# whole through snapshot(); a job that reads as finished already has its result.
+# Job functions run without a Streamlit script context: they must get every
+# shared object they use as an argument.
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+FINISHED = (DONE, FAILED, CANCELLED)
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class Job:
+    def __init__(self, job_id, kind, label="", owner=None):
+        self.id = job_id
+        self.kind = kind
+        self.label = label
+        self.owner = owner
+        self.status = QUEUED
+        self.fraction = 0.0
+        self.message = "Queued"
+        self.result = None
+        self.error = None
+        self.submitted = time.time()
+        self.started = self.finished = None
+        self._cancel = threading.Event()
+        self._future = None
+        self._lock = threading.Lock()
+
+    @property
+    def seconds(self):
+        with self._lock:
+            started, finished = self.started, self.finished
+        if started is None:
+            return 0.0
+        return (finished or time.time()) - started
+
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def progress(self, fraction, message=None):
+        """Report progress (0..1); raises JobCancelled once the job was asked to stop."""
+        if self._cancel.is_set():
+            raise JobCancelled()
+        with self._lock:
+            self.fraction = min(max(float(fraction), 0.0), 1.0)
+            if message is not None:
+                self.message = message
+
+    def _set(self, **fields):
+        with self._lock:
+            for name, value in fields.items():
+                setattr(self, name, value)
+
+    def snapshot(self):
+        seconds = self.seconds
+        with self._lock:
+            return {
+                "id": self.id, "kind": self.kind, "label": self.label, "owner": self.owner, "status": self.status,
+                "progress": self.fraction, "message": self.message, "result": self.result, "error": self.error, "seconds": seconds,
+            }
+
+
+class JobRunner:
+    """Thread pool with a job registry; the last `keep` finished jobs stay available for polling."""
+
+    def __init__(self, max_workers=4, keep=100):
+        self.max_workers = max_workers
+        self.keep = keep
+        self._jobs = OrderedDict()
+        self._ids = itertools.count(1)
+        self._pool = ThreadPoolExecutor(max_workers, thread_name_prefix="wfm-job")
+        self._lock = threading.Lock()
+
+    def submit(self, kind, fn, *args, label="", owner=None, **kwargs):
+        """Run fn(job, *args, **kwargs) in the background and return the job id."""
+        with self._lock:
+            job = Job(f"{kind}-{next(self._ids)}", kind, label, owner)
+            self._jobs[job.id] = job
+            self._prune()
+        job._future = self._pool.submit(self._run, job, fn, args, kwargs)
+        return job.id
+
+    def _run(self, job, fn, args, kwargs):
+        if job.cancelled():
+            self._finish(job, CANCELLED, "Cancelled")
+            return
+        job._set(status=RUNNING, started=time.time(), message="Running")
+        try:
+            result = fn(job, *args, **kwargs)
+        except JobCancelled:
+            self._finish(job, CANCELLED, "Cancelled")
+        except Exception as e:
+            self._finish(job, FAILED, "Failed", error=f"{type(e).__name__}: {e}")
+        else:
+            self._finish(job, DONE, "Done", result=result, fraction=1.0)
+
+    def _finish(self, job, status, message, **fields):
+        job._set(finished=time.time(), message=message, status=status, **fields)
+
+    def _prune(self):
+        finished = [j.id for j in self._jobs.values() if j.status in FINISHED]
+        for job_id in finished[:max(len(finished) - self.keep, 0)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self, kind=None, owner=None):
+        """Registered jobs, newest first."""
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [j for j in reversed(jobs) if (kind is None or j.kind == kind) and (owner is None or j.owner == owner)]
+
+    def cancel(self, job_id):
+        job = self.get(job_id)
+        if job is None:
+            return False
+        with job._lock:
+            if job.status in FINISHED:
+                return False
+            job._cancel.set()
+        if job._future is not None and job._future.cancel():
+            self._finish(job, CANCELLED, "Cancelled")
+        return True
+
+    def stats(self):
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return {s: sum(j.status == s for j in jobs) for s in (QUEUED, RUNNING, DONE, FAILED, CANCELLED)}
+
+    def shutdown(self):
+        for job in self.jobs():
+            job._cancel.set()
+        self._pool.shutdown(wait=False, cancel_futures=True)
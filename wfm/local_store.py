@@ -0,0 +1,188 @@
+import json
+import os
+import shutil
+import threading
+import time
+
+import pandas as pd
+
+from wfm.schema import normalize
+
+# ==========================================
+# LOCAL COLUMNAR STORE (cache tier over Sheets)
+# ==========================================
+# Each worksheet is mirrored on disk as a directory of typed Parquet parts (wfm.schema dtypes) plus
+# a manifest entry: the sheet header, how many data rows the mirror holds, the
+# spreadsheet's last-modified stamp at sync time and the text cells of the last
+# row. A refresh then costs:
+#   - nothing per table when the spreadsheet stamp is unchanged;
+#   - one header read and one range read from the last known row when it has
+#     changed: if that row still matches, only the rows below it are new;
+#   - a full conn.read only when the header or last row moved (rows deleted,
+#     columns edited) or the table was never mirrored.
+# Edits made directly in the Sheets UI above the last row, or to numeric
+# cells, are not detected by the tail check; refresh(..., full=True) re-reads
+# everything (the app's Sync Data does), and forget() makes a table's next
+# refresh a full read.
+# App writes go through write-through save()/append() so the mirror stays in
+# step with what SheetWriter pushed.
+
+MAX_PARTS = 20
+
+
+class SheetSource:
+    """Reads worksheets through the gspread client behind GSheetsConnection."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def _ws(self, table):
+        return self.conn.client._select_worksheet(worksheet=table)
+
+    def stamp(self):
+        return self.conn.client._open_spreadsheet().get_lastUpdateTime()
+
+    def header(self, table):
+        return [str(c) for c in self._ws(table).row_values(1)]
+
+    def rows_from(self, table, sheet_row, columns):
+        values = self._ws(table).get_values(f"A{sheet_row}:ZZ")
+        width = len(columns)
+        rows = [(list(r) + [""] * width)[:width] for r in values]
+        return pd.DataFrame(rows, columns=columns).replace("", None)
+
+    def read_all(self, table):
+        return self.conn.read(worksheet=table, ttl="0")
+
+
+class LocalStore:
+    def __init__(self, root):
+        self.root = root
+        self._lock = threading.RLock()
+        os.makedirs(root, exist_ok=True)
+
+    # --- manifest ---
+    def _manifest_path(self):
+        return os.path.join(self.root, "manifest.json")
+
+    def manifest(self):
+        try:
+            with open(self._manifest_path()) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _write_manifest(self, manifest):
+        tmp = self._manifest_path() + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(manifest, f, indent=1, default=str)
+        os.replace(tmp, self._manifest_path())
+
+    def _tail(self, table, df):
+        if df.empty:
+            return None
+        last = normalize(df.iloc[[-1]], table)
+        text = [c for c in last.columns if not pd.api.types.is_numeric_dtype(last[c])]
+        return [None if pd.isna(v) else str(v) for v in last[text].iloc[0]]
+
+    def _record(self, table, df, rows, stamp):
+        manifest = self.manifest()
+        manifest[table] = {
+            "columns": [str(c) for c in df.columns],
+            "rows": rows,
+            "stamp": stamp,
+            "tail": self._tail(table, df),
+            "saved_at": time.time(),
+        }
+        self._write_manifest(manifest)
+
+    # --- parts ---
+    def _dir(self, table):
+        return os.path.join(self.root, table)
+
+    def _parts(self, table):
+        d = self._dir(table)
+        return sorted(os.path.join(d, p) for p in os.listdir(d) if p.endswith(".parquet")) if os.path.isdir(d) else []
+
+    def forget(self, table):
+        """Drop table from the manifest so its next refresh reads the sheet in full."""
+        with self._lock:
+            manifest = self.manifest()
+            if manifest.pop(table, None) is not None:
+                self._write_manifest(manifest)
+
+    def has(self, table):
+        return table in self.manifest() and os.path.isdir(self._dir(table))
+
+    def load(self, table):
+        with self._lock:
+            parts = self._parts(table)
+            if not parts:
+                return None
+            frames = [pd.read_parquet(p) for p in parts]
+        if len(frames) == 1:
+            return frames[0]
+        # Parts carry their own category sets; re-normalize so the concat stays categorical.
+        return normalize(pd.concat(frames, ignore_index=True), table)
+
+    def save(self, table, df, stamp=None):
+        """Replace the mirror of table with df."""
+        with self._lock:
+            typed = normalize(df, table)
+            tmp = self._dir(table) + ".tmp"
+            shutil.rmtree(tmp, ignore_errors=True)
+            os.makedirs(tmp)
+            typed.to_parquet(os.path.join(tmp, "part-00000.parquet"), index=False)
+            shutil.rmtree(self._dir(table), ignore_errors=True)
+            os.replace(tmp, self._dir(table))
+            self._record(table, typed, len(typed), stamp)
+
+    def append(self, table, rows, stamp=None):
+        """Add rows below the current mirror of table as a new part."""
+        with self._lock:
+            parts = self._parts(table)
+            meta = self.manifest().get(table)
+            if not parts or meta is None:
+                # No mirror to extend; the next refresh reads the table in full.
+                return
+            if len(parts) >= MAX_PARTS:
+                return self.save(table, pd.concat([self.load(table), normalize(rows, table)], ignore_index=True), stamp)
+            typed = normalize(rows, table)
+            seq = int(os.path.basename(parts[-1])[5:10]) + 1
+            typed.to_parquet(os.path.join(self._dir(table), f"part-{seq:05d}.parquet"), index=False)
+            self._record(table, typed, meta["rows"] + len(typed), stamp)
+
+    # --- incremental sync from the sheet ---
+    def refresh(self, source, tables, full=False):
+        """Bring the mirror of each table up to date with the sheet; returns {table: typed DataFrame}."""
+        stamp = source.stamp()
+        manifest = {} if full else self.manifest()
+        frames, self.last_refresh = {}, {}
+        for table in tables:
+            self.last_refresh[table] = self._refresh_table(source, table, manifest.get(table), stamp)
+            frames[table] = self.load(table)
+        return frames
+
+    def _refresh_table(self, source, table, meta, stamp):
+        if meta is not None and self.has(table):
+            if meta["stamp"] == stamp:
+                return "cached"
+            columns = source.header(table)
+            if columns == meta["columns"]:
+                start = meta["rows"] + 1 if meta["rows"] else 2
+                rows = source.rows_from(table, start, columns)
+                if meta["rows"]:
+                    # The first row returned must be the last row we already hold.
+                    rows = rows.iloc[1:] if len(rows) and self._tail(table, rows.iloc[:1]) == meta["tail"] else None
+                if rows is not None:
+                    if len(rows): self.append(table, rows, stamp)
+                    else: self._restamp(table, stamp)
+                    return "delta"
+        self.save(table, source.read_all(table), stamp)
+        return "full"
+
+    def _restamp(self, table, stamp):
+        with self._lock:
+            manifest = self.manifest()
+            manifest[table]["stamp"] = stamp
+            self._write_manifest(manifest)
@@ -0,0 +1,205 @@
+import contextlib
+import functools
+import json
+import threading
+import time
+
+import numpy as np
+
+# ==========================================
+# HOT-PATH INSTRUMENTATION
+# ==========================================
+# One Metrics registry per process records every timed operation (Sheets
+# calls, sync, Erlang solves, forecast/roster generation, page runs) into a
+# per-operation ring buffer of the last `capacity` durations and payload
+# sizes (rows), next to running totals of calls, errors, seconds and rows.
+# p50/p95 come from the ring buffer, so they describe recent behaviour while
+# counts and sums cover the whole uptime. snapshot() feeds System Status;
+# to_json() and to_prometheus() export the same figures. Recording is a lock
+# and a few array writes, cheap enough for per-call timing of cached lookups.
+#
+# InstrumentedConnection wraps the GSheetsConnection: conn.read/conn.update
+# and the gspread worksheet calls the SheetWriter and SheetSource make
+# (append_rows, batch_update, add_rows, add_cols, resize, clear, get_values,
+# row_values) are timed as "sheets.<call>".
+
+SHEET_CALLS = ("append_rows", "batch_update", "add_rows", "add_cols", "resize", "clear", "get_values", "row_values")
+
+
+class _Ring:
+    def __init__(self, capacity):
+        self.seconds = np.zeros(capacity)
+        self.sizes = np.full(capacity, np.nan)
+        self.count = self.errors = 0
+        self.total_seconds = self.total_size = 0.0
+        self.last = None
+
+    def add(self, seconds, size, error):
+        i = self.count % len(self.seconds)
+        self.seconds[i] = seconds
+        self.sizes[i] = np.nan if size is None else size
+        self.count += 1
+        self.errors += bool(error)
+        self.total_seconds += seconds
+        self.total_size += 0 if size is None else size
+        self.last = time.time()
+
+    def summary(self):
+        window = self.seconds[:min(self.count, len(self.seconds))]
+        sizes = self.sizes[:len(window)]
+        p50, p95 = np.percentile(window, [50, 95]) if len(window) else (0.0, 0.0)
+        return {
+            "count": self.count, "errors": self.errors,
+            "p50_ms": p50 * 1000, "p95_ms": p95 * 1000, "max_ms": window.max(initial=0) * 1000,
+            "total_s": self.total_seconds,
+            "rows_total": self.total_size, "rows_p50": float(np.nanmedian(sizes)) if np.isfinite(sizes).any() else None,
+            "last_call": self.last,
+        }
+
+
+def _sample(value):
+    # Prometheus sample value at full precision: {:g} would export a count of 1234567 as 1.23457e+06.
+    if isinstance(value, (int, np.integer)):
+        return f"{value:d}"
+    return repr(float(value))
+
+
+class Metrics:
+    def __init__(self, capacity=1024):
+        self.capacity = capacity
+        self.started = time.time()
+        self._rings = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name, seconds, size=None, error=False):
+        with self._lock:
+            ring = self._rings.get(name)
+            if ring is None:
+                ring = self._rings[name] = _Ring(self.capacity)
+            ring.add(seconds, size, error)
+
+    @contextlib.contextmanager
+    def timer(self, name, size=None):
+        """Time the block; set record["size"] inside it to log the payload (rows)."""
+        record = {"size": size}
+        t0 = time.perf_counter()
+        error = False
+        try:
+            yield record
+        except Exception:
+            error = True
+            raise
+        finally:
+            self.observe(name, time.perf_counter() - t0, record["size"], error)
+
+    def timed(self, name, size=None):
+        """Decorator form of timer(); size: optional callable(result) -> payload rows."""
+        def wrap(fn):
+            @functools.wraps(fn)
+            def inner(*args, **kwargs):
+                with self.timer(name) as record:
+                    result = fn(*args, **kwargs)
+                    if size is not None:
+                        record["size"] = size(result)
+                    return result
+            return inner
+        return wrap
+
+    def snapshot(self):
+        """{operation: summary} sorted by name."""
+        with self._lock:
+            return {name: self._rings[name].summary() for name in sorted(self._rings)}
+
+    def to_json(self):
+        return json.dumps({"started": self.started, "uptime_s": time.time() - self.started, "operations": self.snapshot()}, indent=2)
+
+    def to_prometheus(self, prefix="wfm"):
+        """Prometheus text exposition: call/error/row counters and a latency summary per operation."""
+        snap = self.snapshot()
+        lines = [f"# TYPE {prefix}_uptime_seconds gauge", f"{prefix}_uptime_seconds {time.time() - self.started:.3f}"]
+        series = (
+            ("calls_total", "counter", lambda s: [("", s["count"])]),
+            ("errors_total", "counter", lambda s: [("", s["errors"])]),
+            ("payload_rows_total", "counter", lambda s: [("", s["rows_total"])]),
+            ("latency_seconds", "summary", lambda s: [
+                (',quantile="0.5"', s["p50_ms"] / 1000), (',quantile="0.95"', s["p95_ms"] / 1000),
+            ]),
+        )
+        for metric, kind, values in series:
+            lines.append(f"# TYPE {prefix}_{metric} {kind}")
+            for name, s in snap.items():
+                for labels, value in values(s):
+                    lines.append(f'{prefix}_{metric}{{op="{name}"{labels}}} {_sample(value)}')
+                if kind == "summary":
+                    lines.append(f'{prefix}_{metric}_sum{{op="{name}"}} {_sample(s["total_s"])}')
+                    lines.append(f'{prefix}_{metric}_count{{op="{name}"}} {_sample(s["count"])}')
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._rings = {}
+            self.started = time.time()
+
+
+def _rows(value):
+    try:
+        return len(value)
+    except TypeError:
+        return None
+
+
+class _InstrumentedWorksheet:
+    def __init__(self, ws, metrics):
+        self._ws = ws
+        self._metrics = metrics
+
+    def __getattr__(self, name):
+        attr = getattr(self._ws, name)
+        if name not in SHEET_CALLS:
+            return attr
+
+        def call(*args, **kwargs):
+            with self._metrics.timer(f"sheets.{name}") as record:
+                result = attr(*args, **kwargs)
+                # Rows sent for writes, rows received for reads.
+                record["size"] = _rows(args[0]) if args and name in ("append_rows", "batch_update") else _rows(result)
+                return result
+        return call
+
+
+class _InstrumentedClient:
+    def __init__(self, client, metrics):
+        self._client = client
+        self._metrics = metrics
+
+    def _select_worksheet(self, *args, **kwargs):
+        return _InstrumentedWorksheet(self._client._select_worksheet(*args, **kwargs), self._metrics)
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+class InstrumentedConnection:
+    """GSheetsConnection stand-in that times read/update and the worksheet calls behind .client."""
+
+    def __init__(self, conn, metrics):
+        self._conn = conn
+        self._metrics = metrics
+
+    @property
+    def client(self):
+        return _InstrumentedClient(self._conn.client, self._metrics)
+
+    def read(self, *args, **kwargs):
+        with self._metrics.timer("sheets.read") as record:
+            df = self._conn.read(*args, **kwargs)
+            record["size"] = _rows(df)
+            return df
+
+    def update(self, *args, **kwargs):
+        data = kwargs.get("data", args[1] if len(args) > 1 else None)
+        with self._metrics.timer("sheets.update", size=_rows(data)):
+            return self._conn.update(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
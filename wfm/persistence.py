@@ -0,0 +1,292 @@
+import functools
+import re
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+# ==========================================
+# DELTA-BASED GOOGLE SHEETS PERSISTENCE
+# ==========================================
+# conn.update() clears the worksheet and re-uploads the whole DataFrame. The
+# SheetWriter instead remembers, per worksheet, which sheet row holds which
+# key and a hash of its cells as last read/written. A push then only appends
+# new keys and rewrites rows whose hash changed, in chunks, each chunk retried
+# with exponential backoff. Worksheets without a key are treated as
+# append-only logs keyed by row position. Anything the delta can't express
+# (dropped rows, changed columns, a snapshot dropped after a failed push)
+# becomes a chunked rewrite. sync() never rewrites a worksheet that was not
+# read first: the frame it was given can't be known to hold the sheet's rows
+# (e.g. a fallback table after a failed read), so it raises instead.
+#
+# Writes to fixed ranges (batch_update, resize) are safe to repeat and are
+# retried on any error. An append is not: a timeout or 5xx can arrive after
+# Sheets applied it, so before appending again the writer counts the rows
+# below where the chunk should have landed and only re-sends it if none are
+# there (429 rate limits are known not to apply and are retried directly). A
+# rewrite overwrites rows in place and trims the leftovers last, so a failure
+# part-way never leaves the sheet truncated. Any failed push drops the
+# worksheet's snapshot, so the next sync() starts over with a rewrite instead
+# of trusting row numbers that may no longer hold. Pushes to one worksheet
+# are serialized by a per-worksheet lock, so callers can push without holding
+# any app-wide lock (CSV imports push chunk by chunk).
+#
+# The writer talks to the gspread Worksheet behind GSheetsConnection
+# (append_rows / batch_update / clear), or to any fake exposing the same calls.
+
+_ROW_IN_RANGE = re.compile(r"![A-Z]+(\d+)")
+
+
+def _cells(df):
+    cells = {}
+    for i, col in enumerate(df.columns):
+        s = df.iloc[:, i]
+        if pd.api.types.is_datetime64_any_dtype(s):
+            s = s.dt.strftime("%Y-%m-%d %H:%M:%S")
+        elif s.dtype == np.float32:
+            # Shortest repr of the float32 value, so 0.8 is written as 0.8 and not 0.800000011920929.
+            s = s.astype(str).astype(float)
+        cells[i] = s.astype(object).where(s.notna(), "")
+    out = pd.DataFrame(cells, index=df.index)
+    out.columns = df.columns
+    return out
+
+
+def _rate_limited(error):
+    # gspread.exceptions.APIError carries the HTTP response.
+    return getattr(getattr(error, "response", None), "status_code", None) == 429
+
+
+def _locked(method):
+    @functools.wraps(method)
+    def inner(self, worksheet, *args, **kwargs):
+        with self.lock(worksheet):
+            return method(self, worksheet, *args, **kwargs)
+    return inner
+
+
+def _to_values(cells):
+    return [[v.item() if isinstance(v, np.generic) else v for v in row] for row in cells.itertuples(index=False, name=None)]
+
+
+class SheetWriter:
+    def __init__(self, conn, keys=None, chunk_rows=500, max_retries=5, backoff=1.0, sleep=time.sleep):
+        self.conn = conn
+        self.keys = keys or {}
+        self.chunk_rows = chunk_rows
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.sleep = sleep
+        self._snapshots = {}
+        # Worksheets track()ed at least once; their snapshot may since have been dropped.
+        self._read = set()
+        self._handles = {}
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    def lock(self, worksheet):
+        with self._locks_guard:
+            return self._locks.setdefault(worksheet, threading.RLock())
+
+    # --- snapshot bookkeeping ---
+    def _index(self, worksheet, cells):
+        key_cols = self.keys.get(worksheet)
+        if key_cols and all(c in cells.columns for c in key_cols):
+            idx = pd.MultiIndex.from_frame(cells[key_cols].astype(str))
+            if idx.is_unique:
+                return idx
+        return pd.RangeIndex(len(cells))
+
+    def _hashes(self, cells):
+        return pd.util.hash_pandas_object(cells, index=False).to_numpy()
+
+    @_locked
+    def track(self, worksheet, df):
+        """Record df as the current content of worksheet (call right after conn.read)."""
+        cells = _cells(df)
+        self._snapshots[worksheet] = {
+            "columns": list(df.columns),
+            "rows": pd.DataFrame({"row": np.arange(2, len(df) + 2), "hash": self._hashes(cells)}, index=self._index(worksheet, cells)),
+        }
+        self._read.add(worksheet)
+
+    def is_tracked(self, worksheet):
+        return worksheet in self._snapshots
+
+    @_locked
+    def in_sheet_order(self, worksheet, df):
+        """df reordered to the row order the worksheet holds it in (for mirrors of the sheet)."""
+        snap = self._snapshots.get(worksheet)
+        if snap is None or isinstance(snap["rows"].index, pd.RangeIndex):
+            return df
+        pos = snap["rows"].index.get_indexer(self._index(worksheet, _cells(df)))
+        if (pos < 0).any():
+            return df
+        return df.iloc[np.argsort(snap["rows"]["row"].to_numpy()[pos], kind="stable")]
+
+    # --- backend calls ---
+    def _retry(self, fn, *args, **kwargs):
+        """Call fn with exponential backoff; only for calls that are safe to repeat."""
+        for attempt in range(self.max_retries):
+            try:
+                return fn(*args, **kwargs)
+            except Exception:
+                if attempt == self.max_retries - 1:
+                    raise
+                self.sleep(self.backoff * (2 ** attempt))
+
+    def _worksheet(self, worksheet):
+        if worksheet not in self._handles:
+            self._handles[worksheet] = self.conn.client._select_worksheet(worksheet=worksheet)
+        return self._handles[worksheet]
+
+    def _append_once(self, ws, chunk, start):
+        """Append chunk, expected to land at sheet row `start`, exactly once; returns the row it landed at."""
+        for attempt in range(self.max_retries):
+            try:
+                resp = ws.append_rows(chunk, value_input_option="USER_ENTERED", table_range="A1")
+            except Exception as e:
+                if attempt == self.max_retries - 1:
+                    raise
+                if not _rate_limited(e):
+                    landed = len(self._retry(ws.get_values, f"A{start}:ZZ"))
+                    if landed == len(chunk):
+                        return start
+                    if landed:
+                        raise RuntimeError(f"{ws.title}: {landed} rows below row {start} after a failed append of {len(chunk)}") from e
+                self.sleep(self.backoff * (2 ** attempt))
+            else:
+                match = _ROW_IN_RANGE.search(str((resp or {}).get("updates", {}).get("updatedRange", "")))
+                return int(match.group(1)) if match else start
+
+    def _append_chunks(self, worksheet, values, start):
+        """Append values in chunks below sheet row start - 1; returns the first sheet row of each chunk."""
+        ws = self._worksheet(worksheet)
+        first_rows = []
+        for i in range(0, len(values), self.chunk_rows):
+            chunk = values[i:i + self.chunk_rows]
+            start = self._append_once(ws, chunk, start)
+            first_rows.append(start)
+            start += len(chunk)
+        return first_rows
+
+    def _update_chunks(self, worksheet, row_numbers, values):
+        ws = self._worksheet(worksheet)
+        for i in range(0, len(values), self.chunk_rows):
+            body = [{"range": f"A{r}", "values": [v]} for r, v in zip(row_numbers[i:i + self.chunk_rows], values[i:i + self.chunk_rows])]
+            self._retry(ws.batch_update, body, value_input_option="USER_ENTERED")
+
+    # --- public API ---
+    @_locked
+    def append(self, worksheet, rows):
+        """Append rows that are known to be new (exception log entries, new users)."""
+        if rows.empty:
+            return 0
+        snap = self._snapshots.get(worksheet)
+        if snap is None or list(rows.columns) != snap["columns"]:
+            raise ValueError(f"{worksheet} has not been read with matching columns; use sync() instead")
+        return self._append_cells(worksheet, _cells(rows))
+
+    def _append_cells(self, worksheet, cells, hashes=None, index=None):
+        # append() of rows already converted to cells; a push passes the hashes and keys it computed for them.
+        snap = self._snapshots[worksheet]
+        values = _to_values(cells)
+        prev = snap["rows"]
+        try:
+            starts = self._append_chunks(worksheet, values, int(prev["row"].max()) + 1 if len(prev) else 2)
+        except Exception:
+            self._snapshots.pop(worksheet, None)
+            raise
+        row_numbers = []
+        for i, start in enumerate(starts):
+            row_numbers.extend(range(start, start + len(values[i * self.chunk_rows:(i + 1) * self.chunk_rows])))
+        if isinstance(prev.index, pd.RangeIndex):
+            index = pd.RangeIndex(len(prev), len(prev) + len(cells))
+        elif index is None:
+            index = self._index(worksheet, cells)
+        added = pd.DataFrame({"row": row_numbers, "hash": self._hashes(cells) if hashes is None else hashes}, index=index)
+        snap["rows"] = pd.concat([prev, added]) if len(prev) else added
+        if not isinstance(prev.index, pd.RangeIndex) and not snap["rows"].index.is_unique:
+            # Appended a key that already existed: positions are no longer a key map.
+            del self._snapshots[worksheet]
+        return len(cells)
+
+    @_locked
+    def rewrite(self, worksheet, df):
+        """Overwrite the worksheet with df in chunks, then trim the rows and columns it held beyond df."""
+        ws = self._worksheet(worksheet)
+        values = [[str(c) for c in df.columns]] + _to_values(_cells(df))
+        try:
+            # Grid room for every row and column of df below/right of what the sheet holds; the resize trims it.
+            self._retry(ws.add_rows, len(values))
+            self._retry(ws.add_cols, len(df.columns))
+            for i in range(0, len(values), self.chunk_rows):
+                self._retry(ws.batch_update, [{"range": f"A{i + 1}", "values": values[i:i + self.chunk_rows]}], value_input_option="USER_ENTERED")
+            self._retry(ws.resize, rows=len(values), cols=max(len(df.columns), 1))
+        except Exception:
+            self._snapshots.pop(worksheet, None)
+            raise
+        self.track(worksheet, df)
+        return {"appended": len(df), "updated": 0, "rewritten": True}
+
+    def can_append(self, worksheet, columns):
+        snap = self._snapshots.get(worksheet)
+        return snap is not None and list(columns) == snap["columns"]
+
+    def can_upsert(self, worksheet, columns):
+        snap = self._snapshots.get(worksheet)
+        return snap is not None and list(columns) == snap["columns"] and not isinstance(snap["rows"].index, pd.RangeIndex)
+
+    @_locked
+    def upsert(self, worksheet, df):
+        """Append new keys and rewrite changed rows of df, without diffing the rest of the table."""
+        if not self.can_upsert(worksheet, df.columns):
+            raise ValueError(f"{worksheet} is not tracked by key with these columns; use sync() instead")
+        cells = _cells(df)
+        index = self._index(worksheet, cells)
+        if isinstance(index, pd.RangeIndex):
+            raise ValueError("upsert() needs rows with unique keys")
+        return self._push_delta(worksheet, df, cells, index)
+
+    @_locked
+    def sync(self, worksheet, df):
+        """Push only the rows of df that differ from what the worksheet holds."""
+        if worksheet not in self._read:
+            raise ValueError(f"{worksheet} has never been read; refusing to overwrite it with sync()")
+        snap = self._snapshots.get(worksheet)
+        if snap is None or list(df.columns) != snap["columns"]:
+            return self.rewrite(worksheet, df)
+        prev = snap["rows"]
+        cells = _cells(df)
+        index = self._index(worksheet, cells)
+        if type(index) is not type(prev.index):
+            return self.rewrite(worksheet, df)
+        if isinstance(index, pd.RangeIndex):
+            if len(df) < len(prev):
+                return self.rewrite(worksheet, df)
+        elif not prev.index.isin(index).all():
+            return self.rewrite(worksheet, df)
+        return self._push_delta(worksheet, df, cells, index)
+
+    def _push_delta(self, worksheet, df, cells, index):
+        prev = self._snapshots[worksheet]["rows"]
+        hashes = self._hashes(cells)
+        pos = prev.index.get_indexer(index)
+        is_new = pos < 0
+        changed = np.zeros(len(df), dtype=bool)
+        if len(prev):
+            changed = ~is_new & (prev["hash"].to_numpy()[np.maximum(pos, 0)] != hashes)
+
+        if changed.any():
+            rows = prev["row"].to_numpy()[pos[changed]].tolist()
+            try:
+                self._update_chunks(worksheet, rows, _to_values(cells[changed]))
+            except Exception:
+                self._snapshots.pop(worksheet, None)
+                raise
+            prev.iloc[pos[changed], prev.columns.get_loc("hash")] = hashes[changed]
+        if is_new.any():
+            # The new rows' cells, hashes and keys are already computed: append them as they are.
+            self._append_cells(worksheet, cells[is_new], hashes[is_new], None if isinstance(index, pd.RangeIndex) else index[is_new])
+        return {"appended": int(is_new.sum()), "updated": int(changed.sum()), "rewritten": False}
@@ -0,0 +1,140 @@
+import numpy as np
+import pandas as pd
+
+from wfm.aggregate import DAY_NS
+from wfm.incremental import ReversibleIndex
+
+# ==========================================
+# DAILY ROLLUPS
+# ==========================================
+# master_data summed per (Country, Channel) x day: Volume, SLA*Volume,
+# AHT*Volume, FTE and the row count, as one float64 array. The Dashboard KPIs
+# and the daily charts for any market selection are re-sums over the selected
+# series instead of a filter and groupby over every interval row. Missing
+# metrics count as 0, as the Dashboard's fillna did. Rows without a Date or
+# Channel are kept (in an undated column / under a None channel) so the KPIs
+# still cover them; the daily views leave them out, as a groupby would. Sums
+# are kept so an import can be folded in (wfm.incremental).
+
+MEASURES = ("Volume", "SLA_x_vol", "AHT_x_vol", "FTE", "Rows")
+UNDATED = np.iinfo(np.int64).min
+
+
+def _codes(values):
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    return codes, [None if pd.isna(u) else u for u in uniques]
+
+
+class DailyRollups(ReversibleIndex):
+    def __init__(self):
+        super().__init__()
+        self._reset()
+
+    def __len__(self):
+        return len(self._series)
+
+    @property
+    def nbytes(self):
+        return self._sums.nbytes
+
+    # --- maintenance ---
+    def _reset(self):
+        self._series, self._days = {}, {}
+        self._sums = np.zeros((len(MEASURES), 0, 0))
+
+    def add(self, rows, sign=1):
+        """Add rows to the sums (sign=-1 removes rows that an import overwrote)."""
+        rows = rows[rows['Country'].notna().to_numpy()]
+        if rows.empty:
+            return
+        country, countries = _codes(rows['Country'].astype(object).to_numpy())
+        channel, channels = _codes(rows['Channel'].astype(object).to_numpy())
+        ns = rows['Date'].to_numpy(dtype='datetime64[ns]').astype(np.int64)
+        day_no = np.where(ns == np.iinfo(np.int64).min, UNDATED, ns // DAY_NS)
+        days, day = np.unique(day_no, return_inverse=True)
+        combo, series = np.unique(country.astype(np.int64) * max(len(channels), 1) + channel, return_inverse=True)
+        keys = [(countries[c // max(len(channels), 1)], channels[c % max(len(channels), 1)]) for c in combo]
+        vol = np.nan_to_num(rows['Volume'].to_numpy(dtype=float))
+        weights = (
+            vol,
+            np.nan_to_num(rows['SLA'].to_numpy(dtype=float)) * vol,
+            np.nan_to_num(rows['AHT'].to_numpy(dtype=float)) * vol,
+            np.nan_to_num(rows['FTE'].to_numpy(dtype=float)),
+            np.ones(len(rows)),
+        )
+        with self._lock:
+            for index, new in ((self._series, keys), (self._days, days.tolist())):
+                for k in new:
+                    if k not in index:
+                        index[k] = len(index)
+            grown = (len(MEASURES), len(self._series), len(self._days))
+            if grown != self._sums.shape:
+                sums = np.zeros(grown)
+                sums[:, :self._sums.shape[1], :self._sums.shape[2]] = self._sums
+                self._sums = sums
+            at = np.array([self._series[k] for k in keys])[series] * grown[2] + np.array([self._days[d] for d in days.tolist()])[day]
+            for m, w in enumerate(weights):
+                self._sums[m] += sign * np.bincount(at, weights=w, minlength=grown[1] * grown[2]).reshape(grown[1:])
+            # Cells whose rows were all removed go back to exactly 0.
+            self._sums[:, self._sums[-1] <= 0] = 0
+
+    def remove(self, rows):
+        self.add(rows, sign=-1)
+
+    # --- lookups ---
+    def _selected(self, countries):
+        countries = set(countries)
+        return [(k, i) for k, i in self._series.items() if k[0] in countries]
+
+    def totals(self, countries):
+        """Rows, total Volume, volume-weighted SLA and AHT (0 without volume) and average FTE per row."""
+        with self._lock:
+            rows = [i for _, i in self._selected(countries)]
+            vol, sla, aht, fte, n = self._sums[:, rows].sum(axis=(1, 2))
+        return {
+            "Rows": int(n), "Volume": vol,
+            "SLA": sla / vol if vol > 0 else 0.0, "AHT": aht / vol if vol > 0 else 0.0,
+            "FTE": fte / n if n else np.nan,
+        }
+
+    def daily(self, countries, by="Channel"):
+        """Day, `by` ('Channel' or 'Country'), Volume, weighted SLA/AHT (NaN without volume) and mean FTE
+        for every dated group with rows, sorted by Day then `by`."""
+        level = 1 if by == "Channel" else 0
+        with self._lock:
+            selected = [(k, i) for k, i in self._selected(countries) if k[level] is not None]
+            dated = sorted((d, c) for d, c in self._days.items() if d != UNDATED)
+            labels = sorted({k[level] for k, _ in selected}, key=str)
+            group = np.array([labels.index(k[level]) for k, _ in selected], dtype=np.int64)
+            cols = np.array([c for _, c in dated], dtype=np.int64)
+            sums = np.zeros((len(MEASURES), len(labels), len(cols)))
+            if len(selected) and len(cols):
+                np.add.at(sums, (slice(None), group), self._sums[:, [i for _, i in selected]][:, :, cols])
+        vol, sla, aht, fte, n = (s.T.ravel() for s in sums)
+        keep = n > 0
+        with np.errstate(invalid='ignore', divide='ignore'):
+            out = pd.DataFrame({
+                "Day": np.repeat(np.array([d for d, _ in dated], dtype=np.int64) * DAY_NS, len(labels)).astype('datetime64[ns]'),
+                by: np.tile(np.array(labels, dtype=object), len(cols)),
+                "Volume": vol,
+                "SLA": np.where(vol > 0, sla / vol, np.nan),
+                "AHT": np.where(vol > 0, aht / vol, np.nan),
+                "FTE": fte / n,
+            })
+        return out[keep].reset_index(drop=True)
+
+
+def downsample(frame, max_points=400, x="Day", by=None):
+    """frame unchanged when it spans at most max_points days; otherwise the mean per equal bucket of
+    days (x = first day of the bucket, per `by` group), so long ranges plot at daily scale."""
+    if frame.empty:
+        return frame
+    days = (frame[x] - frame[x].min()).dt.days.to_numpy()
+    span = int(days.max()) + 1
+    if span <= max_points:
+        return frame
+    width = -(-span // max_points)
+    bucket = frame[x].min() + pd.to_timedelta(days // width * width, unit="D")
+    keys = [bucket.rename(x)] + ([frame[by]] if by else [])
+    values = frame.drop(columns=[x] + ([by] if by else []))
+    return values.groupby(keys, sort=True).mean().reset_index()
@@ -0,0 +1,60 @@
+import calendar
+
+import numpy as np
+import pandas as pd
+
+from wfm.erlang import required_agents
+from wfm.forecast import DEFAULT_AHT
+
+# ==========================================
+# ROSTER REQUIREMENT MATRIX
+# ==========================================
+# A month's staffing requirement is one int array req[day, slot, channel]:
+# each forecast day's volume is spread over the slots by the channel's
+# intraday curve for that weekday, and every cell is staffed in a single
+# batched solve (`solve` as in wfm.forecast.forecast_grid). The roster
+# template is laid out from the array directly: in each slot, agents are
+# handed channels in channel order, so Agent_i works the channel whose
+# cumulative requirement first exceeds i-1.
+
+MIN_TEMPLATE_AGENTS = 10
+
+
+def requirement_matrix(f_month, year, month, channels, curves, aht=DEFAULT_AHT, target_sl=0.8, solve=required_agents):
+    """Agents needed per [day, slot, channel] for one market's forecast_db rows of a month.
+
+    curves[channel, weekday, slot] are the channels' intraday shares (IntradayProfiles.curves);
+    a day without a forecast row for a channel needs no agents for it."""
+    curves = np.asarray(curves, dtype=float)
+    n_days = calendar.monthrange(int(year), int(month))[1]
+    n_channels, n_slots = len(channels), curves.shape[2]
+    dates = f_month['Date']
+    on_day = (dates == dates.dt.normalize()) & (dates.dt.year == year) & (dates.dt.month == month)
+    ch = pd.Index(channels).get_indexer(f_month['Channel'])
+    keep = (on_day.to_numpy() & (ch >= 0))
+    cell = (dates.dt.day.to_numpy()[keep] - 1) * n_channels + ch[keep]
+    volume = np.bincount(cell, weights=np.nan_to_num(f_month['Forecast_Volume'].to_numpy(dtype=float)[keep]), minlength=n_days * n_channels)
+    present = np.bincount(cell, minlength=n_days * n_channels) > 0
+    volume, present = volume.reshape(n_days, n_channels), present.reshape(n_days, n_channels)
+
+    weekday = np.array([calendar.weekday(int(year), int(month), d) for d in range(1, n_days + 1)])
+    # [day, channel, slot] -> [day, slot, channel]
+    slot_volume = (volume[:, :, None] * curves[np.arange(n_channels)[None, :], weekday[:, None], :]).transpose(0, 2, 1)
+    req = np.asarray(solve(slot_volume, aht, target_sl)).reshape(n_days, n_slots, n_channels)
+    return np.where(present[:, None, :], req, 0)
+
+
+def roster_template(req, channels, times, min_agents=MIN_TEMPLATE_AGENTS):
+    """schedule_db-shaped template (Agent, Time, '1'..'31') assigning generic agents to req[day, slot, channel]."""
+    n_days, n_slots, _ = req.shape
+    cum = np.cumsum(req, axis=2)
+    n_agents = int(cum[..., -1].max(initial=0)) or min_agents
+    # Channel index per [agent, day, slot]: how many cumulative counts the agent's rank reaches.
+    rank = np.arange(n_agents)[:, None, None, None]
+    pick = (cum[None] <= rank).sum(axis=3)
+    labels = np.array(list(channels) + [""], dtype=object)
+    cells = labels[pick].transpose(0, 2, 1).reshape(n_agents * n_slots, n_days)
+    out = pd.DataFrame(cells, columns=[str(d) for d in range(1, n_days + 1)])
+    out.insert(0, "Time", np.tile(np.asarray(times, dtype=object), n_agents))
+    out.insert(0, "Agent", np.repeat(np.array([f"Agent_{i}" for i in range(1, n_agents + 1)], dtype=object), n_slots))
+    return out
@@ -0,0 +1,267 @@
+import hashlib
+import itertools
+import json
+import multiprocessing
+import os
+import pickle
+import signal
+import subprocess
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pandas as pd
+
+from wfm.erlang import service_level, unique_rows
+from wfm.forecast import DEFAULT_AHT
+from wfm.staffing_cache import StaffingCache
+
+# ==========================================
+# WHAT-IF SCENARIO ENGINE
+# ==========================================
+# A scenario rescales the active forecast (AHT factor, volume factor, annual
+# growth compounded over the horizon), restaffs every interval for its SL
+# target and turns agent-intervals into headcount and cost with its shrinkage
+# and hourly cost. The Erlang solve only depends on (AHT factor, volume
+# factor, growth, SL target, answer time), so scenarios that differ only in
+# shrinkage or cost share one solve. Solves run in a process pool (each
+# worker keeps its own StaffingCache across tasks); the cheap headcount/cost
+# step runs in the caller. Results are cached per scenario hash, which covers
+# the parameters and a key for the forecast inputs (e.g. table versions).
+#
+# The pool lives in a host process started as `python -m wfm.scenarios`, not
+# in the app process: multiprocessing workers re-import their parent's
+# __main__, and under Streamlit that is the app script. The host's __main__ is
+# this module, so its spawned workers only import wfm code. The engine sends
+# the host one batch at a time over its stdin/stdout. A pool whose worker died
+# (BrokenProcessPool) is rebuilt and the batch retried once; so is a host that
+# stopped.
+
+SHIFT_HOURS = 8
+DEFAULTS = {
+    "aht_factor": 1.0, "volume_factor": 1.0, "growth": 0.0, "target_sl": 0.8, "target_time": 20,
+    "shrinkage": 0.2, "hourly_cost": 20.0,
+}
+SOLVE_PARAMS = ("aht_factor", "volume_factor", "growth", "target_sl", "target_time")
+
+
+def scenario_inputs(forecast_db, aht=None, curves=None, slot_minutes=30):
+    """Arrays a scenario is evaluated on: daily Forecast_Volume[series, day] for the observed
+    (Country, Channel) series, AHT per series and intraday curves[series, weekday, slot].
+
+    aht: Series indexed by (Country, Channel), e.g. forecast.series_baselines()['AHT'];
+    curves: callable(keys) -> array, e.g. lambda keys: profiles.curves(keys, slot_minutes)."""
+    f = forecast_db.dropna(subset=['Date', 'Country', 'Channel'])
+    series, keys = pd.MultiIndex.from_arrays([f['Country'].astype(object), f['Channel'].astype(object)]).factorize(sort=True)
+    keys = keys.set_names(['Country', 'Channel'])
+    day, dates = pd.factorize(f['Date'].dt.normalize(), sort=True)
+    volume = np.zeros((len(keys), len(dates)))
+    np.add.at(volume, (series, day), np.nan_to_num(f['Forecast_Volume'].to_numpy(dtype=float)))
+    n_slots = 1440 // slot_minutes
+    aht = (aht.reindex(keys) if aht is not None else pd.Series(np.nan, index=keys)).fillna(DEFAULT_AHT).to_numpy(dtype=float)
+    curves = np.asarray(curves(keys)) if curves is not None else np.full((len(keys), 7, n_slots), 1.0 / n_slots)
+    return {
+        "keys": keys, "dates": pd.DatetimeIndex(dates), "volume": volume, "aht": aht, "curves": curves,
+        "slot_minutes": slot_minutes,
+    }
+
+
+def scenario_grid(aht_factors=(1.0,), target_sls=(0.8,), shrinkages=(0.2,), growths=(0.0,), **fixed):
+    """Every combination of the given values as scenario parameter dicts."""
+    return [
+        dict(fixed, aht_factor=a, target_sl=s, shrinkage=h, growth=g)
+        for a, s, h, g in itertools.product(aht_factors, target_sls, shrinkages, growths)
+    ]
+
+
+def scenario_label(p):
+    return (f"AHT {p['aht_factor'] - 1:+.0%} · SL {p['target_sl']:.0%} · Shrink {p['shrinkage']:.0%} · "
+            f"Growth {p['growth']:+.0%}/yr" + (f" · Volume x{p['volume_factor']:g}" if p['volume_factor'] != 1 else ""))
+
+
+def scenario_hash(params, key=None):
+    p = {**DEFAULTS, **params}
+    return hashlib.sha1(json.dumps([key, sorted((k, float(v)) for k, v in p.items() if k in DEFAULTS)]).encode()).hexdigest()
+
+
+_WORKER_CACHE = None
+
+
+def solve_scenario(inputs, params):
+    """Agent-intervals[series, day], answered volume within target and volume per series for one solve key."""
+    global _WORKER_CACHE
+    if _WORKER_CACHE is None:
+        _WORKER_CACHE = StaffingCache()
+    p = {**DEFAULTS, **params}
+    dates = inputs["dates"]
+    ahead = np.asarray((dates - dates[0]).days, dtype=float) + 1
+    volume = inputs["volume"] * p["volume_factor"] * (1 + p["growth"]) ** (ahead / 365)
+    slot_volume = volume[:, :, None] * inputs["curves"][:, np.asarray(dates.dayofweek), :]
+    aht = np.broadcast_to((inputs["aht"] * p["aht_factor"])[:, None, None], slot_volume.shape)
+    agents = _WORKER_CACHE.required_fte_many(slot_volume, aht, p["target_sl"], p["target_time"])
+    # Service level of the staffed intervals, solved once per distinct (volume, AHT, agents).
+    rows, inverse = unique_rows(np.column_stack([_WORKER_CACHE.quantize(slot_volume).ravel(), aht.ravel(), agents.ravel()]))
+    sl = service_level(rows[:, 0], rows[:, 1], p["target_time"], rows[:, 2])[inverse].reshape(slot_volume.shape)
+    return agents.sum(axis=2), (sl * slot_volume).sum(axis=(1, 2)), slot_volume.sum(axis=(1, 2))
+
+
+def summarize(inputs, params, solved):
+    """Tidy rows per Country (and 'All') for one scenario from its solve."""
+    p = {**DEFAULTS, **params}
+    agent_intervals, answered, volume = solved
+    slot_hours = inputs["slot_minutes"] / 60
+    gross = 1 / (1 - p["shrinkage"])
+    countries = inputs["keys"].get_level_values('Country')
+    rows = []
+    for country in list(pd.unique(countries)) + ["All"]:
+        sel = np.ones(len(countries), dtype=bool) if country == "All" else np.asarray(countries == country)
+        daily = agent_intervals[sel].sum(axis=0) * slot_hours * gross
+        headcount = np.ceil(daily / SHIFT_HOURS)
+        hours = daily.sum()
+        vol = volume[sel].sum()
+        rows.append({
+            "Scenario": scenario_label(p), "Country": country,
+            **{k: p[k] for k in ("aht_factor", "target_sl", "shrinkage", "growth", "volume_factor", "hourly_cost")},
+            "Avg_Headcount": headcount.mean() if len(headcount) else 0.0,
+            "Peak_Headcount": int(headcount.max(initial=0)),
+            "Agent_Hours": hours,
+            "Cost": hours * p["hourly_cost"],
+            "Expected_SL": answered[sel].sum() / vol if vol else 1.0,
+        })
+    return pd.DataFrame(rows)
+
+
+def _serve(max_workers):
+    """Pool host main loop: read (inputs, solve params) batches from stdin, reply with the solves."""
+    requests, replies = sys.stdin.buffer, sys.stdout.buffer
+    sys.stdout = sys.stderr  # the pipe carries replies only
+    pool = None
+    while True:
+        try:
+            inputs, jobs = pickle.load(requests)
+        except EOFError:
+            break
+        for _ in range(2):
+            try:
+                if pool is None:
+                    pool = ProcessPoolExecutor(max_workers or None, mp_context=multiprocessing.get_context("spawn"))
+                reply = ("ok", [f.result() for f in [pool.submit(solve_scenario, inputs, j) for j in jobs]])
+                break
+            except BrokenProcessPool as e:
+                pool.shutdown(wait=False, cancel_futures=True)
+                pool, reply = None, ("error", e)
+            except Exception as e:
+                reply = ("error", e)
+                break
+        pickle.dump(reply, replies, protocol=pickle.HIGHEST_PROTOCOL)
+        replies.flush()
+    if pool is not None:
+        pool.shutdown(cancel_futures=True)
+
+
+class _PoolHost:
+    def __init__(self, max_workers):
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        path = os.pathsep.join(p for p in (root, os.environ.get("PYTHONPATH")) if p)
+        # Own process group, so close() also takes down workers a killed host left behind.
+        self._proc = subprocess.Popen([sys.executable, "-m", "wfm.scenarios", str(max_workers or 0)],
+                                      stdin=subprocess.PIPE, stdout=subprocess.PIPE, cwd=root, start_new_session=True,
+                                      env={**os.environ, "PYTHONPATH": path})
+
+    def alive(self):
+        return self._proc.poll() is None
+
+    def solve(self, inputs, jobs):
+        pickle.dump((inputs, jobs), self._proc.stdin, protocol=pickle.HIGHEST_PROTOCOL)
+        self._proc.stdin.flush()
+        status, value = pickle.load(self._proc.stdout)
+        if status == "error":
+            raise value
+        return value
+
+    def close(self):
+        try:
+            self._proc.stdin.close()
+            self._proc.wait(timeout=10)
+        except (OSError, subprocess.TimeoutExpired):
+            pass
+        try:
+            os.killpg(self._proc.pid, signal.SIGKILL)
+        except OSError:
+            pass  # the group already exited
+        self._proc.wait()
+
+
+class ScenarioEngine:
+    """Evaluates batches of scenarios in a process pool, caching results per scenario hash."""
+
+    def __init__(self, max_workers=None, max_entries=1_000):
+        self.max_workers = max_workers
+        self.max_entries = max_entries
+        self.hits = self.misses = 0
+        self._results = OrderedDict()
+        self._host = None
+        self._lock = threading.Lock()
+        # One batch at a time goes through the host.
+        self._host_lock = threading.Lock()
+
+    def _solve_parallel(self, inputs, jobs):
+        with self._host_lock:
+            for attempt in range(2):
+                if self._host is not None and not self._host.alive():
+                    self._host.close()
+                    self._host = None
+                if self._host is None:
+                    self._host = _PoolHost(self.max_workers)
+                try:
+                    return self._host.solve(inputs, jobs)
+                except (EOFError, OSError, pickle.UnpicklingError) as e:
+                    # The host stopped mid-batch: start a new one and retry once.
+                    self._host.close()
+                    self._host = None
+                    if attempt:
+                        raise BrokenProcessPool("the scenario pool host stopped") from e
+
+    def run(self, inputs, scenarios, key=None, parallel=True):
+        """Comparison table (one row per scenario x Country, plus 'All') for a batch of parameter dicts."""
+        scenarios = [{**DEFAULTS, **s} for s in scenarios]
+        hashes = [scenario_hash(s, key) for s in scenarios]
+        with self._lock:
+            todo = [(h, s) for h, s in zip(hashes, scenarios) if h not in self._results]
+            self.hits += len(scenarios) - len(todo)
+            self.misses += len(todo)
+        solve_keys = {}
+        for h, s in todo:
+            solve_keys.setdefault(tuple(s[k] for k in SOLVE_PARAMS), []).append((h, s))
+        jobs = [dict(zip(SOLVE_PARAMS, k)) for k in solve_keys]
+        if parallel and len(jobs) > 1:
+            solved = self._solve_parallel(inputs, jobs)
+        else:
+            solved = [solve_scenario(inputs, j) for j in jobs]
+        with self._lock:
+            for group, result in zip(solve_keys.values(), solved):
+                for h, s in group:
+                    self._results[h] = summarize(inputs, s, result)
+            out = [self._results[h] for h in hashes]
+            for h in hashes:
+                self._results.move_to_end(h)
+            while len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+        return pd.concat(out, ignore_index=True) if out else pd.DataFrame()
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._results), "hits": self.hits, "misses": self.misses}
+
+    def shutdown(self):
+        with self._host_lock:
+            if self._host is not None:
+                self._host.close()
+                self._host = None
+
+
+if __name__ == "__main__":
+    _serve(int(sys.argv[1]) if len(sys.argv) > 1 else 0)
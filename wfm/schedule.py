@@ -0,0 +1,64 @@
+import calendar
+
+import numpy as np
+import pandas as pd
+
+from wfm.schema import TABLE_COLUMNS, concat_typed, normalize
+
+# ==========================================
+# SCHEDULE STORAGE (schedule_db)
+# ==========================================
+# schedule_db keeps the sheet layout (one row per Country, YearMonth, Agent,
+# Time with day columns "1".."31"), but every column is categorical: a day
+# cell is an int8 code into the few activities used (channels, Break, ...)
+# rather than a Python string. Templates are read straight into categoricals
+# and written back with to_csv. An upload only touches its market-months: the
+# rest of the table is carried over as is, and (Agent, Time) duplicates are
+# resolved among that month's rows and the upload.
+
+KEY = ["Country", "YearMonth", "Agent", "Time"]
+DAY_COLUMNS = [str(d) for d in range(1, 32)]
+
+
+def template_rows(template, country, year_month):
+    """Typed schedule_db rows from an Agent/Time/'1'..'31' template (CSV file or frame) for one market-month.
+
+    Columns outside the schedule_db layout are ignored; for a repeated (Agent, Time) the last row wins."""
+    df = template if isinstance(template, pd.DataFrame) else pd.read_csv(template, dtype="category")
+    missing = [c for c in ("Agent", "Time") if c not in df.columns]
+    if missing:
+        raise ValueError(f"Schedule template is missing column(s): {', '.join(missing)}")
+    df = df.drop(columns=[c for c in ("Country", "YearMonth") if c in df.columns])
+    rows = df.reindex(columns=TABLE_COLUMNS["schedule_db"])
+    rows["Country"] = pd.Categorical([country] * len(rows))
+    rows["YearMonth"] = pd.Categorical([year_month] * len(rows))
+    rows = normalize(rows, "schedule_db")
+    return rows[rows["Agent"].notna() & rows["Time"].notna()].drop_duplicates(["Agent", "Time"], keep="last").reset_index(drop=True)
+
+
+def template_frame(rows):
+    """The Agent/Time/day-columns template (CSV layout) for one market-month of schedule_db rows."""
+    year, month = (int(x) for x in str(rows["YearMonth"].iloc[0]).split("-")) if len(rows) else (2000, 1)
+    days = DAY_COLUMNS[:calendar.monthrange(year, month)[1]]
+    return rows[["Agent", "Time"] + days].reset_index(drop=True)
+
+
+def month_mask(schedule_db, months):
+    """Rows of schedule_db belonging to any (Country, YearMonth) in months."""
+    mask = np.zeros(len(schedule_db), dtype=bool)
+    for country, year_month in months:
+        mask |= ((schedule_db["Country"] == country) & (schedule_db["YearMonth"] == year_month)).to_numpy()
+    return mask
+
+
+def merge_months(schedule_db, rows):
+    """schedule_db with rows upserted by (Country, YearMonth, Agent, Time).
+
+    Only the market-months present in rows are deduplicated; other rows are kept as they are."""
+    months = rows[["Country", "YearMonth"]].drop_duplicates().itertuples(index=False, name=None)
+    touched = month_mask(schedule_db, months)
+    if touched.any():
+        kept, merged = schedule_db[~touched], concat_typed([schedule_db[touched], rows])
+    else:
+        kept, merged = schedule_db, rows
+    return normalize(concat_typed([kept, merged.drop_duplicates(KEY, keep="last")]), "schedule_db")
@@ -0,0 +1,117 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+from pandas.tseries.api import guess_datetime_format
+
+# ==========================================
+# TABLE SCHEMAS & NORMALIZATION
+# ==========================================
+# Every frame entering the app (sheet sync, local mirror, CSV import, forecast
+# generation) goes through normalize() once, so pages can rely on typed
+# columns instead of re-parsing strings on each rerun:
+#   datetime  -> datetime64[ns]
+#   category  -> pandas Categorical (few distinct markets/channels/reasons)
+#   float32   -> float32
+#   int32     -> int32, or float32 when the column has blanks
+# Columns not listed are kept as text (object, blanks as missing).
+
+TABLE_COLUMNS = {
+    "user_db": ["email", "password", "role"],
+    "master_data": ["Date", "Country", "Channel", "Volume", "SLA", "AHT", "FTE"],
+    "exception_logs": ["Country", "Date", "Start Time", "Agent", "Type", "Duration (Min)", "Notes"],
+    "schedule_db": ["Country", "YearMonth", "Agent", "Time"] + [str(d) for d in range(1, 32)],
+    "forecast_db": ["Date", "Country", "Channel", "Forecast_Volume", "Req_FTE"],
+}
+
+COLUMN_TYPES = {
+    "master_data": {
+        "Date": "datetime", "Country": "category", "Channel": "category",
+        "Volume": "float32", "SLA": "float32", "AHT": "float32", "FTE": "float32",
+    },
+    "exception_logs": {"Country": "category", "Type": "category", "Duration (Min)": "int32"},
+    # Keys and every day cell as categories: one int8 activity code per cell instead of a string object.
+    "schedule_db": {col: "category" for col in TABLE_COLUMNS["schedule_db"]},
+    "forecast_db": {
+        "Date": "datetime", "Country": "category", "Channel": "category",
+        "Forecast_Volume": "float32", "Req_FTE": "int32",
+    },
+}
+
+
+def empty_table(table):
+    return normalize(pd.DataFrame(columns=TABLE_COLUMNS[table]), table)
+
+
+def concat_typed(frames):
+    """pd.concat of normalized frames that keeps categorical columns categorical.
+
+    New categories are appended to the first frame's, so put the largest frame first: it is not recoded."""
+    frames = [f for f in frames if len(f)] or frames[:1]
+    for col in frames[0].columns:
+        if all(isinstance(f[col].dtype, pd.CategoricalDtype) for f in frames):
+            cats = frames[0][col].cat.categories
+            for f in frames[1:]:
+                cats = cats.append(f[col].cat.categories.difference(cats))
+            frames = [f if f[col].cat.categories.equals(cats) else f.assign(**{col: f[col].cat.set_categories(cats)}) for f in frames]
+    return pd.concat(frames, ignore_index=True)
+
+
+def _text(s):
+    text = s.astype(object)
+    blank = text.isna() | (text.astype(str).str.strip() == "")
+    return text.astype(str).where(~blank, None).astype(object)
+
+
+def _date_format(s, samples=50):
+    # Candidate formats from a spread of values; the day-first reading only wins if it
+    # parses more of them (e.g. a 13/01 somewhere), so ambiguous files stay month-first.
+    values = s.dropna().astype(str)
+    values = values.iloc[np.linspace(0, len(values) - 1, min(samples, len(values))).astype(int)] if len(values) else values
+    best, best_hits = None, 0
+    for v in values.iloc[:5]:
+        for dayfirst in (False, True):
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", UserWarning)
+                fmt = guess_datetime_format(v, dayfirst=dayfirst)
+            if fmt is None or fmt == best:
+                continue
+            hits = pd.to_datetime(values, errors='coerce', format=fmt).notna().sum()
+            if hits > best_hits:
+                best, best_hits = fmt, hits
+    return best
+
+
+def _dates(s):
+    # Interval exports repeat each timestamp once per market/channel: parse the distinct
+    # strings only, with one inferred format; values that don't match it go through
+    # the per-element 'mixed' parser.
+    codes, uniques = pd.factorize(s)
+    uniques = pd.Series(uniques)
+    fmt = _date_format(uniques)
+    parsed = pd.Series(pd.to_datetime(uniques, errors='coerce', format=fmt) if fmt else pd.NaT, index=uniques.index).astype("datetime64[ns]")
+    retry = parsed.isna()
+    if retry.any():
+        parsed[retry] = pd.to_datetime(uniques[retry], errors='coerce', format='mixed').astype("datetime64[ns]")
+    values = np.full(len(s), np.datetime64("NaT"), dtype="datetime64[ns]")
+    values[codes >= 0] = parsed.to_numpy()[codes[codes >= 0]]
+    return pd.Series(values, index=s.index)
+
+
+def normalize(df, table):
+    """Typed copy of df following COLUMN_TYPES[table]; already-typed columns pass through."""
+    types = COLUMN_TYPES.get(table, {})
+    out = {}
+    for col in df.columns:
+        s = df[col]
+        kind = types.get(col)
+        if kind == "datetime":
+            out[col] = s if s.dtype == "datetime64[ns]" else _dates(s)
+        elif kind == "category":
+            out[col] = s if isinstance(s.dtype, pd.CategoricalDtype) else _text(s).astype("category")
+        elif kind in ("float32", "int32"):
+            num = s if pd.api.types.is_numeric_dtype(s) else pd.to_numeric(s, errors='coerce')
+            out[col] = num.astype(np.int32) if kind == "int32" and not num.isna().any() else num.astype(np.float32)
+        else:
+            out[col] = _text(s)
+    return pd.DataFrame(out, index=df.index, columns=df.columns)
@@ -0,0 +1,233 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from wfm.aggregate import DAY_NS, series_codes
+
+# ==========================================
+# SEASONAL FORECAST MODELS
+# ==========================================
+# Daily volume per (Country, Channel) is modelled with additive, damped
+# Holt-Winters (level + trend + day-of-week season). Series are fitted
+# SERIES_BATCH at a time: the recursion runs over days, vectorized over
+# (parameter grid x series), and each series keeps the grid point with the
+# lowest one-step-ahead squared error. Between batches fit() reports progress,
+# so a background job can be cancelled there (wfm.jobs). Daily totals are
+# spread over the day with the intraday profiles of wfm.intraday.
+#
+# SeasonalForecaster keeps the fitted parameters and end states per series.
+# When the history it is given only adds days after the fitted range, the
+# recursion just continues over the new days with the cached parameters; a
+# series is refitted only when its already-fitted days changed.
+
+SEASON = 7
+MIN_DAYS = 2 * SEASON
+PHI = 0.98
+ALPHAS = (0.05, 0.1, 0.2, 0.4, 0.6)
+BETAS = (0.0, 0.01, 0.05, 0.1)
+GAMMAS = (0.05, 0.1, 0.2, 0.4)
+SERIES_BATCH = 16
+
+
+def daily_series(history):
+    """(series keys, days, Y[days, series]) of daily Volume totals; days without rows count as 0."""
+    keys, code, ns, volume = series_codes(history)
+    if not len(ns):
+        return keys, pd.DatetimeIndex([]), np.zeros((0, len(keys)))
+    day = ns // DAY_NS
+    first = day.min()
+    n_days = int(day.max() - first) + 1
+    Y = np.bincount((day - first) * len(keys) + code, weights=volume, minlength=n_days * len(keys)).reshape(n_days, len(keys))
+    days = pd.date_range(pd.Timestamp(int(first) * DAY_NS), periods=n_days, freq="D")
+    return keys, days, Y
+
+
+def _grid():
+    return np.array([(a, b, g) for a in ALPHAS for b in BETAS for g in GAMMAS])
+
+
+def _init_state(Y):
+    first, second = Y[:SEASON].mean(axis=0), Y[SEASON:MIN_DAYS].mean(axis=0)
+    return first, (second - first) / SEASON, (Y[:SEASON] - first).T.copy()
+
+
+def _run(Y, params, level, trend, season, t0=0):
+    """Holt-Winters recursion over Y[days, series] from day index t0; params[..., 3] broadcast against series.
+
+    Returns (level, trend, season, sse) with season shaped [..., series, SEASON]."""
+    alpha, beta, gamma = (params[..., i] for i in range(3))
+    level, trend = np.broadcast_arrays(level, alpha * 0 + trend)
+    level, trend = level.copy(), trend.copy()
+    season = np.broadcast_to(season, level.shape + (SEASON,)).copy()
+    sse = np.zeros(level.shape)
+    for i, y in enumerate(Y):
+        k = (t0 + i) % SEASON
+        s = season[..., k]
+        damped = level + PHI * trend
+        err = y - (damped + s)
+        if t0 + i >= MIN_DAYS:
+            sse += err * err
+        new_level = alpha * (y - s) + (1 - alpha) * damped
+        trend = beta * (new_level - level) + (1 - beta) * PHI * trend
+        season[..., k] = gamma * (y - new_level) + (1 - gamma) * s
+        level = new_level
+    return level, trend, season, sse
+
+
+def fit_holt_winters(Y):
+    """Best grid parameters and end state per series column of Y (needs MIN_DAYS rows)."""
+    grid = _grid()
+    level, trend, season = _init_state(Y)
+    L, B, S, sse = _run(Y, grid[:, None, :], level, trend, season)
+    best = sse.argmin(axis=0)
+    cols = np.arange(Y.shape[1])
+    return {"params": grid[best], "level": L[best, cols], "trend": B[best, cols], "season": S[best, cols], "t": len(Y)}
+
+
+def extend_holt_winters(model, Y_new):
+    """Continue a fitted model over further days with its parameters unchanged."""
+    level, trend, season, _ = _run(Y_new, model["params"], model["level"], model["trend"], model["season"], model["t"])
+    return {"params": model["params"], "level": level, "trend": trend, "season": season, "t": model["t"] + len(Y_new)}
+
+
+def forecast_holt_winters(model, horizon):
+    """Daily forecasts [series, horizon], floored at zero."""
+    h = np.arange(1, horizon + 1)
+    damp = np.cumsum(PHI ** h)
+    phase = (model["t"] + h - 1) % SEASON
+    out = model["level"][:, None] + damp[None, :] * model["trend"][:, None] + model["season"][:, phase]
+    return np.maximum(out, 0)
+
+
+def _flat(Y):
+    # Too little history for a weekly season: day-of-week means over what there is.
+    n = len(Y)
+    mean = Y.mean(axis=0) if n else np.zeros(Y.shape[1])
+    season = np.zeros((Y.shape[1], SEASON))
+    for k in range(min(n, SEASON)):
+        season[:, k] = Y[k::SEASON].mean(axis=0) - mean
+    return {"params": np.zeros((Y.shape[1], 3)), "level": mean, "trend": np.zeros(Y.shape[1]), "season": season, "t": n}
+
+
+def fit_models(Y):
+    return fit_holt_winters(Y) if len(Y) >= MIN_DAYS else _flat(Y)
+
+
+def backtest(Y, origins=4, horizon=14, step=SEASON):
+    """Rolling-origin errors: refit on Y[:o] and forecast `horizon` days, for the last `origins` origins.
+
+    Returns (per-series MAPE, per-series WAPE, overall MAPE, overall WAPE, origins used)."""
+    ends = [len(Y) - horizon - step * k for k in range(origins)]
+    ends = [o for o in ends if o >= MIN_DAYS + SEASON]
+    if not ends:
+        return None
+    abs_err, actual = [], []
+    for o in ends:
+        pred = forecast_holt_winters(fit_holt_winters(Y[:o]), horizon)
+        act = Y[o:o + horizon].T
+        abs_err.append(np.abs(pred - act))
+        actual.append(act)
+    abs_err, actual = np.concatenate(abs_err, axis=1), np.concatenate(actual, axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ape = np.where(actual > 0, abs_err / actual, np.nan)
+        mape = np.nanmean(ape, axis=1) if np.isfinite(ape).any() else np.full(len(ape), np.nan)
+        wape = abs_err.sum(axis=1) / actual.sum(axis=1)
+        overall_mape = np.nanmean(ape) if np.isfinite(ape).any() else np.nan
+        overall_wape = abs_err.sum() / actual.sum()
+    return mape, wape, overall_mape, overall_wape, len(ends)
+
+
+class SeasonalForecaster:
+    """Fitted Holt-Winters state per (Country, Channel), reused across forecasts of a growing history."""
+
+    def __init__(self):
+        self._models = {}
+        self._daily = None
+        self._backtests = {}
+        self._lock = threading.Lock()
+        # Guards _daily and _backtests; the series and backtests are computed outside it.
+        self._cache_lock = threading.Lock()
+        self.refitted = self.extended = 0
+
+    def daily(self, history, key=None):
+        # key: anything identifying this version of history (e.g. the shared table version).
+        with self._cache_lock:
+            cached = self._daily
+        if key is not None and cached is not None and cached[0] == key:
+            return cached[1]
+        series = daily_series(history)
+        with self._cache_lock:
+            self._daily = (key, series)
+        return series
+
+    def fit(self, history, key=None, progress=None):
+        """Bring every series' model up to the last day of history; returns (keys, days, model arrays).
+
+        progress: optional callback(fraction, message) called before each batch of refitted series."""
+        progress = progress or (lambda fraction, message=None: None)
+        keys, days, Y = self.daily(history, key)
+        with self._lock:
+            refit, extend = [], []
+            for j, k in enumerate(keys):
+                m = self._models.get(k)
+                if m is not None and m["start"] == days[0] and m["t"] <= len(Y) and m["digest"] == _digest(Y[:m["t"], j]):
+                    extend.append(j)
+                else:
+                    refit.append(j)
+            for i in range(0, len(refit), SERIES_BATCH):
+                progress(i / len(refit), "Fitting seasonal models")
+                cols = refit[i:i + SERIES_BATCH]
+                self._store(keys, days, Y, cols, fit_models(Y[:, cols]))
+            # Extend series that share an end point together.
+            by_end = {}
+            for j in extend:
+                by_end.setdefault(self._models[keys[j]]["t"], []).append(j)
+            for t, cols in by_end.items():
+                if t < len(Y):
+                    model = self._stack([self._models[keys[j]] for j in cols])
+                    self._store(keys, days, Y, cols, extend_holt_winters(model, Y[t:, cols]) if t >= MIN_DAYS else fit_models(Y[:, cols]))
+            self.refitted += len(refit)
+            self.extended += sum(len(c) for t, c in by_end.items() if t < len(Y))
+            return keys, days, self._stack([self._models[k] for k in keys])
+
+    def _store(self, keys, days, Y, cols, model):
+        for i, j in enumerate(cols):
+            self._models[keys[j]] = {
+                "start": days[0], "t": model["t"], "digest": _digest(Y[:model["t"], j]),
+                **{name: model[name][i] for name in ("params", "level", "trend", "season")},
+            }
+
+    @staticmethod
+    def _stack(models):
+        out = {name: np.array([m[name] for m in models]) for name in ("params", "level", "trend", "season")}
+        out["t"] = models[0]["t"] if models else 0
+        if len({m["t"] for m in models}) > 1:
+            raise ValueError("models end on different days")
+        return out
+
+    def forecast(self, history, days=365, key=None, progress=None):
+        """(series keys, forecast dates, daily volume[series, days])."""
+        keys, hist_days, model = self.fit(history, key, progress)
+        dates = hist_days[-1] + pd.to_timedelta(np.arange(1, days + 1), unit="D")
+        return keys, dates, forecast_holt_winters(model, days)
+
+    def backtest(self, history, key=None, origins=4, horizon=14):
+        """Per-series and overall rolling-origin MAPE/WAPE, cached per history key; None if history is too short."""
+        with self._cache_lock:
+            if key is not None and key in self._backtests:
+                return self._backtests[key]
+        keys, _, Y = self.daily(history, key)
+        res = backtest(Y, origins, horizon)
+        if res is not None:
+            mape, wape, o_mape, o_wape, n = res
+            table = pd.DataFrame({"MAPE": mape, "WAPE": wape}, index=keys).reset_index()
+            res = {"series": table, "MAPE": o_mape, "WAPE": o_wape, "origins": n, "horizon": horizon}
+        if key is not None:
+            with self._cache_lock:
+                self._backtests = {key: res}
+        return res
+
+
+def _digest(column):
+    return hash(np.ascontiguousarray(column).tobytes())
@@ -0,0 +1,100 @@
+import threading
+
+# ==========================================
+# SHARED TABLE CACHE (one copy per process)
+# ==========================================
+# Every session reads the same DataFrame objects instead of holding its own
+# copy of each worksheet. Frames handed out by get() are treated as immutable:
+# a writer never edits one in place, it builds the next version from the
+# latest one inside update() and publishes it (copy-on-write). Sessions that
+# still hold the old frame keep a consistent snapshot; the next get() returns
+# the new version. update() runs under one lock, so two planners saving at the
+# same time both land in the published table and in the sheet.
+#
+# Tables load lazily: the first get() of a table calls loader(name) and
+# publishes the result, so a page only pays for the worksheets it reads.
+# Concurrent first reads of one table wait for a single load; loads of
+# different tables, and of a table while another is being written, don't
+# wait for each other. reload() re-reads a table under the writer lock.
+#
+# If the load fails, get() returns fallback(name) (e.g. an empty table)
+# without publishing it, so the next get() tries the loader again. Writes
+# never start from a fallback: load() and update() raise TableUnavailable
+# instead, since pushing a table built on it would overwrite the sheet.
+
+
+class TableUnavailable(RuntimeError):
+    """A table could not be loaded, so it can't be written."""
+
+
+class SharedTables:
+    def __init__(self, loader=None, fallback=None):
+        self._loader = loader
+        self._fallback = fallback
+        self._frames = {}
+        self._versions = {}
+        self._loading = {}
+        self._state = threading.Lock()
+        self.lock = threading.RLock()
+
+    def loaded(self, name=None):
+        return name in self._frames if name else bool(self._frames)
+
+    def get(self, name):
+        """The latest version of the table; fallback(name) while it can't be loaded."""
+        df = self._frames.get(name)
+        if df is not None:
+            return df
+        try:
+            return self.load(name)
+        except TableUnavailable:
+            if self._fallback is None:
+                raise
+            return self._fallback(name)
+
+    def load(self, name):
+        """The latest version of the table, loading it if needed; raises TableUnavailable if that fails."""
+        with self._load_lock(name):
+            df = self._frames.get(name)
+            if df is None:
+                try:
+                    df = self._loader(name)
+                except Exception as e:
+                    raise TableUnavailable(f"{name} could not be loaded") from e
+                self.publish(name, df)
+            return df
+
+    def reload(self, name, loader=None):
+        """Publish (loader or the table loader)(name) as the next version; a loader error leaves the table as it was."""
+        with self.lock, self._load_lock(name):
+            return self.publish(name, (loader or self._loader)(name))
+
+    def _load_lock(self, name):
+        with self._state:
+            return self._loading.setdefault(name, threading.Lock())
+
+    def version(self, name):
+        return self._versions.get(name, 0)
+
+    def publish(self, name, df):
+        with self._state:
+            self._frames[name] = df
+            self._versions[name] = self.version(name) + 1
+            return self._versions[name]
+
+    def update(self, name, change, persist=None):
+        """Publish change(latest frame) as the next version, then persist it (still under the lock)."""
+        # Load first: a load takes the table's lock before publishing, so it must not run under self.lock.
+        self.load(name)
+        with self.lock:
+            df = change(self._frames[name])
+            self.publish(name, df)
+            if persist is not None:
+                return df, persist(name, df)
+            return df, None
+
+    def invalidate(self, name=None):
+        with self.lock, self._state:
+            for key in ([name] if name else list(self._frames)):
+                self._frames.pop(key, None)
+                self._versions[key] = self.version(key) + 1
@@ -0,0 +1,222 @@
+import math
+import time
+
+import numpy as np
+import pandas as pd
+
+# ==========================================
+# SHIFT-BASED SCHEDULE OPTIMIZER
+# ==========================================
+# Covers a requirement matrix req[day, slot, channel] (wfm.roster) with whole
+# shifts instead of per-slot positions. A shift pattern is a start slot, a
+# length from ShiftRules.shift_hours and, for long shifts, one unpaid break
+# near the middle; only slots inside the opening window are used.
+#
+#   1. Cover: per (day, channel), repeatedly add the pattern covering the most
+#      still-short slots per paid slot (+ a fixed cost per shift, so fewer,
+#      longer shifts win ties) until every slot is covered.
+#   2. Improve: until the time budget runs out or a full pass finds nothing,
+#      try replacing each used pattern by any other pattern, or dropping it,
+#      and keep the move when paid time falls and coverage does not.
+#   3. Assign: hand each day's shifts to agents of the channel, respecting the
+#      maximum working days per (Monday-Sunday) week and the minimum rest
+#      between shifts; agents are hired when nobody eligible is left, and
+#      each week starts with at least ceil(week's shifts / max days) agents.
+
+
+class ShiftRules:
+    """Legal shift patterns and working-time limits."""
+
+    def __init__(self, shift_hours=(8, 6, 4), break_minutes=30, break_from_hours=6,
+                 max_days_per_week=5, min_rest_hours=11, shift_cost_hours=1.0):
+        self.shift_hours = tuple(shift_hours)
+        self.break_minutes = break_minutes
+        self.break_from_hours = break_from_hours
+        self.max_days_per_week = max_days_per_week
+        self.min_rest_hours = min_rest_hours
+        # Planning cost of each extra shift (one more agent on the day), in paid hours.
+        self.shift_cost_hours = shift_cost_hours
+
+
+def _slot_minutes(times):
+    minutes = [int(h) * 60 + int(m) for h, m in (str(t).split(":") for t in times)]
+    step = minutes[1] - minutes[0] if len(minutes) > 1 else 30
+    return np.array(minutes), step
+
+
+def shift_patterns(rules, n_slots, slot_minutes):
+    """(start slot, length in slots, working mask[pattern, slot]) for every shift fitting the window, longest first."""
+    starts, lengths, masks = [], [], []
+    for hours in sorted(set(rules.shift_hours), reverse=True):
+        length = round(hours * 60 / slot_minutes)
+        if not 0 < length <= n_slots:
+            continue
+        n_break = round(rules.break_minutes / slot_minutes) if hours >= rules.break_from_hours else 0
+        middle = (length - n_break) // 2
+        offsets = sorted({o for o in (middle - 1, middle, middle + 1) if 0 < o and o + n_break < length}) if n_break else [0]
+        for start in range(n_slots - length + 1):
+            for off in offsets:
+                mask = np.zeros(n_slots, dtype=bool)
+                mask[start:start + length] = True
+                mask[start + off:start + off + n_break] = False
+                starts.append(start); lengths.append(length); masks.append(mask)
+    if not masks:
+        raise ValueError(f"no shift of {rules.shift_hours} hours fits in {n_slots} slots of {slot_minutes} minutes")
+    return np.array(starts), np.array(lengths), np.array(masks)
+
+
+def _cover(need, masks, cost):
+    counts = np.zeros(len(masks), dtype=np.int64)
+    deficit = need.astype(np.int64)
+    work = masks.astype(float)
+    while (deficit > 0).any():
+        best = int(np.argmax((work @ (deficit > 0)) / cost))
+        take = max(1, int(deficit[masks[best]].min()))
+        counts[best] += take
+        deficit -= take * masks[best]
+    return counts
+
+
+def _improve(need, counts, masks, cost):
+    # One pass of replace-or-drop moves; returns True if anything improved.
+    work = masks.astype(np.int64)
+    cover = counts @ work
+    improved = False
+    for i in np.flatnonzero(counts):
+        while counts[i]:
+            rest = cover - work[i]
+            short = np.maximum(need - rest, 0)
+            if not short.any():
+                gain, best = cost[i], -1
+            else:
+                ok = ~(short[None, :] > work).any(axis=1)
+                gain = cost[i] - np.where(ok, cost, np.inf)
+                best = int(np.argmax(gain)); gain = gain[best]
+            if gain <= 0:
+                break
+            counts[i] -= 1
+            if best >= 0:
+                counts[best] += 1
+                cover = rest + work[best]
+            else:
+                cover = rest
+            improved = True
+    return improved
+
+
+def _assign(day_counts, start_min, end_min, channel, first_weekday, rules, first_agent):
+    """Shift records (agent, channel, day, pattern) for one channel's per-day pattern counts."""
+    n_days = len(day_counts)
+    week_of = (np.arange(n_days) + first_weekday) // 7
+    capacity = int(day_counts.sum()) + 1
+    last_day = np.full(capacity, -10)
+    last_end = np.zeros(capacity, dtype=np.int64)
+    week_days = np.zeros(capacity, dtype=np.int64)
+    n = 0
+    min_rest = rules.min_rest_hours * 60
+    records = []
+    for week in np.unique(week_of):
+        days = np.flatnonzero(week_of == week)
+        per_day = day_counts[days].sum(axis=1)
+        n = max(n, math.ceil(per_day.sum() / rules.max_days_per_week), int(per_day.max(initial=0)))
+        week_days[:] = 0
+        for d in days:
+            shifts = np.repeat(np.arange(len(start_min)), day_counts[d])
+            for p in shifts[np.argsort(start_min[shifts], kind="stable")]:
+                ok = ((last_day[:n] != d) & (week_days[:n] < rules.max_days_per_week)
+                      & ((d - last_day[:n]) * 1440 - last_end[:n] + start_min[p] >= min_rest))
+                if ok.any():
+                    # The least-used agent this week keeps the others available for later days.
+                    pick = int(np.argmin(np.where(ok, week_days[:n], capacity)))
+                else:
+                    pick, n = n, n + 1
+                last_day[pick], last_end[pick] = d, end_min[p]
+                week_days[pick] += 1
+                records.append((first_agent + pick, channel, d, p))
+    return records, n
+
+
+def optimize_shifts(req, channels, times, rules=None, first_day=None, time_budget=2.0, progress=None):
+    """Shift schedule covering req[day, slot, channel] over the opening-hour slots `times`.
+
+    first_day: date of day 0 (weeks for max_days_per_week run Monday-Sunday; default: a Monday).
+    progress: optional callback(fraction, message), called per day-channel and improvement pass.
+    Returns a dict with the shift list, a categorical template in the CSV layout (channel while
+    working, 'Break' on breaks), the coverage array and summary figures."""
+    t0 = time.perf_counter()
+    rules = rules or ShiftRules()
+    progress = progress or (lambda fraction, message=None: None)
+    req = np.asarray(req, dtype=np.int64)
+    n_days, n_slots, n_channels = req.shape
+    slot_start, slot_minutes = _slot_minutes(times)
+    starts, lengths, masks = shift_patterns(rules, n_slots, slot_minutes)
+    paid = masks.sum(axis=1)
+    cost = paid + rules.shift_cost_hours * 60 / slot_minutes
+
+    counts = np.zeros((n_days, n_channels, len(masks)), dtype=np.int64)
+    cells = [(d, c) for d in range(n_days) for c in range(n_channels) if req[d, :, c].any()]
+    for i, (d, c) in enumerate(cells):
+        progress(0.3 * i / len(cells), "Covering requirements")
+        counts[d, c] = _cover(req[d, :, c], masks, cost)
+    passes, pending = 0, list(cells)
+    while pending and time.perf_counter() - t0 < time_budget:
+        passes += 1
+        progress(0.3 + 0.6 * min((time.perf_counter() - t0) / time_budget, 1.0), f"Improving shifts (pass {passes})")
+        improved = []
+        for d, c in pending:
+            if time.perf_counter() - t0 >= time_budget:
+                break
+            if _improve(req[d, :, c], counts[d, c], masks, cost):
+                improved.append((d, c))
+        pending = improved
+
+    progress(0.9, "Assigning agents")
+    first_weekday = pd.Timestamp(first_day).dayofweek if first_day is not None else 0
+    start_min = slot_start[0] + starts * slot_minutes
+    end_min = start_min + lengths * slot_minutes
+    records, n_agents = [], 0
+    for c, ch in enumerate(channels):
+        recs, hired = _assign(counts[:, c], start_min, end_min, ch, first_weekday, rules, n_agents)
+        records += recs
+        n_agents += hired
+
+    agent, chan, day, pat = (np.array(x) for x in zip(*records)) if records else (np.zeros(0, dtype=np.int64),) * 4
+    chan_code = pd.Index(channels).get_indexer(chan) if len(chan) else chan
+    # Template codes per [agent, slot, day]: 0 off, 1.. channel, n_channels + 1 break.
+    grid = np.zeros((n_agents, n_slots, n_days), dtype=np.int8)
+    span = (np.arange(n_slots)[None, :] >= starts[pat][:, None]) & (np.arange(n_slots)[None, :] < (starts + lengths)[pat][:, None])
+    r, s = np.nonzero(span)
+    grid[agent[r], s, day[r]] = n_channels + 1
+    r, s = np.nonzero(masks[pat])
+    grid[agent[r], s, day[r]] = chan_code[r] + 1
+    # Categorical columns straight from the codes (schedule_db layout, see wfm.schedule).
+    cells = grid.reshape(n_agents * n_slots, n_days).astype(np.int16) - 1
+    template = pd.DataFrame({
+        "Agent": pd.Categorical.from_codes(np.repeat(np.arange(n_agents), n_slots), [f"Agent_{i}" for i in range(1, n_agents + 1)]),
+        "Time": pd.Categorical.from_codes(np.tile(np.arange(n_slots), n_agents), list(times)),
+        **{str(d + 1): pd.Categorical.from_codes(cells[:, d], list(channels) + ["Break"]) for d in range(n_days)},
+    })
+
+    coverage = np.einsum("dcp,ps->dsc", counts, masks.astype(np.int64))
+    hour = slot_minutes / 60
+    label = np.asarray(times, dtype=object)
+    end = [f"{m // 60:02d}:{m % 60:02d}" for m in end_min]
+    shifts = pd.DataFrame({
+        "Agent": [f"Agent_{a + 1}" for a in agent], "Channel": chan, "Day": day + 1,
+        "Start": label[starts[pat]] if len(pat) else [], "End": np.asarray(end, dtype=object)[pat] if len(pat) else [],
+        "Paid_Hours": paid[pat] * hour,
+    })
+    required = req.sum()
+    return {
+        "shifts": shifts,
+        "template": template,
+        "coverage": coverage,
+        "agents": n_agents,
+        "required_hours": float(required * hour),
+        "paid_hours": float(paid[pat].sum() * hour),
+        "coverage_pct": float(np.minimum(coverage, req).sum() / required) if required else 1.0,
+        "short_slots": int((coverage < req).sum()),
+        "over_hours": float(np.maximum(coverage - req, 0).sum() * hour),
+        "passes": passes,
+        "seconds": time.perf_counter() - t0,
+    }
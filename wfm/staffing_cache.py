@@ -0,0 +1,87 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from wfm.erlang import required_agents, unique_rows
+
+# ==========================================
+# STAFFING REQUIREMENT CACHE
+# ==========================================
+# The same (interval volume, AHT, SL target) triples come up on every rerun of
+# Forecasting, Scheduling and the Capacity Planner. Volumes are snapped to
+# `volume_resolution` so near-identical intervals share an entry; entries are
+# evicted least-recently-used once `max_entries` is reached. One instance is
+# meant to be shared by all sessions (st.cache_resource), hence the lock.
+
+
+class StaffingCache:
+    def __init__(self, volume_resolution=0.1, max_entries=200_000):
+        self.volume_resolution = volume_resolution
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def quantize(self, vol):
+        q = self.volume_resolution
+        return np.round(np.asarray(vol, dtype=float) / q) * q if q else np.asarray(vol, dtype=float)
+
+    def _get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+        return None
+
+    def _put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def required_fte(self, vol, aht, target_sl, target_time=20):
+        vol = float(self.quantize(vol))
+        key = ("fte", vol, float(aht), float(target_sl), float(target_time))
+        value = self._get(key)
+        if value is None:
+            value = int(required_agents(vol, aht, target_sl, target_time))
+            self._put(key, value)
+        return value
+
+    def required_fte_many(self, vol, aht, target_sl, target_time=20):
+        """Array version of required_fte: cached rows are looked up, the rest are solved in one batch."""
+        vol, aht, target_sl, target_time = np.broadcast_arrays(self.quantize(vol), *(np.asarray(x, dtype=float) for x in (aht, target_sl, target_time)))
+        rows = np.column_stack([a.ravel() for a in (vol, aht, target_sl, target_time)])
+        if not len(rows):
+            return np.zeros(vol.shape, dtype=np.int64)
+        uniq, inverse = unique_rows(rows)
+        keys = [("fte",) + tuple(r) for r in uniq.tolist()]
+        found = [self._get(k) for k in keys]
+        missing = [i for i, v in enumerate(found) if v is None]
+        if missing:
+            solved = required_agents(*uniq[missing].T)
+            for i, v in zip(missing, solved.tolist()):
+                found[i] = v
+                self._put(keys[i], v)
+        return np.asarray(found, dtype=np.int64)[inverse].reshape(vol.shape)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
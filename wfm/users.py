@@ -0,0 +1,92 @@
+import hashlib
+import hmac
+import os
+
+import pandas as pd
+
+from wfm.incremental import IncrementalIndex
+
+# ==========================================
+# USER INDEX (login lookups)
+# ==========================================
+# user_db as a dict keyed by a salted SHA-256 of the lower-cased email, so a
+# login is one hash and one dict lookup however many users there are, instead
+# of a str.lower() scan of the table. Passwords are kept hashed only: rows the
+# Admin Panel provisions are stored in the sheet as PBKDF2 strings
+# (hash_password) and verified as such; older rows holding the plain password
+# are hashed with the index salt when the index is built. The salt is random
+# per process, so neither form can be looked up outside it.
+
+PBKDF2_ITERATIONS = 200_000
+PBKDF2_PREFIX = "pbkdf2_sha256"
+
+
+def hash_password(password, iterations=PBKDF2_ITERATIONS, salt=None):
+    """'pbkdf2_sha256$<iterations>$<salt hex>$<hash hex>' for storing in user_db."""
+    salt = salt or os.urandom(16)
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode(), salt, iterations)
+    return f"{PBKDF2_PREFIX}${iterations}${salt.hex()}${digest.hex()}"
+
+
+def verify_password(password, stored):
+    # A malformed cell (bad iteration count or hex) fails that user's login, not the page.
+    try:
+        prefix, iterations, salt, digest = stored.split("$")
+        if prefix != PBKDF2_PREFIX:
+            return False
+        iterations, salt, digest = int(iterations), bytes.fromhex(salt), bytes.fromhex(digest)
+        got = hashlib.pbkdf2_hmac("sha256", password.encode(), salt, iterations)
+    except (ValueError, OverflowError):
+        return False
+    return hmac.compare_digest(got, digest)
+
+
+def _text(value):
+    return None if value is None or pd.isna(value) else str(value)
+
+
+class UserIndex(IncrementalIndex):
+    def __init__(self, salt=None):
+        super().__init__()
+        self._salt = salt or os.urandom(16)
+        self._users = {}
+
+    def __len__(self):
+        return len(self._users)
+
+    def _key(self, email):
+        return hashlib.sha256(self._salt + email.strip().lower().encode()).digest()
+
+    def _digest(self, password):
+        return hashlib.sha256(self._salt + password.encode()).digest()
+
+    def _reset(self):
+        self._users = {}
+
+    def add(self, user_db):
+        """Index every user_db row with an email (email, password, role columns)."""
+        rows = []
+        for email, password, role in zip(user_db["email"], user_db["password"], user_db["role"]):
+            email, password = _text(email), _text(password)
+            if not email or password is None:
+                continue
+            stored = password if password.startswith(PBKDF2_PREFIX + "$") else self._digest(password)
+            rows.append((self._key(email), (email, stored, str(role))))
+        with self._lock:
+            for key, row in rows:
+                # Rows sharing an email all stay valid, as with the table scan.
+                self._users.setdefault(key, []).append(row)
+
+    def authenticate(self, email, password):
+        """{'email', 'role'} of the first user row matching email (any case) and password, else None."""
+        with self._lock:
+            # Waits out a rebuild; the password check itself runs unlocked.
+            candidates = list(self._users.get(self._key(email), ()))
+        for stored_email, stored, role in candidates:
+            if isinstance(stored, bytes):
+                ok = hmac.compare_digest(stored, self._digest(password))
+            else:
+                ok = verify_password(password, stored)
+            if ok:
+                return {"email": stored_email, "role": role}
+        return None